@@ -0,0 +1,61 @@
+"""Test reading binary framed data capture streams."""
+
+import struct
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+from veusz.dataimport import capture
+
+class ChunkStream(capture.CaptureStream):
+    """Capture stream returning data in the chunks given."""
+
+    def __init__(self, chunks):
+        capture.CaptureStream.__init__(self, binary=True)
+        self.chunks = list(chunks)
+
+    def getMoreData(self):
+        if self.chunks:
+            return self.chunks.pop(0)
+        return b''
+
+def frame(payload):
+    return struct.pack('<I', len(payload)) + payload
+
+def testFraming(out):
+    header = frame(b'x y')
+    rows = N.array([[1, 10], [2, 20], [3, 30]], dtype='<f8')
+    body = frame(rows[:2].tobytes()) + frame(rows[2:].tobytes())
+    data = header + body
+    # split frames at awkward places
+    stream = ChunkStream([data[:3], data[3:9], data[9:30], data[30:]])
+
+    reader = capture.BinaryCaptureRead()
+    reader.readData(stream)
+    outdata = {}
+    reader.setOutput(outdata)
+    for name in sorted(outdata):
+        out.append('frame %s %s' % (name, outdata[name].data.tolist()))
+    out.append('rows %i bytes %i' % (stream.linesread, stream.bytesread))
+
+def testCorrupt(out):
+    # joining a stream part way through a frame gives a large length
+    rows = N.array([[1e300, 2e300]], dtype='<f8').tobytes()
+    stream = ChunkStream([frame(b'x y'), rows[3:], frame(rows)])
+    reader = capture.BinaryCaptureRead()
+    try:
+        reader.readData(stream)
+    except capture.CaptureFinishException as e:
+        out.append('corrupt %s, buffered %i' % (e, len(stream.buffer)))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testFraming(out)
+    testCorrupt(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
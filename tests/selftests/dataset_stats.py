@@ -0,0 +1,39 @@
+"""Test cached dataset statistics."""
+
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.datasets as datasets
+
+def testStats(out):
+    stats = datasets.ArrayStats(N.array([3., -1., N.nan, 5.]))
+    out.append('stats %s %s %i %i' % (
+        stats.range(), stats.range(positive=True), stats.numnonfinite,
+        stats.sortedness))
+    for vals in ([1., 2., 2., 3.], [3., 1., 0.], [1., 3., 2.], []):
+        stats = datasets.ArrayStats(N.array(vals))
+        out.append('sortedness %s %i %s' % (
+            vals, stats.sortedness, stats.range()))
+
+def testCache(out):
+    # cached until values are changed
+    ds = datasets.Dataset(data=[1., 2., 3.], serr=[0.5, 0.5, 0.5])
+    rs = ds.rangeStats()
+    assert ds.rangeStats() is rs
+    out.append('range %s' % (ds.getRange(),))
+    ds.writableColumn('data')[0] = -4.
+    assert ds.rangeStats() is not rs
+    out.append('modified range %s' % (ds.getRange(),))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testStats(out)
+    testCache(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
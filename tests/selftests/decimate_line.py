@@ -0,0 +1,85 @@
+"""Test reducing the number of points in lines before drawing."""
+
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+from veusz.utils.decimate import decimateLine
+
+def checkColumns(x, y, xd, yd, colwidth):
+    """Check first, last, minimum and maximum of each column are kept."""
+    for col in N.unique(N.floor(x / colwidth)):
+        sel = N.floor(x / colwidth) == col
+        dsel = N.floor(xd / colwidth) == col
+        assert xd[dsel][0] == x[sel][0] and xd[dsel][-1] == x[sel][-1]
+        assert yd[dsel].min() == y[sel].min()
+        assert yd[dsel].max() == y[sel].max()
+
+def testDecimate(out):
+    x = N.linspace(0., 10., 1001)
+    y = N.sin(x*7)
+
+    xd, yd = decimateLine(x, y, 1.)
+    out.append('decimated %i of %i' % (len(xd), len(x)))
+    checkColumns(x, y, xd, yd, 1.)
+
+    # nothing to gain with a point in each column
+    xs, ys = decimateLine(x, y, 1e-3)
+    assert xs is x and ys is y
+    out.append('unchanged %i' % len(xs))
+
+    # too few points
+    xs, ys = decimateLine(x[:5], y[:5], 10.)
+    out.append('short %i' % len(xs))
+
+def testNonFinite(out):
+    x = N.linspace(0., 10., 1001)
+    y = N.sin(x*7)
+
+    # a gap splits the line into parts reduced separately
+    yg = N.array(y)
+    yg[500] = N.nan
+    xg, ygd = decimateLine(x, yg, 1.)
+    x1, y1 = decimateLine(x[:500], y[:500], 1.)
+    x2, y2 = decimateLine(x[501:], y[501:], 1.)
+    assert N.array_equal(xg, N.concatenate((x1, [x[500]], x2)))
+    out.append('gap %i points, %i non-finite' % (
+        len(xg), N.count_nonzero(~N.isfinite(ygd))))
+
+    # runs of non-finite values in both coordinates are all kept
+    xn, yn = N.array(x), N.array(y)
+    yn[200:230] = N.nan
+    yn[600:605] = N.inf
+    xn[800:810] = N.nan
+    xd, yd = decimateLine(xn, yn, 1.)
+    finite = N.isfinite(xn) & N.isfinite(yn)
+    dfinite = N.isfinite(xd) & N.isfinite(yd)
+    out.append('runs %i points, %i non-finite' % (
+        len(xd), N.count_nonzero(~dfinite)))
+    assert N.count_nonzero(~dfinite) == N.count_nonzero(~finite)
+
+    # each finite part keeps its own column extremes
+    bounds = N.flatnonzero(N.diff(finite.astype(int)) != 0) + 1
+    dbounds = N.flatnonzero(N.diff(dfinite.astype(int)) != 0) + 1
+    for part, dpart in zip(
+            N.split(N.arange(len(xn)), bounds),
+            N.split(N.arange(len(xd)), dbounds)):
+        if finite[part[0]]:
+            checkColumns(xn[part], yn[part], xd[dpart], yd[dpart], 1.)
+    out.append('parts %i' % (len(bounds)+1))
+
+    # nothing is finite
+    xa, ya = decimateLine(x, N.full(len(x), N.nan), 1.)
+    out.append('all non-finite %i' % len(xa))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testDecimate(out)
+    testNonFinite(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,72 @@
+"""Test keeping float32 data when importing and reloading HDF5."""
+
+import os
+import sys
+import tempfile
+
+import h5py
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.dataimport
+import veusz.document as document
+
+def makeDocument(datafile):
+    with h5py.File(datafile, 'w') as f:
+        f['ints'] = N.array([30000, 30000, 20000, 10000], dtype=N.int16)
+        f['floats'] = N.array([1.5, 2.5, 3.5, 4.5], dtype=N.float32)
+
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.ImportFileHDF5(datafile, ['/ints', '/floats'], native_dtype=True)
+    ifc.Add('page', name='p', autoadd=False)
+    ifc.Add('graph', name='g', widget='/p', autoadd=False)
+    ifc.To('/p/g')
+    ifc.Add('axis', name='x', autoadd=False)
+    ifc.Add('axis', name='y', autoadd=False)
+    ifc.Set('y/direction', 'vertical')
+    ifc.Add('xy', name='xy', xData='floats', yData='ints', autoadd=False)
+    ifc.Add('histo', name='h', data='ints', autoadd=False)
+    return doc
+
+def plot(doc, out, label):
+    dpi = (50, 50)
+    size = doc.pageSize(0, dpi=dpi)
+    phelper = document.PaintHelper(doc, size, dpi=dpi)
+    doc.paintTo(phelper, 0)
+    img = qt.QImage(size[0], size[1], qt.QImage.Format.Format_ARGB32)
+    img.fill(qt.Qt.GlobalColor.white)
+    painter = qt.QPainter(img)
+    phelper.renderToPainter(painter)
+    painter.end()
+
+    out.append('%s ints %s floats %s sum %s' % (
+        label, doc.data['ints'].data.dtype, doc.data['floats'].data.dtype,
+        float(doc.data['ints'].data.sum())))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    tempdir = tempfile.mkdtemp()
+    datafile = os.path.join(tempdir, 'data.hdf5')
+    filename = os.path.join(tempdir, 'test.vszh5')
+    try:
+        doc = makeDocument(datafile)
+        plot(doc, out, 'imported')
+
+        # integers are plotted as floating point values after reloading
+        doc.save(filename, mode='hdf5')
+        doc2 = document.Document()
+        doc2.load(filename, mode='hdf5')
+        plot(doc2, out, 'reloaded')
+    finally:
+        for name in os.listdir(tempdir):
+            os.unlink(os.path.join(tempdir, name))
+        os.rmdir(tempdir)
+
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,104 @@
+"""Test saving and loading HDF5 documents."""
+
+import datetime
+import os
+import sys
+import tempfile
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.datasets as datasets
+
+def makeDocument():
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('x', N.arange(5.), symerr=N.full(5, 0.5))
+    ifc.SetData('ints', N.arange(4, dtype=N.int32))
+    ifc.SetDataRing('r', 3, val=[1, 2, 3, 4])
+    ifc.SetData2D('z', N.arange(6.).reshape((2, 3)), xrange=(0, 3),
+                  yrange=(0, 2))
+    ifc.SetDataText('t', ['a', 'b c'])
+    ifc.SetDataDateTime('d', [datetime.datetime(2020, 1, 2, 3, 4, 5)])
+    ifc.TagDatasets('mytag', ['x', 'r'])
+    ifc.Add('page', name='p')
+    ifc.Add('graph', name='g', widget='/p', autoadd=False)
+    ifc.Set('/p/g/leftMargin', '2cm')
+    return doc
+
+def describe(doc, out):
+    for name in sorted(doc.data):
+        ds = doc.data[name]
+        vals = [
+            getattr(ds, col).tolist() if isinstance(
+                getattr(ds, col), N.ndarray) else getattr(ds, col)
+            for col in ('data', 'serr') if getattr(ds, col, None) is not None ]
+        out.append('%s %s %s %s' % (
+            name, type(ds).__name__, sorted(ds.tags), vals))
+    out.append('margin %s' % doc.resolveSettingPath(
+        None, '/p/g/leftMargin').val)
+
+def testUndo(filename, out):
+    """Datasets only kept by the undo history are not lost when
+    saving over the file they are read from."""
+    makeDocument().save(filename, mode='hdf5')
+
+    doc = document.Document()
+    doc.load(filename, mode='hdf5')
+    ifc = document.CommandInterface(doc)
+    doc.data['z'].data
+    doc.applyOperation(document.OperationDatasetDelete('x'))
+    doc.applyOperation(document.OperationDatasetDelete('z'))
+    ifc.SetData('ints', [5., 6.])
+    doc.save(filename, mode='hdf5')
+
+    for i in range(3):
+        doc.undoOperation()
+    out.append('undone %s %s %s' % (
+        doc.data['x'].data.tolist(), doc.data['z'].data.tolist(),
+        doc.data['ints'].data.tolist()))
+
+    # and they are saved again
+    doc.save(filename, mode='hdf5')
+    doc2 = document.Document()
+    doc2.load(filename, mode='hdf5')
+    describe(doc2, out)
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    tempdir = tempfile.mkdtemp()
+    filename = os.path.join(tempdir, 'test.vszh5')
+    try:
+        doc = makeDocument()
+        doc.save(filename, mode='hdf5')
+
+        # datasets are read when first used
+        doc2 = document.Document()
+        doc2.load(filename, mode='hdf5')
+        out.append('lazy %s' % sorted(
+            name for name, ds in doc2.data.items()
+            if isinstance(ds, datasets.DatasetLazyMixin)))
+        describe(doc2, out)
+
+        # saving over the file the data are read from
+        doc2.save(filename, mode='hdf5')
+        assert isinstance(doc2.data['r'], datasets.DatasetRing)
+
+        doc3 = document.Document()
+        doc3.load(filename, mode='hdf5')
+        describe(doc3, out)
+
+        testUndo(filename, out)
+    finally:
+        for name in os.listdir(tempdir):
+            os.unlink(os.path.join(tempdir, name))
+        os.rmdir(tempdir)
+
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,102 @@
+"""Test writing HDF5 documents, copying unchanged datasets."""
+
+import os
+import sys
+import tempfile
+
+import numpy as N
+import h5py
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+from veusz.document import hdf5save
+
+def makeDocument():
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('big', N.arange(100000.))
+    ifc.SetData('used', N.arange(5.), symerr=N.full(5, 0.5))
+    ifc.SetData('changed', N.arange(3.))
+    ifc.SetData('renamed', N.arange(4.))
+    ifc.SetData2D('z', N.arange(6.).reshape((2, 3)), xrange=(0, 3),
+                  yrange=(0, 2))
+    return doc
+
+def saveCopied(doc, filename, options=None):
+    """Save document, returning names of datasets copied."""
+    copied = {}
+    def writefn(f):
+        copied.update(doc.saveToHDF5File(f, options=options))
+        return copied
+    hdf5save.writeHDF5Document(filename, writefn)
+    return sorted(copied.values())
+
+def testSave(tempdir, out):
+    filename = os.path.join(tempdir, 'test.vszh5')
+    options = hdf5save.HDF5SaveOptions(threads=2, minbytes=1024)
+    out.append('first save copied %s' % saveCopied(
+        makeDocument(), filename, options))
+    with h5py.File(filename, 'r') as f:
+        big = f['Veusz/Data/big/data']
+        out.append('compressed %s %s %s' % (
+            big.compression, big.shuffle, big.chunks is not None))
+
+    # unchanged datasets are copied from the file read from
+    doc = document.Document()
+    doc.load(filename, mode='hdf5')
+    ifc = document.CommandInterface(doc)
+    doc.data['used'].data
+    doc.data['changed'].writableColumn('data')[0] = 10.
+    doc.applyOperation(document.OperationDatasetRename('renamed', 'newname'))
+    out.append('resave copied %s' % saveCopied(doc, filename))
+    out.append('files %s' % os.listdir(tempdir))
+
+    # references between items of copied datasets are kept
+    with h5py.File(filename, 'r') as f:
+        zdata = f['Veusz/Data/z/data']
+        out.append('reference %s %s' % (
+            f[zdata.attrs['vsz_xrange']].name,
+            f[zdata.attrs['vsz_xrange']][()].tolist()))
+
+    doc2 = document.Document()
+    doc2.load(filename, mode='hdf5')
+    for name in sorted(doc2.data):
+        out.append('%s %s' % (name, doc2.data[name].data.tolist()[:5]))
+
+def testFailure(tempdir, out):
+    filename = os.path.join(tempdir, 'fail.vszh5')
+    makeDocument().save(filename, mode='hdf5')
+    with open(filename, 'rb') as f:
+        before = f.read()
+
+    # the existing file is kept if writing fails
+    def writefn(f):
+        f.create_group('Veusz')
+        raise RuntimeError('disk full')
+    try:
+        hdf5save.writeHDF5Document(filename, writefn)
+    except RuntimeError as e:
+        out.append('failed %s' % e)
+    with open(filename, 'rb') as f:
+        out.append('unchanged %s' % (f.read() == before))
+    out.append('files %s' % sorted(os.listdir(tempdir)))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    tempdir = tempfile.mkdtemp()
+    try:
+        testSave(tempdir, out)
+        os.unlink(os.path.join(tempdir, 'test.vszh5'))
+        testFailure(tempdir, out)
+    finally:
+        for name in os.listdir(tempdir):
+            os.unlink(os.path.join(tempdir, name))
+        os.rmdir(tempdir)
+
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
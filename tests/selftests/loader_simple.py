@@ -0,0 +1,87 @@
+"""Test loading plain documents without exec."""
+
+import io
+import sys
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.dataimport
+import veusz.document as document
+from veusz.document import loader
+
+script = '''SetData('x', [1.0, 2.0, 3.0], symerr=[0.1, 0.1, 0.1])
+SetDataRing('r', 4, errors=())
+AppendData('r', [5.0, 6.0])
+Add('page', name='page1', autoadd=False)
+To('page1')
+Add('graph', name='graph1', autoadd=False)
+To('graph1')
+Add('axis', name='x', autoadd=False)
+Add('axis', name='y', autoadd=False)
+Set('y/direction', 'vertical')
+Add('xy', name='xy1', autoadd=False)
+To('xy1')
+Set('xData', 'x')
+SetToReference('MarkerFill/color', '/StyleSheet/xy/MarkerFill/color')
+To('..')
+To('..')
+'''
+
+def testParse(out):
+    ifc = document.CommandInterface(document.Document())
+    commands = loader._parseSimpleScript(script, 'test.vsz', ifc)
+    out.append('parsed %i commands' % len(commands))
+    out.append('first %s' % (commands[0],))
+    out.append('append %r' % (commands[2],))
+
+    # scripts which are not simple are run with exec
+    for text in ('x = 1\n', "Set('a', 1+1)\n", "foo('a')\n",
+                 "Set(*args)\n", "AppendData('r', [float('nan')])\n",
+                 'Set(\n'):
+        out.append('not simple %r %s' % (
+            text, loader._parseSimpleScript(text, 'test.vsz', ifc)))
+
+def loadScript(text):
+    doc = document.Document()
+    loader.executeScript(doc, 'test.vsz', text)
+    doc.setModified(False)
+    doc.clearHistory()
+    return doc
+
+def saveText(doc):
+    f = io.StringIO()
+    doc.saveToFile(f)
+    # skip the header with the date and version
+    return [l for l in f.getvalue().splitlines() if not l.startswith('#')]
+
+def testLoad(out):
+    doc = loadScript(script)
+    xy = doc.resolveWidgetPath(None, '/page1/graph1/xy1')
+    out.append('loaded %s %s' % (xy.path, xy.settings.xData))
+    out.append('ring %s' % doc.data['r'].data.tolist())
+    out.append('reference %s' % (
+        xy.settings.get('MarkerFill').get('color').isReference(),))
+
+    # the fast loader gives the same document as exec
+    doc2 = loadScript(script + 'y = 1\n')
+    assert saveText(doc) == saveText(doc2)
+    saved = saveText(doc)
+    assert saveText(loadScript('\n'.join(saved) + '\n')) == saved
+    out.append('saved %i lines' % len(saved))
+
+    # errors give the line number
+    try:
+        loadScript("Add('page')\nSet('nonexistent', 1)\n")
+    except loader.LoadError as e:
+        out.append('error %s' % e)
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testParse(out)
+    testLoad(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,85 @@
+"""Test that cached resolutions of setting references are updated."""
+
+import sys
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.setting as setting
+
+def makeDocument():
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.Add('page', name='page1', autoadd=False)
+    ifc.Add('graph', name='graph1', widget='/page1', autoadd=False)
+    ifc.To('/page1/graph1')
+    ifc.Add('xy', name='a', autoadd=False)
+    ifc.Add('xy', name='b', autoadd=False)
+    ifc.Set('a/PlotLine/color', 'red')
+    ifc.SetToReference('b/PlotLine/color', '../../../a/PlotLine/color')
+    return doc, ifc
+
+def lineColor(doc):
+    return doc.resolveSettingPath(None, '/page1/graph1/b/PlotLine/color').val
+
+def testReference(out):
+    doc, ifc = makeDocument()
+    setting.referencecounter.reset()
+    out.append('color %s %s' % (lineColor(doc), lineColor(doc)))
+    out.append('lookups %i cached %i' % (
+        setting.referencecounter.lookups, setting.referencecounter.cached))
+
+    # changing the target value
+    ifc.Set('a/PlotLine/color', 'green')
+    out.append('target changed %s' % lineColor(doc))
+
+    # the reference resolves to a different widget after renaming
+    ifc.Rename('a', 'c')
+    ifc.Add('xy', name='a', autoadd=False)
+    ifc.Set('a/PlotLine/color', 'blue')
+    out.append('renamed %s' % lineColor(doc))
+
+    # undoing changes the tree back
+    doc.undoOperation()
+    out.append('undo set %s' % lineColor(doc))
+    doc.undoOperation()
+    try:
+        lineColor(doc)
+    except setting.Reference.ResolveException:
+        out.append('undo add')
+    doc.undoOperation()
+    out.append('undo rename %s' % lineColor(doc))
+
+    # removing the target breaks the reference
+    ifc.Remove('a')
+    try:
+        lineColor(doc)
+    except setting.Reference.ResolveException:
+        out.append('removed target')
+    doc.undoOperation()
+    out.append('restored %s' % lineColor(doc))
+
+def testMultiple(out):
+    doc, ifc = makeDocument()
+    ifc.Add('xy', name='c', autoadd=False)
+    setn = doc.resolveSettingPath(None, '/page1/graph1/b/PlotLine/color')
+    setn.set(setting.ReferenceMultiple(
+        ['../../../a/PlotLine/color', '../../../c/PlotLine/color']))
+    out.append('multiple %s' % setn.val)
+
+    # settings which are not default override the others
+    ifc.Set('c/PlotLine/color', 'magenta')
+    out.append('multiple override %s' % setn.val)
+    doc.undoOperation()
+    out.append('multiple undone %s' % setn.val)
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testReference(out)
+    testMultiple(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
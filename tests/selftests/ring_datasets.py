@@ -0,0 +1,98 @@
+"""Test ring datasets and capturing into them."""
+
+import struct
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.datasets as datasets
+from veusz.dataimport import capture
+
+class ChunkStream(capture.CaptureStream):
+    """Capture stream returning data in the chunks given."""
+
+    def __init__(self, chunks):
+        capture.CaptureStream.__init__(self, binary=True)
+        self.chunks = list(chunks)
+
+    def getMoreData(self):
+        if self.chunks:
+            return self.chunks.pop(0)
+        return b''
+
+def frame(payload):
+    return struct.pack('<I', len(payload)) + payload
+
+def testRing(out):
+    ring = datasets.DatasetRing(4, data=[1, 2, 3], errors=('serr',))
+    out.append('ring %s %s %s' % (
+        ring.data.tolist(), ring.serr.tolist(), ring.userSize()))
+
+    # views are kept until the values change
+    view = ring.data
+    assert ring.data is view
+    assert not view.flags.writeable
+
+    # wrapping around the end of the buffers
+    ring.append([4, 5, 6], serr=[0.5, -0.5, 1])
+    assert ring.data is not view
+    out.append('wrapped %s %s' % (ring.data.tolist(), ring.serr.tolist()))
+
+    # appending more than the capacity keeps the last values
+    ring.append(N.arange(10.))
+    out.append('overfull %s' % ring.data.tolist())
+
+    ring.clear()
+    out.append('cleared %i %s' % (len(ring), ring.data.tolist()))
+
+def testRingUndo(out):
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetDataRing('r', 3, val=[1, 2])
+    ifc.AppendData('r', [3, 4])
+    out.append('appended %s' % doc.data['r'].data.tolist())
+    doc.undoOperation()
+    out.append('undone %s' % doc.data['r'].data.tolist())
+    doc.redoOperation()
+    out.append('redone %s' % doc.data['r'].data.tolist())
+
+def testCaptureTail(out):
+    doc = document.Document()
+    reader = capture.BinaryCaptureRead()
+    reader.tail = 3
+    stream = ChunkStream([frame(b'a'), frame(N.arange(2.).tobytes())])
+    reader.readData(stream)
+
+    op = capture.OperationDataCaptureSet(reader)
+    op.do(doc)
+    ring = doc.data['a']
+    changeset = ring.changeset
+    out.append('tail %s' % ring.data.tolist())
+
+    # new values are not seen by the document until published
+    stream.chunks.append(frame(N.arange(10., 14.).tobytes()))
+    reader.readData(stream)
+    out.append('unpublished %s %s' % (
+        ring.data.tolist(), reader.getDatasetCounts()))
+
+    op.undo(doc)
+    op = capture.OperationDataCaptureSet(reader)
+    op.do(doc)
+    assert doc.data['a'] is ring
+    assert ring.changeset > changeset
+    out.append('published %s' % doc.data['a'].data.tolist())
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testRing(out)
+    testRingUndo(out)
+    testCaptureTail(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,70 @@
+"""Test datasets sharing values with their copies and slices."""
+
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.datasets as datasets
+import veusz.document as document
+
+def tryWrite(array):
+    try:
+        array[0] = 100.
+    except ValueError:
+        return 'read-only'
+    return 'written'
+
+def test1D(out):
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('x', [1., 2., 3., 4.], symerr=[0.1, 0.2, 0.3, 0.4])
+    parent = doc.data['x']
+    copy = parent.returnCopy()
+    part = parent[1:3]
+    out.append('shared %s %s' % (
+        N.shares_memory(copy.data, parent.data),
+        N.shares_memory(part.serr, parent.serr)))
+
+    # neither side may be changed in place
+    out.append('write parent %s, copy %s, slice %s' % (
+        tryWrite(parent.data), tryWrite(copy.data), tryWrite(part.serr)))
+
+    # editing the parent leaves the copies unchanged
+    doc.applyOperation(document.OperationDatasetSetVal('x', 'data', 1, -2.))
+    doc.applyOperation(document.OperationDatasetSetVal('x', 'serr', 1, 9.))
+    out.append('parent %s %s' % (
+        doc.data['x'].data.tolist(), doc.data['x'].serr.tolist()))
+    out.append('copy %s slice %s %s' % (
+        copy.data.tolist(), part.data.tolist(), part.serr.tolist()))
+
+    # and the reverse
+    copy.writableColumn('data')[0] = 50.
+    out.append('edited copy %s parent %s' % (
+        copy.data.tolist(), doc.data['x'].data.tolist()))
+
+    doc.undoOperation()
+    doc.undoOperation()
+    out.append('undone %s %s' % (
+        doc.data['x'].data.tolist(), doc.data['x'].serr.tolist()))
+
+def test2D(out):
+    parent = datasets.Dataset2D(N.arange(6.).reshape(2, 3))
+    copy = parent.returnCopy()
+    out.append('2d write parent %s, copy %s' % (
+        tryWrite(parent.data), tryWrite(copy.data)))
+    parent.writableColumn('data')[0, 0] = 10.
+    out.append('2d parent %s copy %s' % (
+        parent.data.tolist(), copy.data.tolist()))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    test1D(out)
+    test2D(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,78 @@
+"""Test clipping sorted data to the visible range of axes."""
+
+import sys
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.datasets as datasets
+
+def testSortedIndexRange(out):
+    vals = N.arange(10.)
+    for minval, maxval, margin in (
+            (2.5, 5.5, 0), (2.5, 5.5, 1), (3., 5., 0), (-5., 2., 1),
+            (8.5, 20., 1), (20., 30., 1), (-9., -1., 0), (-N.inf, N.inf, 1)):
+        out.append('increasing %s %s %i %s' % (
+            minval, maxval, margin, datasets.sortedIndexRange(
+                vals, 1, minval, maxval, margin=margin)))
+
+    # the same values in decreasing order
+    rev = vals[::-1]
+    for minval, maxval, margin in ((2.5, 5.5, 0), (3., 5., 1), (8.5, 20., 1)):
+        start, stop = datasets.sortedIndexRange(
+            rev, -1, minval, maxval, margin=margin)
+        out.append('decreasing %s %s %i %s' % (
+            minval, maxval, margin, rev[start:stop].tolist()))
+
+    # only datasets of sorted finite values can be clipped
+    for data in ([1., 2., 3., 4.], [4., 3., 2., 1.], [1., 3., 2., 4.],
+                 [1., N.nan, 3., 4.]):
+        ds = datasets.Dataset(data=data)
+        out.append('dataset %s %s' % (data, ds.sortedIndexRange(2., 3.)))
+
+def testVisibleRange(out):
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('x', [1., 2., 3.])
+    ifc.Add('page', name='page1', autoadd=False)
+    ifc.Add('graph', name='graph1', widget='/page1', autoadd=False)
+    ifc.To('/page1/graph1')
+    ifc.Add('axis', name='x', autoadd=False)
+    ifc.Add('axis', name='y', autoadd=False)
+    ifc.Set('y/direction', 'vertical')
+    ifc.Add('xy', name='xy1', autoadd=False)
+    ifc.Set('x/min', 0.)
+    ifc.Set('x/max', 10.)
+
+    xy = doc.resolveWidgetPath(None, '/page1/graph1/xy1')
+    axes = xy.fetchAxes()
+    posn = [0., 0., 100., 50.]
+    for axis in axes:
+        axis.computePlottedRange(force=True)
+
+    clip = qt.QRectF(20., 0., 30., 50.)
+    out.append('visible %s' % (
+        tuple(round(float(v), 6) for v in xy.visibleDataRange(
+            axes[0], posn, clip)),))
+    out.append('margin %s' % (
+        tuple(round(float(v), 6) for v in xy.visibleDataRange(
+            axes[0], posn, clip, margin=10.)),))
+
+    # vertical axis runs from the bottom
+    axes[1].computePlottedRange(force=True)
+    out.append('vertical %s' % (
+        tuple(round(float(v), 6) for v in xy.visibleDataRange(
+            axes[1], posn, qt.QRectF(0., 0., 100., 25.))),))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testSortedIndexRange(out)
+    testVisibleRange(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,75 @@
+"""Test setting several values at once and the widget path index."""
+
+import sys
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.utils as utils
+
+def makeDocument():
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('x', [1., 2., 3.])
+    ifc.Add('page', name='page1', autoadd=False)
+    ifc.Add('graph', name='graph1', widget='/page1', autoadd=False)
+    ifc.To('/page1/graph1')
+    ifc.Add('axis', name='x', autoadd=False)
+    ifc.Add('axis', name='y', autoadd=False)
+    ifc.Set('y/direction', 'vertical')
+    ifc.Add('xy', name='xy1', autoadd=False)
+    doc.setModified(False)
+    doc.clearHistory()
+    return doc, ifc
+
+def testSetMany(out):
+    doc, ifc = makeDocument()
+
+    # no values is not a change
+    ifc.SetMany({})
+    out.append('empty %i %s' % (len(doc.historyundo), doc.isModified()))
+
+    ifc.SetMany({'leftMargin': '2cm', 'xy1/marker': 'square'})
+    out.append('setmany %s %s %i' % (
+        ifc.Get('leftMargin'), ifc.Get('xy1/marker'),
+        len(doc.historyundo)))
+
+    # nothing is changed if a value is invalid
+    try:
+        ifc.SetMany({'leftMargin': '3cm', 'xy1/marker': 'notamarker'})
+    except utils.InvalidType:
+        out.append('invalid %s' % ifc.Get('leftMargin'))
+
+    doc.undoOperation()
+    out.append('undone %s %s' % (ifc.Get('leftMargin'), ifc.Get('xy1/marker')))
+
+def testPathIndex(out):
+    doc, ifc = makeDocument()
+    xy = doc.resolveWidgetPath(None, '/page1/graph1/xy1')
+    assert doc.resolvePath(None, '/page1/graph1/xy1') is xy
+    assert (None, '/page1/graph1/xy1') in doc.pathindex
+
+    graph = doc.resolveWidgetPath(None, '/page1/graph1')
+    assert doc.resolveWidgetPath(graph, 'xy1') is xy
+    out.append('relative %s' % doc.resolveSettingPath(xy, '../x/direction').val)
+
+    # paths are forgotten when widgets are renamed
+    ifc.Rename('/page1/graph1/xy1', 'xy2')
+    out.append('index after rename %i' % len(doc.pathindex))
+    try:
+        doc.resolvePath(None, '/page1/graph1/xy1')
+    except ValueError as e:
+        out.append('renamed %s' % e)
+    out.append('new path %s' % (
+        doc.resolveWidgetPath(None, '/page1/graph1/xy2') is xy))
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    testSetMany(out)
+    testPathIndex(out)
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,83 @@
+"""Test saving and loading zip documents."""
+
+import datetime
+import os
+import sys
+import tempfile
+
+import numpy as N
+
+import veusz.qtall as qt
+import veusz.widgets
+import veusz.document as document
+import veusz.datasets as datasets
+from veusz.document import zipdoc
+
+def makeDocument():
+    doc = document.Document()
+    ifc = document.CommandInterface(doc)
+    ifc.SetData('x', N.arange(5.), symerr=N.full(5, 0.5))
+    ifc.SetData('ints', N.arange(4, dtype=N.int32))
+    ifc.SetDataRing('r', 3, val=[1, 2, 3, 4])
+    ifc.SetData2D('z', N.arange(6.).reshape((2, 3)), xrange=(0, 3),
+                  yrange=(0, 2))
+    ifc.SetDataText('t', ['a', 'b c'])
+    ifc.SetDataDateTime('d', [datetime.datetime(2020, 1, 2, 3, 4, 5)])
+    ifc.TagDatasets('mytag', ['x', 'r'])
+    ifc.Add('page', name='p')
+    ifc.Add('graph', name='g', widget='/p', autoadd=False)
+    ifc.Set('/p/g/leftMargin', '2cm')
+    return doc
+
+def describe(doc, out):
+    for name in sorted(doc.data):
+        ds = doc.data[name]
+        vals = [
+            getattr(ds, col).tolist() if isinstance(
+                getattr(ds, col), N.ndarray) else getattr(ds, col)
+            for col in ('data', 'serr') if getattr(ds, col, None) is not None ]
+        out.append('%s %s %s %s' % (
+            name, type(ds).__name__, sorted(ds.tags), vals))
+    out.append('margin %s' % doc.resolveSettingPath(
+        None, '/p/g/leftMargin').val)
+
+def mappedNames(doc, filename):
+    return sorted(
+        name for name, ds in doc.data.items()
+        for val in list(ds.__dict__.values()) +
+                   list(ds.__dict__.get('_lazyvals', {}).values())
+        if zipdoc._isMappedFrom(val, filename) )
+
+def main(outfile):
+    app = qt.QApplication([])
+    out = []
+    tempdir = tempfile.mkdtemp()
+    filename = os.path.join(tempdir, 'test.vszz')
+    try:
+        doc = makeDocument()
+        doc.save(filename, mode='zip')
+
+        doc2 = document.Document()
+        doc2.load(filename, mode='zip')
+        describe(doc2, out)
+        out.append('mapped %s' % mappedNames(doc2, os.path.abspath(filename)))
+
+        # saving over the file the data are mapped from
+        doc2.save(filename, mode='zip')
+        out.append('mapped after save %s' % mappedNames(
+            doc2, os.path.abspath(filename)))
+        assert isinstance(doc2.data['r'], datasets.DatasetRing)
+
+        doc3 = document.Document()
+        doc3.load(filename, mode='zip')
+        describe(doc3, out)
+    finally:
+        for name in os.listdir(tempdir):
+            os.unlink(os.path.join(tempdir, name))
+        os.rmdir(tempdir)
+
+    with open(outfile, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+if __name__ == '__main__':
+    main(sys.argv[1])
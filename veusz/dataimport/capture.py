@@ -22,9 +22,13 @@ import os
 import socket
 import platform
 import signal
+import struct
+
+import numpy as N
 
 from .. import qtall as qt
 from .. import utils
+from .. import datasets
 from . import simpleread
 
 def _(text, disambiguation=None, context="Capture"):
@@ -34,14 +38,25 @@ class CaptureFinishException(Exception):
     """An exception to say when a stream has been finished."""
 
 class CaptureStream(simpleread.Stream):
-    """A special stream for capturing data."""
+    """A special stream for capturing data.
 
-    def __init__(self):
+    If binary is set, the stream is read as a series of frames (see
+    readFrame) rather than as lines of text.
+    """
+
+    # maximum number of bytes of binary frames to read in one go
+    maxcontinuousbytes = 4*1024*1024
+    # larger binary frames are assumed to come from a corrupt stream
+    maxframebytes = 64*1024*1024
+
+    def __init__(self, binary=False):
         """Initialise the stream."""
 
         simpleread.Stream.__init__(self)
-        self.buffer = ''
+        self.binary = binary
+        self.buffer = bytearray() if binary else ''
         self.continuousreads = 0
+        self.continuousbytes = 0
         self.bytesread = 0
         self.linesread = 0
         self.maxlines = None
@@ -63,7 +78,7 @@ class CaptureStream(simpleread.Stream):
     def getMoreData(self):
         """Override this to return more data from the source without
         blocking."""
-        return ''
+        return self.buffer[:0]
 
     def readLine(self):
         """Return a new line of data.
@@ -102,6 +117,46 @@ class CaptureStream(simpleread.Stream):
                 self.bytesread += len(data)
                 self.buffer += data
 
+    def readFrame(self):
+        """Return the payload of the next binary frame.
+
+        Frames consist of a little-endian unsigned 32 bit byte count,
+        followed by that number of bytes.
+
+        Raises StopIteration if there is no complete frame available,
+        or too much data has been read in one go. Raises
+        CaptureFinishException if a frame is larger than
+        maxframebytes."""
+
+        while True:
+            if self.timedout:
+                raise CaptureFinishException("Maximum time period occurred")
+
+            # let the event loop run if there is a lot of data
+            if self.continuousbytes >= self.maxcontinuousbytes:
+                self.continuousbytes = 0
+                raise StopIteration
+
+            buf = self.buffer
+            if len(buf) >= 4:
+                length = struct.unpack_from('<I', buf)[0]
+                if length > self.maxframebytes:
+                    raise CaptureFinishException(
+                        "Frame of %i bytes is too large" % length)
+                if len(buf) >= length+4:
+                    frame = bytes(buf[4:length+4])
+                    del buf[:length+4]
+                    self.continuousbytes += length+4
+                    return frame
+
+            # not a complete frame, so read some more data
+            data = self.getMoreData()
+            if not data:
+                self.continuousbytes = 0
+                raise StopIteration
+            self.bytesread += len(data)
+            buf += data
+
     def close(self):
         """Close any allocated object."""
         pass
@@ -109,15 +164,15 @@ class CaptureStream(simpleread.Stream):
 class FileCaptureStream(CaptureStream):
     """Capture from a file or named pipe."""
 
-    def __init__(self, filename):
-        CaptureStream.__init__(self)
+    def __init__(self, filename, binary=False):
+        CaptureStream.__init__(self, binary=binary)
 
         # open file
-        self.fileobj = open(filename, 'rU')
+        self.fileobj = open(filename, 'rb' if binary else 'r')
 
         # make new thread to read file
         self.readerthread = utils.NonBlockingReaderThread(
-            self.fileobj, exiteof=False)
+            self.fileobj, exiteof=False, binary=binary)
         self.readerthread.start()
 
         self.name = filename
@@ -139,18 +194,19 @@ class FileCaptureStream(CaptureStream):
 class CommandCaptureStream(CaptureStream):
     """Capture from an external program."""
 
-    def __init__(self, commandline):
+    def __init__(self, commandline, binary=False):
         """Capture from commandline - this is passed to the shell."""
-        CaptureStream.__init__(self)
+        CaptureStream.__init__(self, binary=binary)
 
         self.name = commandline
         self.popen = subprocess.Popen(
             commandline, shell=True,
             bufsize=0, stdout=subprocess.PIPE,
-            universal_newlines=True)
+            universal_newlines=not binary)
 
         # make new thread to read stdout
-        self.readerthread = utils.NonBlockingReaderThread(self.popen.stdout)
+        self.readerthread = utils.NonBlockingReaderThread(
+            self.popen.stdout, binary=binary)
         self.readerthread.start()
 
     def getMoreData(self):
@@ -188,9 +244,12 @@ class CommandCaptureStream(CaptureStream):
 class SocketCaptureStream(CaptureStream):
     """Capture from an internet host."""
 
-    def __init__(self, host, port):
+    # number of bytes to ask for in each read
+    recvsize = {False: 1024, True: 65536}
+
+    def __init__(self, host, port, binary=False):
         """Connect to host and port specified."""
-        CaptureStream.__init__(self)
+        CaptureStream.__init__(self, binary=binary)
 
         self.name = '%s:%i' % (host, port)
         try:
@@ -219,19 +278,146 @@ class SocketCaptureStream(CaptureStream):
         i, o, e = select.select([self.socket], [], [], 0)
         if i:
             try:
-                retn = self.socket.recv(1024)
+                retn = self.socket.recv(self.recvsize[self.binary])
             except socket.error as e:
                 self._handleSocketError(e)
             if len(retn) == 0:
                 raise CaptureFinishException("Remote socket closed")
+            if self.binary:
+                return retn
             return retn.decode('utf-8', errors='ignore')
         else:
-            return ''
+            return self.buffer[:0]
 
     def close(self):
         """Close the socket."""
         self.socket.close()
 
+class CaptureBuffer:
+    """Growing buffer of captured numerical values."""
+
+    def __init__(self):
+        self.array = N.zeros(1024)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, vals):
+        """Add numpy array of values to the end of the buffer."""
+        num = len(vals)
+        if self.size+num > len(self.array):
+            # double size to make appending O(1) per value
+            newarray = N.zeros(max(2*len(self.array), self.size+num))
+            newarray[:self.size] = self.array[:self.size]
+            self.array = newarray
+        self.array[self.size:self.size+num] = vals
+        self.size += num
+
+    def getDataset(self, linkedfile=None):
+        """Return a dataset containing a copy of the values."""
+        return datasets.Dataset(
+            data=self.array[:self.size].copy(), linked=linkedfile)
+
+class BinaryCaptureRead:
+    """Interpret a binary capture stream, as an alternative to SimpleRead.
+
+    The first frame in the stream (see CaptureStream.readFrame) is a
+    header, giving the dataset names for each column as UTF-8 text
+    separated by whitespace. Each following frame contains rows of
+    little-endian float64 values, one value per column.
+
+    tail attribute if set says to only retain the last tail values,
+    which are stored in ring datasets. Values are read into private
+    rings, and only appended to the rings set in the document when
+    the output is set, so that repeated updates do not copy the data.
+    """
+
+    def __init__(self):
+        self.columns = None
+        self.buffers = []
+        self.rings = []
+        self.tail = None
+        self.errorcount = 0
+
+    def readData(self, stream):
+        """Read the available frames from the stream."""
+
+        while True:
+            try:
+                frame = stream.readFrame()
+            except StopIteration:
+                break
+
+            if self.columns is None:
+                self._readHeader(frame)
+            else:
+                self._readValues(stream, frame)
+
+    def _readHeader(self, frame):
+        """Read the column names from the header frame."""
+        names = frame.decode('utf-8', errors='ignore').split()
+        if not names:
+            raise CaptureFinishException("Invalid binary header")
+        self.columns = names
+        if self.tail:
+            self.buffers = [datasets.DatasetRing(self.tail) for n in names]
+            self.rings = [datasets.DatasetRing(self.tail) for n in names]
+        else:
+            self.buffers = [CaptureBuffer() for n in names]
+
+    def _readValues(self, stream, frame):
+        """Add a frame of values to the buffers."""
+
+        ncols = len(self.columns)
+        vals = N.frombuffer(frame, dtype='<f8', count=len(frame)//8)
+        nrows = len(vals) // ncols
+        if nrows*ncols*8 != len(frame):
+            # ignore incomplete rows
+            self.errorcount += 1
+
+        if stream.maxlines is not None:
+            nrows = min(nrows, stream.maxlines-stream.linesread)
+
+        vals = vals[:nrows*ncols].reshape((nrows, ncols))
+        for i, buf in enumerate(self.buffers):
+            buf.append(vals[:,i])
+
+        stream.linesread += nrows
+        if stream.linesread == stream.maxlines:
+            raise CaptureFinishException("Maximum number of lines read")
+
+    def getDatasetCounts(self):
+        """Get a dict of the datasets read and number of values."""
+        if self.rings:
+            return {
+                name: min(len(ring)+len(buf), self.tail)
+                for name, buf, ring in zip(
+                    self.columns, self.buffers, self.rings)
+            }
+        return {
+            name: len(buf) for name, buf in zip(self.columns or [], self.buffers)
+        }
+
+    def setOutput(self, out, linkedfile=None, prefix='', suffix=''):
+        """Set the data in the out dict.
+
+        If only the last values are retained, the values read since
+        the last call are appended to the ring datasets returned
+        before, so this should be called while holding the document
+        change lock.
+        """
+        if self.rings:
+            for name, buf, ring in zip(self.columns, self.buffers, self.rings):
+                if len(buf) != 0:
+                    ring.append(buf.data)
+                    buf.clear()
+                    ring.invalidateStats()
+                out[prefix+name+suffix] = ring
+        else:
+            for name, buf in zip(self.columns or [], self.buffers):
+                out[prefix+name+suffix] = buf.getDataset(linkedfile=linkedfile)
+
 class OperationDataCaptureSet:
     """An operation for setting the results from a SimpleRead into the
     document's data from a data capture.
@@ -242,31 +428,36 @@ class OperationDataCaptureSet:
     descr = _('data capture')
 
     def __init__(self, simplereadobject):
-        """Takes a simpleread object containing the data to be set."""
+        """Takes a simpleread object containing the data to be set
+        (or a BinaryCaptureRead)."""
         self.simplereadobject = simplereadobject
 
     def do(self, doc):
         """Set the data in the document."""
 
-        # set the data to the document and keep a list of what's changed
-        readdata = {}
-        self.simplereadobject.setOutput(readdata)
-
-        # keep a copy of datasets which have changed from backup
-        self.nameschanged = list(readdata)
-        self.olddata = {}
-        for name in self.nameschanged:
-            if name in doc.data:
-                self.olddata[name] = doc.data[name]
-            doc.setData(name, readdata[name])
+        # this is also called outside of applyOperation for updates
+        # while capturing, so take the lock here
+        with doc.change():
+            # set the data to the document and keep a list of what's changed
+            readdata = {}
+            self.simplereadobject.setOutput(readdata)
+
+            # keep a copy of datasets which have changed from backup
+            self.nameschanged = list(readdata)
+            self.olddata = {}
+            for name in self.nameschanged:
+                if name in doc.data:
+                    self.olddata[name] = doc.data[name]
+                doc.setData(name, readdata[name])
 
     def undo(self, doc):
         """Undo the results of the capture."""
 
-        for name in self.nameschanged:
-            if name in self.olddata:
-                # replace datasets with what was there previously
-                doc.setData(name, self.olddata[name])
-            else:
-                # or delete datasets that weren't there before
-                doc.deleteData(name)
+        with doc.change():
+            for name in self.nameschanged:
+                if name in self.olddata:
+                    # replace datasets with what was there previously
+                    doc.setData(name, self.olddata[name])
+                else:
+                    # or delete datasets that weren't there before
+                    doc.deleteData(name)
@@ -53,6 +53,7 @@ class ImportParamsFITS(base.ImportParamsBase):
      twodranges: map hdf names to 2d range (minx, miny, maxx, maxy)
      twod_as_oned: set of hdf names to read 2d dataset as 1d dataset
      wcsmodes: how to treat wcs when importing
+     native_dtype: keep float32 data without converting
     """
 
     defaults = {
@@ -62,6 +63,7 @@ class ImportParamsFITS(base.ImportParamsBase):
         'twodranges': None,
         'twod_as_oned': None,
         'wcsmodes': None,
+        'native_dtype': False,
     }
     defaults.update(base.ImportParamsBase.defaults)
 
@@ -132,7 +134,7 @@ class OperationDataImportFITS(base.OperationDataImportBase):
 
             # finally return data
             objdata = fits_hdf5_helpers.convertDatasetToObject(
-                data, aslice)
+                data, aslice, native=self.params.native_dtype)
             dsread[name] = _DataRead(dsname, objdata, options)
 
         except fits_hdf5_helpers.ConvertError:
@@ -287,6 +289,7 @@ class OperationDataImportFITS(base.OperationDataImportBase):
         """Convert numeric data to a veusz dataset."""
 
         data = dread.data
+        native = self.params.native_dtype
 
         ds = None
         if data.ndim == 1:
@@ -306,7 +309,7 @@ class OperationDataImportFITS(base.OperationDataImportBase):
                 if args[a] is not None and len(args[a]) > minlen:
                     args[a] = args[a][:minlen]
 
-            ds = datasets.Dataset(**args)
+            ds = datasets.Dataset(native=native, **args)
 
         elif data.ndim == 2:
             # 2D dataset
@@ -316,10 +319,12 @@ class OperationDataImportFITS(base.OperationDataImportBase):
                  data.shape[1] in (2,3) ):
                 # actually a 1D dataset in disguise
                 if data.shape[1] == 2:
-                    ds = datasets.Dataset(data=data[:,0], serr=data[:,1])
+                    ds = datasets.Dataset(
+                        data=data[:,0], serr=data[:,1], native=native)
                 else:
                     ds = datasets.Dataset(
-                        data=data[:,0], perr=data[:,1], nerr=data[:,2])
+                        data=data[:,0], perr=data[:,1], nerr=data[:,2],
+                        native=native)
             else:
                 # this really is a 2D dataset
 
@@ -342,11 +347,11 @@ class OperationDataImportFITS(base.OperationDataImportBase):
                     attrs["yrange"] = (r[1], r[3])
 
                 # create the object
-                ds = datasets.Dataset2D(data, **attrs)
+                ds = datasets.Dataset2D(data, native=native, **attrs)
 
         else:
             # N-dimensional dataset
-            ds = datasets.DatasetND(data)
+            ds = datasets.DatasetND(data, native=native)
 
         return ds
 
@@ -400,6 +405,7 @@ def ImportFileFITS(
         twodranges=None,
         twod_as_oned=None,
         wcsmodes=None,
+        native_dtype=False,
         prefix='', suffix='',
         renames=None,
         linked=False):
@@ -447,6 +453,9 @@ def ImportFileFITS(
       'linear_wcs': linear coordinate system from the WCS keywords
       'fraction':   fractional values from 0 to 1.
 
+    native_dtype: if set, keep float32 data in its original type to
+    save memory, instead of converting to float64
+
     renames is an optional dict mapping old to new dataset names, to
     be renamed after importing
 
@@ -482,6 +491,7 @@ def ImportFileFITS(
         twodranges=twodranges,
         twod_as_oned=twod_as_oned,
         wcsmodes=wcsmodes,
+        native_dtype=native_dtype,
         prefix=prefix, suffix=suffix,
         renames=renames,
         linked=linked)
@@ -75,6 +75,7 @@ class ImportParamsHDF5(base.ImportParamsBase):
      twodranges: map hdf names to 2d range (minx, miny, maxx, maxy)
      twod_as_oned: set of hdf names to read 2d dataset as 1d dataset
      convert_datetime: map float or strings to datetime
+     native_dtype: keep float32 data without converting
     """
 
     defaults = {
@@ -84,6 +85,7 @@ class ImportParamsHDF5(base.ImportParamsBase):
         'twodranges': None,
         'twod_as_oned': None,
         'convert_datetime': None,
+        'native_dtype': False,
     }
     defaults.update(base.ImportParamsBase.defaults)
 
@@ -159,7 +161,7 @@ class OperationDataImportHDF5(base.OperationDataImportBase):
 
             # finally return data
             objdata = fits_hdf5_helpers.convertDatasetToObject(
-                dataset, aslice)
+                dataset, aslice, native=self.params.native_dtype)
             dsread[name] = _DataRead(dsname, objdata, options)
 
         except fits_hdf5_helpers.ConvertError:
@@ -253,6 +255,7 @@ class OperationDataImportHDF5(base.OperationDataImportBase):
         """Convert numeric data to a veusz dataset."""
 
         data = dread.data
+        native = self.params.native_dtype
 
         ds = None
         if data.ndim == 1:
@@ -286,7 +289,7 @@ class OperationDataImportHDF5(base.OperationDataImportBase):
                     if args[a] is not None and len(args[a]) > minlen:
                         args[a] = args[a][:minlen]
 
-                ds = datasets.Dataset(**args)
+                ds = datasets.Dataset(native=native, **args)
 
         elif data.ndim == 2:
             # 2D dataset
@@ -296,10 +299,12 @@ class OperationDataImportHDF5(base.OperationDataImportBase):
                  data.shape[1] in (2,3) ):
                 # actually a 1D dataset in disguise
                 if data.shape[1] == 2:
-                    ds = datasets.Dataset(data=data[:,0], serr=data[:,1])
+                    ds = datasets.Dataset(
+                        data=data[:,0], serr=data[:,1], native=native)
                 else:
                     ds = datasets.Dataset(
-                        data=data[:,0], perr=data[:,1], nerr=data[:,2])
+                        data=data[:,0], perr=data[:,1], nerr=data[:,2],
+                        native=native)
             else:
                 # this really is a 2D dataset
 
@@ -322,11 +327,11 @@ class OperationDataImportHDF5(base.OperationDataImportBase):
                     attrs["yrange"] = (r[1], r[3])
 
                 # create the object
-                ds = datasets.Dataset2D(data, **attrs)
+                ds = datasets.Dataset2D(data, native=native, **attrs)
 
         else:
             # N-dimensional dataset
-            ds = datasets.DatasetND(data)
+            ds = datasets.DatasetND(data, native=native)
 
         return ds
 
@@ -416,6 +421,7 @@ def ImportFileHDF5(comm, filename,
                    twodranges=None,
                    twod_as_oned=None,
                    convert_datetime=None,
+                   native_dtype=False,
                    prefix='', suffix='',
                    renames=None,
                    linked=False):
@@ -454,6 +460,9 @@ def ImportFileHDF5(comm, filename,
        for a text dataset, this should give the format of the date/time,
           e.g. 'YYYY-MM-DD|T|hh:mm:ss' or 'iso' for iso format
 
+    native_dtype: if set, keep float32 data in its original type to
+    save memory, instead of converting to float64
+
     renames is a dict mapping old to new dataset names, to be renamed
     after importing
 
@@ -490,6 +499,7 @@ def ImportFileHDF5(comm, filename,
         twodranges=twodranges,
         twod_as_oned=twod_as_oned,
         convert_datetime=convert_datetime,
+        native_dtype=native_dtype,
         prefix=prefix, suffix=suffix,
         renames=renames,
         linked=linked)
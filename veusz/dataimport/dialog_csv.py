@@ -23,6 +23,7 @@ from ..dialogs import importdialog, veuszdialog
 from .. import utils
 from . import defn_csv
 from . import base
+from . import preview
 
 def _(text, disambiguation=None, context="Import_CSV"):
     return qt.QCoreApplication.translate(context, text, disambiguation)
@@ -57,6 +58,13 @@ class ImportTabCSV(importdialog.ImportTab):
             self.dialog.slotUpdatePreview)
         self.csvtextdelimitercombo.editTextChanged.connect(
             self.dialog.slotUpdatePreview)
+        # settings which change the datasets read in the preview summary
+        for combo in (self.csvheadermodecombo, self.csvdirectioncombo,
+                      self.csvnumfmtcombo):
+            combo.currentIndexChanged.connect(self.dialog.slotUpdatePreview)
+        for spin in (self.csvignorehdrspin, self.csvignoretopspin):
+            spin.valueChanged.connect(self.dialog.slotUpdatePreview)
+        self.csvblanksdatacheck.toggled.connect(self.dialog.slotUpdatePreview)
         self.csvdelimitercombo.default = csv_delimiters
         self.csvtextdelimitercombo.default = csv_text_delimiters
         self.csvdatefmtcombo.default = [
@@ -152,49 +160,64 @@ class ImportTabCSV(importdialog.ImportTab):
                     item = qt.QTableWidgetItem(rows[r][c])
                     t.setItem(r, c, item)
 
+        self.previewSummary(filename, encoding)
         return True
 
-    def doImport(self, doc, filename, linked, encoding, prefix, suffix, tags):
-        """Import from CSV file."""
-
-        # get various values
-        inrows = self.csvdirectioncombo.currentIndex() == 1
+    def previewSummary(self, filename, encoding):
+        """Show datasets which would be read from a sample of the file."""
 
+        self.previewsummary.setText('')
         try:
-            delimiter = self.getCSVDelimiter()
-            textdelimiter = str(self.csvtextdelimitercombo.currentText())
-        except UnicodeEncodeError:
+            sample = preview.FileSample(filename, encoding)
+            out = preview.previewCSV(
+                sample, self.makeParams(filename, encoding))
+        except (EnvironmentError, UnicodeError, LookupError,
+                base.ImportingError, csv.Error):
             return
 
-        skipwhitespace = self.csvskipwhitespacecheck.isChecked()
-        numericlocale = csvLocaleIndexToLocale(
-            self.csvnumfmtcombo.currentIndex() )
-        headerignore = self.csvignorehdrspin.value()
-        rowsignore = self.csvignoretopspin.value()
-        blanksaredata = self.csvblanksdatacheck.isChecked()
-        dateformat = self.csvdatefmtcombo.currentText()
-        headermode = ('multi', '1st', 'none')[
-            self.csvheadermodecombo.currentIndex()]
+        # dataset lengths only scale with the file size if in columns
+        samplelines = 0 if self.csvdirectioncombo.currentIndex() == 1 else (
+            len(sample.headlines))
+        self.previewsummary.setText(
+            '\n'.join(sample.describe(out, samplelines)))
 
-        # create import parameters and operation objects
-        params = defn_csv.ImportParamsCSV(
+    def makeParams(self, filename, encoding, **args):
+        """Make import parameters from the controls.
+
+        args are any additional parameters to set."""
+
+        return defn_csv.ImportParamsCSV(
             filename=filename,
-            readrows=inrows,
+            readrows=self.csvdirectioncombo.currentIndex() == 1,
             encoding=encoding,
-            delimiter=delimiter,
-            skipwhitespace=skipwhitespace,
-            textdelimiter=textdelimiter,
-            headerignore=headerignore,
-            rowsignore=rowsignore,
-            blanksaredata=blanksaredata,
-            numericlocale=numericlocale,
-            dateformat=dateformat,
-            headermode=headermode,
-            prefix=prefix, suffix=suffix,
-            tags=tags,
-            linked=linked,
+            delimiter=self.getCSVDelimiter(),
+            skipwhitespace=self.csvskipwhitespacecheck.isChecked(),
+            textdelimiter=str(self.csvtextdelimitercombo.currentText()),
+            headerignore=self.csvignorehdrspin.value(),
+            rowsignore=self.csvignoretopspin.value(),
+            blanksaredata=self.csvblanksdatacheck.isChecked(),
+            numericlocale=csvLocaleIndexToLocale(
+                self.csvnumfmtcombo.currentIndex()),
+            dateformat=self.csvdatefmtcombo.currentText(),
+            headermode=('multi', '1st', 'none')[
+                self.csvheadermodecombo.currentIndex()],
+            **args
         )
 
+    def doImport(self, doc, filename, linked, encoding, prefix, suffix, tags):
+        """Import from CSV file."""
+
+        # create import parameters and operation objects
+        try:
+            params = self.makeParams(
+                filename, encoding,
+                prefix=prefix, suffix=suffix,
+                tags=tags,
+                linked=linked,
+            )
+        except UnicodeEncodeError:
+            return
+
         try:
             op = defn_csv.OperationDataImportCSV(params)
 
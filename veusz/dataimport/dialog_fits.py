@@ -43,57 +43,45 @@ def loadFITSModule():
         except ImportError:
             pass
 
-def makeimagenode(parent, hdu, idx, name, dispname, datanodes):
-    """Node for image-like HDUs."""
-
-    if hdu.data is None:
-        return fits_hdf5_tree.EmptyDataNode(parent, name, dispname)
-
-    attrs, colattrs = fits_hdf5_helpers.hduVeuszAttrs(hdu)
-    datatype = 'numeric'
-    shape = hdu.shape
-
-    node = fits_hdf5_tree.FileDataNode(
-        parent,
-        name,
-        attrs,
-        datatype,
-        str(hdu.header.get('BITPIX', '')),
-        shape,
-        dispname)
-    datanodes.append(node)
-    parent.children.append(node)
-
-def constructTree(fitsfile):
-    """Turn fits file into a tree of nodes.
-
-    Returns root and list of nodes showing datasets
+def hdushape(hdu):
+    """Get shape of HDU from header, without reading data."""
+    naxis = hdu.header.get('NAXIS', 0)
+    return tuple(hdu.header['NAXIS%i' % i] for i in range(naxis, 0, -1))
+
+def scanfits(fitsfile):
+    """Get metadata for HDUs in fits file, without reading data.
+
+    Returns a list of tuples:
+     ('empty', name, dispname)
+     ('image', name, dispname, attrs, bitpix, shape)
+     ('table', name, dispname, shape, [columns])
+    where each column is (name, dispname, attrs, datatype, format, shape)
     """
 
     hdunames = fits_hdf5_helpers.getFITSHduNames(fitsfile)
 
-    root = fits_hdf5_tree.FileGroupNode(None, '/', '/')
-
-    # now iterate over file
-    datanodes = []
+    out = []
     for idx, hdu in enumerate(fitsfile):
         hduname = hdunames[idx]
         dispname = '%s [%i]' % (hduname, idx)
+        shape = hdushape(hdu)
 
         if hdu.is_image:
             # image hdu
-            makeimagenode(root, hdu, idx, '/%s' % hduname, dispname, datanodes)
+            if not shape or 0 in shape:
+                out.append(('empty', '/%s' % hduname, dispname))
+            else:
+                attrs, colattrs = fits_hdf5_helpers.hduVeuszAttrs(hdu)
+                out.append((
+                    'image', '/%s' % hduname, dispname, attrs,
+                    str(hdu.header.get('BITPIX', '')), shape))
 
         elif hasattr(hdu, 'columns'):
-            # parent for table
-            tabshape = hdu.data.shape
-            childnode = fits_hdf5_tree.FileCompoundNode(
-                root, '/%s' % hduname, dispname, tabshape)
-            root.children.append(childnode)
-
+            # table shape is number of rows
+            tabshape = shape[:1]
             attrs, colattrs = fits_hdf5_helpers.hduVeuszAttrs(hdu)
 
-            # create new nodes for each column in table
+            columns = []
             for col in hdu.columns:
                 cname = col.name.lower()
                 cdatatype, clen = fits_hdf5_helpers.convertFITSDataFormat(
@@ -101,15 +89,58 @@ def constructTree(fitsfile):
                 cshape = tabshape if clen==1 else tuple(list(tabshape)+[clen])
                 # attributes specific to column
                 cattrs = colattrs.get(cname, {})
+                columns.append((
+                    '/%s/%s' % (hduname, cname), cname, cattrs,
+                    cdatatype, str(col.format), cshape))
+
+            out.append(('table', '/%s' % hduname, dispname, tabshape, columns))
+
+    return out
+
+# cache of HDU metadata for files, so that reopening is quick
+metadatacache = fits_hdf5_helpers.FileMetadataCache()
+
+def constructTree(filename):
+    """Turn fits file into a tree of nodes.
 
+    Returns root and list of nodes showing datasets
+    """
+
+    def read():
+        with fits.open(filename, 'readonly') as f:
+            return scanfits(f)
+    entries = metadatacache.get(filename, None, read)
+
+    root = fits_hdf5_tree.FileGroupNode(None, '/', '/')
+
+    # now iterate over file
+    datanodes = []
+    for entry in entries:
+        kind, name, dispname = entry[:3]
+
+        if kind == 'empty':
+            root.children.append(
+                fits_hdf5_tree.EmptyDataNode(root, name, dispname))
+
+        elif kind == 'image':
+            attrs, bitpix, shape = entry[3:]
+            node = fits_hdf5_tree.FileDataNode(
+                root, name, attrs, 'numeric', bitpix, shape, dispname)
+            datanodes.append(node)
+            root.children.append(node)
+
+        else:
+            # parent for table
+            tabshape, columns = entry[3:]
+            childnode = fits_hdf5_tree.FileCompoundNode(
+                root, name, dispname, tabshape)
+            root.children.append(childnode)
+
+            # create new nodes for each column in table
+            for cname, cdispname, cattrs, cdatatype, cfmt, cshape in columns:
                 cnode = fits_hdf5_tree.FileDataNode(
-                    childnode,
-                    '/%s/%s' % (hduname, cname),
-                    cattrs,
-                    cdatatype,
-                    col.format,
-                    cshape,
-                    cname)
+                    childnode, cname, cattrs, cdatatype, cfmt, cshape,
+                    cdispname)
                 childnode.children.append(cnode)
                 datanodes.append(cnode)
 
@@ -155,8 +186,7 @@ class ImportTabFITS(importdialog.ImportTab):
             # check can be opened first
             with open(filename, "r") as f:
                 pass
-            with fits.open(filename, "readonly") as f:
-                self.rootnode, self.datanodes = constructTree(f)
+            self.rootnode, self.datanodes = constructTree(filename)
         except IOError:
             self.showError(_("Cannot open file"))
             return False
@@ -53,33 +53,33 @@ def computedatatype(dtype):
             datatype = 'text'
     return datatype
 
-def makedatanode(parent, ds):
-    """Make a node in the tree for importable data."""
-
-    # combine shape from dataset and column (if any)
-    shape = tuple(list(ds.shape)+list(ds.dtype.shape))
-    dtype = computedatatype(ds.dtype)
-
+def datasetattrs(ds):
+    """Get veusz-specific attributes for dataset."""
     vszattrs = {}
     for attr in ds.attrs:
         if attr[:4] == 'vsz_':
             vszattrs[attr] = defn_hdf5.bconv(ds.attrs[attr])
+    return vszattrs
 
-    return fits_hdf5_tree.FileDataNode(
-        parent, ds.name, vszattrs, dtype, ds.dtype, shape, dispname(ds))
+def scangroup(grp):
+    """Get metadata for the children of an HDF5 group, without reading
+    any data.
 
-def addsub(parent, grp, datanodes):
-    """Recursively descend through groups in the hdf5 file."""
+    Returns a list of tuples:
+     ('group', name, dispname)
+     ('data', name, dispname, attrs, datatype, dtype, shape)
+     ('compound', name, dispname, shape, [fields])
+    where fields are data tuples for each column of the table
+    """
 
+    out = []
     for child in sorted(grp.keys()):
         try:
             hchild = grp[child]
         except KeyError:
             continue
         if isinstance(hchild, h5py.Group):
-            childnode = fits_hdf5_tree.FileGroupNode(
-                parent, hchild.name, dispname(hchild))
-            addsub(childnode, hchild, datanodes)
+            out.append(('group', hchild.name, dispname(hchild)))
         elif isinstance(hchild, h5py.Dataset):
             try:
                 dtype = hchild.dtype
@@ -90,47 +90,86 @@ def addsub(parent, grp, datanodes):
             if dtype.kind == 'V':
                 # compound data type - add a special group for
                 # the compound, then its children
-                childnode = fits_hdf5_tree.FileCompoundNode(
-                    parent, hchild.name, dispname(hchild), hchild.shape)
-
-                for field in sorted(hchild.dtype.fields.keys()):
+                fields = []
+                for field in sorted(dtype.fields.keys()):
                     # get types and shape for individual sub-parts
-                    fdtype = hchild.dtype[field]
-                    fdatatype = computedatatype(fdtype)
-                    fshape = tuple(
-                        list(hchild[field].shape)+list(fdtype.shape))
-
+                    fdtype = dtype[field]
+                    fshape = tuple(list(hchild.shape)+list(fdtype.shape))
                     fattrs = fits_hdf5_helpers.filterAttrsByName(
                         hchild.attrs, field)
-                    fnode = fits_hdf5_tree.FileDataNode(
-                        childnode,
-                        hchild.name+'/'+field,
-                        fattrs,
-                        fdatatype,
-                        fdtype,
-                        fshape,
-                        field,
-                    )
-
-                    childnode.children.append(fnode)
-                    datanodes.append(fnode)
+                    fields.append((
+                        'data', hchild.name+'/'+field, field, fattrs,
+                        computedatatype(fdtype), fdtype, fshape))
+
+                out.append((
+                    'compound', hchild.name, dispname(hchild),
+                    hchild.shape, fields))
 
             else:
                 # normal dataset
-                childnode = makedatanode(parent, hchild)
-                datanodes.append(childnode)
+                # combine shape from dataset and column (if any)
+                shape = tuple(list(hchild.shape)+list(dtype.shape))
+                out.append((
+                    'data', hchild.name, dispname(hchild),
+                    datasetattrs(hchild), computedatatype(dtype),
+                    dtype, shape))
+    return out
+
+# cache of group contents for files, so that reopening is quick
+metadatacache = fits_hdf5_helpers.FileMetadataCache()
+
+def getgroupmetadata(filename, path):
+    """Get (cached) list of children of group path in file."""
+    def read():
+        with h5py.File(filename, 'r') as f:
+            return scangroup(f[path] if path else f)
+    return metadatacache.get(filename, path, read)
+
+def makedatanode(parent, entry):
+    """Make a node in the tree for importable data."""
+    kind, name, dname, attrs, datatype, dtype, shape = entry
+    return fits_hdf5_tree.FileDataNode(
+        parent, name, attrs, datatype, dtype, shape, dname)
+
+def addsub(parent, filename, path, datanodes):
+    """Add nodes for the children of group path in the hdf5 file.
+
+    Subgroups are only read when they are expanded."""
+
+    for entry in getgroupmetadata(filename, path):
+        kind = entry[0]
+        if kind == 'group':
+            childnode = fits_hdf5_tree.FileGroupNode(
+                parent, entry[1], entry[2])
+            childnode.childloader = (
+                lambda node=childnode, path=entry[1]:
+                addsub(node, filename, path, datanodes) )
+
+        elif kind == 'compound':
+            childnode = fits_hdf5_tree.FileCompoundNode(
+                parent, entry[1], entry[2], entry[3])
+            for field in entry[4]:
+                fnode = makedatanode(childnode, field)
+                childnode.children.append(fnode)
+                datanodes.append(fnode)
+
+        else:
+            childnode = makedatanode(parent, entry)
+            datanodes.append(childnode)
 
         parent.children.append(childnode)
 
-def constructTree(hdf5file):
-    """Turn hdf5 file into a tree of nodes.
+def constructTree(filename):
+    """Make a tree of nodes for the hdf5 file, which is loaded as
+    groups are expanded.
 
-    Returns root and list of nodes showing datasets
+    Returns root and list of nodes showing datasets (this list is
+    extended as the tree is loaded)
     """
 
     datanodes = []
     root = fits_hdf5_tree.FileGroupNode(None, '', '/')
-    addsub(root, hdf5file, datanodes)
+    root.childloader = lambda: addsub(root, filename, '', datanodes)
     return root, datanodes
 
 class ImportTabHDF5(importdialog.ImportTab):
@@ -187,8 +226,9 @@ class ImportTabHDF5(importdialog.ImportTab):
             # check can be opened first
             with open(filename, "r") as f:
                 pass
-            with h5py.File(filename, "r") as f:
-                self.rootnode, self.datanodes = constructTree(f)
+            self.rootnode, self.datanodes = constructTree(filename)
+            # read top level now to catch any errors
+            self.rootnode.loadChildren()
         except IOError:
             self.showError(_("Cannot open file"))
             return False
@@ -371,6 +411,7 @@ class ImportTabHDF5(importdialog.ImportTab):
                 if node.grpimport:
                     items.append(node.fullname)
                 else:
+                    # unloaded children cannot have been selected
                     for c in node.children:
                         recursiveitems(c)
             else:
@@ -21,6 +21,7 @@ from .. import utils
 from ..dialogs import importdialog, veuszdialog
 from . import defn_standard
 from . import simpleread
+from . import preview
 
 def _(text, disambiguation=None, context="Import_Standard"):
     return qt.QCoreApplication.translate(context, text, disambiguation)
@@ -36,6 +37,10 @@ class ImportTabStandard(importdialog.ImportTab):
         """Load widget and setup controls."""
         importdialog.ImportTab.loadUi(self)
         self.helpbutton.clicked.connect(self.slotHelp)
+        self.descriptoredit.editTextChanged.connect(
+            self.dialog.slotUpdatePreview)
+        self.blockcheckbox.toggled.connect(self.dialog.slotUpdatePreview)
+        self.ignoretextcheckbox.toggled.connect(self.dialog.slotUpdatePreview)
         self.blockcheckbox.default = False
         self.ignoretextcheckbox.default = True
 
@@ -51,21 +56,39 @@ class ImportTabStandard(importdialog.ImportTab):
         self.dialog.mainwindow.showDialog(d)
 
     def doPreview(self, filename, encoding):
-        """Standard preview - show start of text."""
+        """Standard preview - show start of text and the datasets
+        which would be read from a sample of the file."""
 
         try:
-            ifile = utils.openEncoding(filename, encoding)
-            text = ifile.read(4096)+'\n'
-            if len(ifile.read(1)) != 0:
-                # if there is remaining data add ...
-                text += '...\n'
-
-            self.previewedit.setPlainText(text)
-            return True
-        except (UnicodeError, EnvironmentError):
+            sample = preview.FileSample(filename, encoding)
+        except (UnicodeError, LookupError, EnvironmentError):
             self.previewedit.setPlainText('')
+            self.previewsummary.setText('')
             return False
 
+        text = ''.join(sample.headlines)
+        if len(text) > 4096 or not sample.complete:
+            # if there is remaining data add ...
+            text = text[:4096] + '\n...\n'
+        self.previewedit.setPlainText(text)
+
+        try:
+            out, invalids = preview.previewStandard(
+                sample, self.descriptoredit.text(),
+                self.blockcheckbox.isChecked(),
+                self.ignoretextcheckbox.isChecked())
+        except simpleread.DescriptorError:
+            self.previewsummary.setText(_('Cannot interpret descriptor'))
+        else:
+            lines = sample.describe(out, len(sample.allLines()))
+            for var, count in sorted(invalids.items()):
+                if count != 0:
+                    lines.append(
+                        _('%i conversions failed in sample for "%s"') %
+                        (count, var))
+            self.previewsummary.setText('\n'.join(lines))
+        return True
+
     def doImport(self, doc, filename, linked, encoding, prefix, suffix, tags):
         """Standard Veusz importing."""
 
@@ -17,15 +17,51 @@
 ##############################################################################
 
 import sys
+import os
 import ast
 import re
+from collections import OrderedDict
 import numpy as N
 
 from .. import qtall as qt
+from .. import datasets
 
 def _(text, disambiguation=None, context="Import_FITS_HDF5"):
     return qt.QCoreApplication.translate(context, text, disambiguation)
 
+class FileMetadataCache:
+    """Cache of metadata read from files, such as the contents of
+    groups in an HDF5 file.
+
+    Items are cached for each filename and key. The items for a file
+    are discarded if its modification time or size change. Only the
+    maxfiles most recently used files are retained.
+    """
+
+    def __init__(self, maxfiles=8):
+        self.files = OrderedDict()
+        self.maxfiles = maxfiles
+
+    def get(self, filename, key, readfn):
+        """Return the item for key in filename, calling readfn() to
+        read it if not cached."""
+
+        st = os.stat(filename)
+        stamp = (st.st_mtime, st.st_size)
+
+        entry = self.files.pop(filename, None)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+        # keep most recently used at end
+        self.files[filename] = entry
+        while len(self.files) > self.maxfiles:
+            self.files.popitem(last=False)
+
+        items = entry[1]
+        if key not in items:
+            items[key] = readfn()
+        return items[key]
+
 def filterAttrsByName(attrs, name):
     """For compound datasets, attributes can be given on a per-column basis.
     This filters the attributes by the column name."""
@@ -145,8 +181,9 @@ def convertFromBytes(s):
             return s.decode('utf-8')
     return s
 
-def convertDatasetToObject(data, slices):
+def convertDatasetToObject(data, slices, native=False):
     """Convert numpy/hdf dataset to suitable data for veusz.
+    If native is set, float32 data are not converted to float64.
     Raise ConvertError if cannot."""
 
     # lazily-loaded h5py
@@ -166,7 +203,11 @@ def convertDatasetToObject(data, slices):
         raise ConvertError(_("Could not get data type of dataset"))
 
     if kind in ('b', 'i', 'u', 'f'):
-        data = N.array(data, dtype=N.float64)
+        if native:
+            dtype = datasets.nativeStorageDtype(data.dtype)
+        else:
+            dtype = N.float64
+        data = N.array(data, dtype=dtype)
         if data.ndim == 0:
             raise ConvertError(_("Dataset has no dimensions"))
         return data
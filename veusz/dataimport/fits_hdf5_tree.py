@@ -34,6 +34,7 @@ class GenericTreeModel(qt.QAbstractItemModel):
         if not parent.isValid():
             return self.createIndex(row, column, self.rootnode)
         parentnode = parent.internalPointer()
+        parentnode.loadChildren()
         return self.createIndex(row, column, parentnode.children[row])
 
     def parent(self, index):
@@ -54,7 +55,16 @@ class GenericTreeModel(qt.QAbstractItemModel):
     def rowCount(self, parent):
         if not parent.isValid():
             return 1
-        return len(parent.internalPointer().children)
+        node = parent.internalPointer()
+        node.loadChildren()
+        return len(node.children)
+
+    def hasChildren(self, parent):
+        if not parent.isValid():
+            return True
+        node = parent.internalPointer()
+        # do not load children just to find whether there are any
+        return node.childloader is not None or len(node.children) > 0
 
     def data(self, index, role):
         if not index.isValid():
@@ -87,10 +97,22 @@ class GenericTreeModel(qt.QAbstractItemModel):
         return None
 
 class Node:
-    """Generic Node used by tree model."""
+    """Generic Node used by tree model.
+
+    If childloader is set, it is called to populate children when
+    they are first needed, allowing the tree to be loaded lazily.
+    """
     def __init__(self, parent):
         self.parent = parent
         self.children = []
+        self.childloader = None
+
+    def loadChildren(self):
+        """Make sure children are loaded."""
+        if self.childloader is not None:
+            loader = self.childloader
+            self.childloader = None
+            loader()
 
     def data(self, column, role):
         return None
@@ -487,6 +509,10 @@ def setupTreeView(view, rootnode, datanodes):
         ])
 
     view.setModel(mod)
-    view.expandAll()
+    if rootnode.childloader is None:
+        view.expandAll()
+    else:
+        # only show top level to avoid loading whole tree
+        view.expand(mod.index(0, 0, qt.QModelIndex()))
     for c in _ColName, _ColDataType, _ColShape:
         view.resizeColumnToContents(c)
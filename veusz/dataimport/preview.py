@@ -0,0 +1,189 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+##############################################################################
+
+"""Previews of text data files, using a sample of the file.
+
+This allows the import dialog to show the datasets which would be
+imported from large files without reading the whole file.
+"""
+
+import os.path
+import random
+
+from .. import qtall as qt
+from . import simpleread
+from . import readcsv
+
+def _(text, disambiguation=None, context="Import_Preview"):
+    return qt.QCoreApplication.translate(context, text, disambiguation)
+
+class FileSample:
+    """A sample of the lines in a text file.
+
+    Lines are taken from the start of the file (headsize bytes) and
+    from numwindows windows of windowsize bytes at random positions
+    after that. Partial lines at the edges of the sample are dropped.
+
+    The number of lines after the start is estimated from the number
+    of line breaks in the windows. Counting the retained lines
+    instead would overestimate it, as windows more often start or
+    end in long lines, which are dropped.
+    """
+
+    headsize = 65536
+    numwindows = 16
+    windowsize = 8192
+
+    def __init__(self, filename, encoding):
+        self.headlines = []
+        self.windowlines = []
+        # number of bytes which the sampled lines take up
+        self.samplebytes = 0
+        # bytes taken up by the lines from the start of the file
+        self.headbytes = 0
+        # size of the windows and number of line breaks in them
+        self.windowbytes = 0
+        self.windowbreaks = 0
+        # whether the whole file was read
+        self.complete = True
+
+        if filename == '{clipboard}':
+            text = qt.QApplication.clipboard().text()
+            self.filesize = self.samplebytes = len(text.encode('utf-8'))
+            self.headlines = text.splitlines(True)
+            return
+
+        self.filesize = os.path.getsize(filename)
+        with open(filename, 'rb') as f:
+            head = f.read(self.headsize)
+            self.complete = len(f.read(1)) == 0
+            self.headlines = self._decodeLines(
+                head, encoding, dropfirst=False, droplast=not self.complete)
+            self.headbytes = self.samplebytes
+            if self.complete:
+                return
+
+            # use a fixed seed so the preview does not change each time
+            rand = random.Random(self.filesize)
+            maxstart = self.filesize - self.windowsize
+            for i in range(self.numwindows):
+                if maxstart <= self.headsize:
+                    break
+                # keep alignment for multibyte encodings
+                start = rand.randrange(self.headsize, maxstart) & ~3
+                f.seek(start)
+                data = f.read(self.windowsize)
+                self.windowlines += self._decodeLines(
+                    data, encoding, dropfirst=True, droplast=True)
+
+                # count breaks (adding a character so that a final
+                # break starts a new line)
+                text = data.decode(encoding, errors='ignore')
+                self.windowbytes += len(data)
+                self.windowbreaks += len((text+'x').splitlines()) - 1
+
+    def _decodeLines(self, data, encoding, dropfirst, droplast):
+        """Convert bytes to lines, removing partial lines at the start
+        and end if requested."""
+
+        text = data.decode(encoding, errors='ignore')
+        lines = text.splitlines(True)
+        if dropfirst:
+            lines = lines[1:]
+        if droplast and lines:
+            lines = lines[:-1]
+
+        # estimate size in bytes of the retained lines
+        if text:
+            kept = sum([len(l) for l in lines])
+            self.samplebytes += len(data) * kept / len(text)
+        return lines
+
+    def allLines(self):
+        """Return all the sampled lines."""
+        return self.headlines + self.windowlines
+
+    def estimatedLines(self):
+        """Estimate the number of lines in the file."""
+        if self.complete:
+            return len(self.headlines)
+        if self.windowbytes == 0:
+            # only the start of the file could be sampled
+            if self.headbytes == 0:
+                return len(self.headlines)
+            return int(round(
+                self.filesize * len(self.headlines) / self.headbytes))
+        return len(self.headlines) + int(round(
+            (self.filesize - self.headbytes) *
+            self.windowbreaks / self.windowbytes))
+
+    def describe(self, outdatasets, samplelines, maxdatasets=20):
+        """Return a list of text lines describing the datasets in
+        outdatasets, which were read from samplelines lines of the
+        sample. At most maxdatasets datasets are listed."""
+
+        estlines = self.estimatedLines()
+        if self.complete:
+            text = [_('%i lines') % estlines]
+        else:
+            text = [
+                _('Estimated %i lines (sampled %i of %i bytes)') % (
+                    estlines, self.samplebytes, self.filesize) ]
+
+        # scale sizes of datasets by fraction of file read
+        scale = 1.
+        if not self.complete and samplelines > 0:
+            scale = estlines / samplelines
+
+        names = sorted(outdatasets)
+        for name in names[:maxdatasets]:
+            ds = outdatasets[name]
+            size = int(round(len(ds) * scale))
+            if self.complete:
+                text.append('%s: %s, %i' % (name, ds.displaytype, size))
+            else:
+                text.append('%s: %s, ~%i' % (name, ds.displaytype, size))
+        if len(names) > maxdatasets:
+            text.append(_('(%i more datasets)') % (len(names)-maxdatasets))
+        return text
+
+def previewStandard(sample, descriptor, useblocks, ignoretext):
+    """Read the sample as standard text data.
+
+    Returns a dict of datasets and a dict of conversion errors.
+    Raises simpleread.DescriptorError if the descriptor is invalid.
+    """
+
+    simprd = simpleread.SimpleRead(descriptor)
+    stream = simpleread.FileStream(iter(sample.allLines()))
+    simprd.readData(stream, useblocks=useblocks, ignoretext=ignoretext)
+
+    out = {}
+    simprd.setOutput(out)
+    return out, simprd.getInvalidConversions()
+
+def previewCSV(sample, params):
+    """Read the start of the sample as CSV, using ImportParamsCSV
+    params, returning a dict of datasets."""
+
+    reader = readcsv.ReadCSV(params)
+    reader.readData(lines=sample.headlines)
+
+    out = {}
+    reader.setData(out)
+    return out
@@ -322,18 +322,28 @@ class ReadCSV:
             # conversion succeeded - append number to data
             self.data[self.colnames[colnum]].append(v)
 
-    def readData(self):
-        """Read the data into the document."""
+    def readData(self, lines=None):
+        """Read the data into the document.
+
+        If lines is given, read these lines of text rather than the file.
+        """
 
         par = self.params
 
-        # open the csv file
-        csvf = utils.get_unicode_csv_reader(
-            par.filename,
-            delimiter=par.delimiter,
-            quotechar=par.textdelimiter,
-            skipinitialspace=par.skipwhitespace,
-            encoding=par.encoding )
+        if lines is not None:
+            csvf = csv.reader(
+                lines,
+                delimiter=par.delimiter,
+                quotechar=par.textdelimiter,
+                skipinitialspace=par.skipwhitespace )
+        else:
+            # open the csv file
+            csvf = utils.get_unicode_csv_reader(
+                par.filename,
+                delimiter=par.delimiter,
+                quotechar=par.textdelimiter,
+                skipinitialspace=par.skipwhitespace,
+                encoding=par.encoding )
 
         # make in iterator for the file
         if par.readrows:
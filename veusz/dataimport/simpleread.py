@@ -220,8 +220,11 @@ class DescriptorPart:
         else:
             self.startindex, self.stopindex = idxrange
 
-    def readFromStream(self, stream, thedatasets, block=None):
-        """Read data from stream, and write to thedatasets."""
+    def readFromStream(self, stream, thedatasets, block=None, tail=None):
+        """Read data from stream, and write to thedatasets.
+
+        If tail is set, older values are discarded so that memory use
+        does not grow beyond twice tail values."""
 
         # loop over column range
         for index in range(self.startindex, self.stopindex+1):
@@ -282,6 +285,9 @@ class DescriptorPart:
 
                 # add data into dataset
                 dataset.append(dat)
+                if tail is not None and len(dataset) >= 2*tail:
+                    # amortized O(1) removal of old values
+                    del dataset[:-tail]
 
     def setOutput(self, thedatasets, outmap, block=None,
                   linkedfile=None,
@@ -540,14 +546,14 @@ class SimpleRead:
             else:
                 # normal text
                 for p in self.parts:
-                    p.readFromStream(stream, self.datasets)
+                    p.readFromStream(stream, self.datasets, tail=self.tail)
 
                 # automatically create parts if data are remaining
                 if self.autodescr:
                     while len(stream.remainingline) > 0:
                         p = DescriptorPart(
                             str(len(self.parts)+1), None, 'D', None )
-                        p.readFromStream(stream, self.datasets)
+                        p.readFromStream(stream, self.datasets, tail=self.tail)
                         self.parts.append(p)
                         allparts.append(p)
 
@@ -18,6 +18,7 @@
 
 from .base import *
 from .oned import *
+from .ring import *
 from .twod import *
 from .nd import *
 from .text import *
@@ -26,6 +27,8 @@ from .filtered import *
 from .histo import *
 from .expression import *
 from .plugin import *
+from .lazy import *
+from .stats import *
 
 from .commonfn import *
 from .helpers import *
@@ -18,7 +18,10 @@
 
 """Base class for all Datasets."""
 
-from .commonfn import _
+import numpy as N
+
+from .commonfn import _, shareArray
+from .stats import ArrayStats, StatsCache
 
 class DatasetException(Exception):
     """Raised with dataset errors."""
@@ -31,6 +34,26 @@ class DatasetExpressionException(DatasetException):
 class DatasetBase:
     """Base class for all datasets."""
 
+    # increased when values are modified in place
+    changeset = 0
+
+    def cachedStats(self, name, cols, fn):
+        """Return fn called with the values of columns cols, caching
+        the result under name until the columns are replaced or
+        invalidateStats is called."""
+        cache = self.__dict__.get('_statscache')
+        if cache is None:
+            cache = self.__dict__['_statscache'] = StatsCache()
+        return cache.get(name, [getattr(self, c) for c in cols], fn)
+
+    def invalidateStats(self):
+        """Forget cached statistics and increase changeset, as values
+        have been modified in place."""
+        self.changeset += 1
+        cache = self.__dict__.get('_statscache')
+        if cache is not None:
+            cache.clear()
+
 class DatasetConcreteBase(DatasetBase):
     """A base dataset class for datasets which are real, and not proxies,
     etc."""
@@ -132,13 +155,18 @@ class DatasetConcreteBase(DatasetBase):
         """Return val converted to data."""
         return float(val)
 
+    def dataStats(self):
+        """Return ArrayStats for the data values."""
+        return self.cachedStats('data', ('data',), ArrayStats)
+
     def _getItemHelper(self, key):
         """Help get arguments to constructor."""
         args = {}
         for col in self.columns:
             array = getattr(self, col)
             if array is not None:
-                args[col] = array[key]
+                # slices are views of the (now read-only) column
+                args[col] = shareArray(array)[key]
         return args
 
     def __getitem__(self, key):
@@ -175,8 +203,23 @@ class DatasetConcreteBase(DatasetBase):
         else:
             return _('Linked file: %s') % self.linked.filename
 
+    def writableColumn(self, col):
+        """Return column col as an array which can be modified in place.
+
+        Columns shared with other datasets are read-only, so are
+        copied first (copy on write)."""
+        array = getattr(self, col)
+        self.invalidateStats()
+        if isinstance(array, N.ndarray) and not array.flags.writeable:
+            array = N.array(array)
+            setattr(self, col, array)
+        return array
+
     def returnCopy(self):
-        """Return an unlinked copy of self."""
+        """Return an unlinked copy of self.
+
+        Numeric columns are shared with the copy where possible, being
+        made read-only."""
         pass
 
     def returnCopyWithNewData(self, **args):
@@ -25,18 +25,33 @@ def _(text, disambiguation=None, context="Datasets"):
     """Translate text."""
     return qt.QCoreApplication.translate(context, text, disambiguation)
 
-def convertNumpy(a, dims=1):
+def nativeStorageDtype(dtype):
+    """Return the type numeric datasets can store values of numpy type
+    dtype as, without converting them to float64.
+
+    float32 values are kept (in the machine byte order). Other types,
+    including integers, are converted to float64, as widgets do
+    arithmetic on the values which should not use integer maths.
+    """
+    if dtype.kind == 'f' and dtype.itemsize == 4:
+        return dtype.newbyteorder('=')
+    return N.dtype(N.float64)
+
+def convertNumpy(a, dims=1, native=False):
     """Convert to a numpy double if possible.
 
     dims is number of dimensions to check for
+    native: keep float32 arrays as they are (see
+     nativeStorageDtype)
     """
     if a is None:
         # leave as None
         return None
     elif isinstance(a, N.ndarray):
         # make conversion if numpy type is not correct
-        if a.dtype != N.float64:
-            a = a.astype(N.float64)
+        dtype = nativeStorageDtype(a.dtype) if native else N.float64
+        if a.dtype != dtype:
+            a = a.astype(dtype)
     else:
         # convert to numpy array
         a = N.array(a, dtype=N.float64)
@@ -53,19 +68,18 @@ def convertNumpy(a, dims=1):
             raise ValueError("Only %i-dimensional arrays or lists allowed" % dims)
     return a
 
-def convertNumpyAbs(a):
+def convertNumpyAbs(a, native=False):
     """Convert to numpy 64 bit positive values, if possible."""
     if a is None:
         return None
     else:
-        return N.abs( convertNumpy(a) )
+        return N.abs( convertNumpy(a, native=native) )
 
-def convertNumpyNegAbs(a):
+def convertNumpyNegAbs(a, native=False):
     """Convert to numpy 64 bit negative values, if possible."""
     if a is None:
         return None
-    else:
-        return -N.abs( convertNumpy(a) )
+    return -N.abs( convertNumpy(a, native=native) )
 
 def copyOrNone(a):
     """Return a copy if not None, or None."""
@@ -76,6 +90,22 @@ def copyOrNone(a):
     elif isinstance(a, list):
         return list(a)
 
+def shareArray(a):
+    """Return a read-only view of a numpy array, to share its values
+    without copying. Other values are returned unchanged.
+
+    The original array is also made read-only, so that neither the
+    original nor the copy can be changed in place. Code which changes
+    the values of a dataset in place should use writableColumn, which
+    copies the column first if it is read-only.
+    """
+    if isinstance(a, N.ndarray):
+        a.flags.writeable = False
+        v = a.view()
+        v.flags.writeable = False
+        return v
+    return a
+
 def datasetNameToDescriptorName(name):
     """Return descriptor name for dataset."""
     if re.match('^[0-9A-Za-z_]+$', name):
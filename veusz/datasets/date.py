@@ -22,7 +22,8 @@ import numpy as N
 
 from .. import utils
 
-from .commonfn import _, convertNumpy, datasetNameToDescriptorName
+from .commonfn import (
+    _, convertNumpy, shareArray, datasetNameToDescriptorName)
 from .oned import Dataset1DBase
 
 class DatasetDateTimeBase(Dataset1DBase):
@@ -39,7 +40,7 @@ class DatasetDateTimeBase(Dataset1DBase):
 
     def returnCopy(self):
         """Returns version of dataset with no linking."""
-        return DatasetDateTime(data=N.array(self.data))
+        return DatasetDateTime(data=shareArray(self.data))
 
     def returnCopyWithNewData(self, **args):
         """Return dataset of same type using the column data given."""
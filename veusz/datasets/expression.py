@@ -23,7 +23,7 @@ import numpy as N
 
 from .commonfn import _
 from .base import DatasetExpressionException
-from .oned import Dataset1DBase, Dataset
+from .oned import Dataset1DBase, Dataset, Dataset1DView
 from .twod import Dataset2DBase, Dataset2D
 from .text import DatasetText
 
@@ -86,6 +86,9 @@ def _evaluateDataset(datasets, dsname, dspart):
     if val is None:
         raise DatasetExpressionException(
             _("Dataset '%s' does not have part '%s'") % (dsname, dspart))
+    if isinstance(val, N.ndarray) and val.dtype != N.float64:
+        # float32 values are evaluated as float64
+        val = val.astype(N.float64)
     return val
 
 def _returnNumericDataset(doc, vals, dimensions, subdatasets):
@@ -394,7 +397,7 @@ class DatasetExpression(Dataset1DBase):
         We override this from DatasetConcreteBase as it would return a
         DatsetExpression otherwise, not chopped sets of data.
         """
-        return Dataset(**self._getItemHelper(key))
+        return Dataset1DView(**self._getItemHelper(key))
 
     def canUnlink(self):
         """Whether dataset can be unlinked."""
@@ -18,7 +18,7 @@
 
 import numpy as N
 
-from .commonfn import _
+from .commonfn import _, shareArray
 from .base import DatasetBase
 from .oned import Dataset
 from .expression import evalDatasetExpression
@@ -50,19 +50,30 @@ class DatasetFilterGenerator:
         self.outdatasets = {}
 
     def filterNumeric(self, ds, filterarr):
-        """Filter a numeric dataset."""
-        outdata = {}
+        """Filter a numeric dataset.
+
+        If the selected values are a contiguous range, the output
+        shares the values of the input dataset."""
+
         minlen = len(filterarr)
+        key = filterarr
+        if not self.replaceblanks:
+            idxs = N.flatnonzero(filterarr)
+            if len(idxs) == 0 or idxs[-1]-idxs[0]+1 == len(idxs):
+                key = slice(idxs[0], idxs[-1]+1) if len(idxs) else slice(0, 0)
+
+        outdata = {}
         for attr in ds.columns:
             data = getattr(ds, attr)
             if data is None:
                 filtered = None
-            else:
+            elif isinstance(key, slice):
+                filtered = shareArray(data)[key]
+            elif self.replaceblanks:
                 filtered = N.array(data[:minlen])
-                if self.replaceblanks:
-                    filtered[N.logical_not(filterarr)] = N.nan
-                else:
-                    filtered = filtered[filterarr]
+                filtered[N.logical_not(filterarr)] = N.nan
+            else:
+                filtered = data[:minlen][filterarr]
             outdata[attr] = filtered
         return ds.returnCopyWithNewData(**outdata)
 
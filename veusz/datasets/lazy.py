@@ -0,0 +1,264 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+###############################################################################
+
+"""Datasets which are read from a file when first used."""
+
+import os.path
+import weakref
+
+import numpy as N
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from .. import utils
+
+from .base import DatasetConcreteBase
+from .oned import Dataset1DBase, Dataset
+from .twod import Dataset2DBase, Dataset2D
+from .nd import DatasetNDBase, DatasetND
+from .text import DatasetText
+from .date import DatasetDateTimeBase, DatasetDateTime
+
+class LazyHDF5File:
+    """An HDF5 file which lazy datasets are read from.
+
+    The file is opened when data are needed. It is closed before the
+    file is written to, reading any datasets which would be lost.
+    """
+
+    # all the open files
+    _files = weakref.WeakSet()
+
+    def __init__(self, filename, hdffile=None):
+        """hdffile is an optional already open h5py.File."""
+        self.filename = os.path.abspath(filename)
+        self.hdffile = hdffile
+        # datasets which read from this file
+        self.datasets = weakref.WeakSet()
+        LazyHDF5File._files.add(self)
+
+    def get(self, path):
+        """Get item in file with path."""
+        if self.hdffile is None:
+            self.hdffile = h5py.File(self.filename, 'r')
+        return self.hdffile[path]
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if self.hdffile is not None:
+            self.hdffile.close()
+            self.hdffile = None
+
+    @classmethod
+    def prepareWrite(kls, filename, copied=None):
+        """Get ready for filename to be replaced, closing it.
+
+        copied is an optional dict of lazy datasets copied into the
+        new file, mapped to their paths in it. Other datasets which
+        have not been read from the file are read now, including
+        those only kept by the undo history, as the contents of the
+        file are going to be lost.
+        """
+        filename = os.path.abspath(filename)
+        if copied is None:
+            copied = {}
+        for lazyfile in list(kls._files):
+            if lazyfile.filename == filename:
+                for ds in list(lazyfile.datasets):
+                    if ds in copied:
+                        ds.lazypath = copied[ds]
+                    else:
+                        ds.loadData()
+                        # values are no longer in a file
+                        ds.lazyfile = None
+                        lazyfile.datasets.discard(ds)
+                lazyfile.close()
+
+class _LazyColumn:
+    """A column of a lazy dataset, which reads the dataset when it is
+    first needed."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.name not in obj._lazyvals:
+            obj.loadData()
+        return obj._lazyvals[self.name]
+
+    def __set__(self, obj, val):
+        obj._lazyvals[self.name] = val
+
+class DatasetLazyMixin:
+    """Mixin for datasets with columns read when first used.
+
+    The real dataset class is the next base class. Subclasses should
+    define the columns as _LazyColumn objects.
+    """
+
+    # columns set when loaded
+    lazycolumns = ()
+
+    def _initLazy(self, lazyfile, path, loadfn, shape):
+        """Setup lazy loading.
+
+        lazyfile: LazyHDF5File the dataset is read from
+        path: path of the saved dataset in the file
+        loadfn: callable returning a dataset of the real type from the
+                item in the file, which the columns are taken from
+        shape: shape of data, to describe the dataset before loading
+        """
+        self._lazyvals = {}
+        self._loadfn = loadfn
+        self.lazyfile = lazyfile
+        self.lazypath = path
+        self.lazyshape = tuple(shape)
+        # weak references to the values read, and the changeset,
+        # to tell whether they have been changed since
+        self._loadedrefs = None
+        self._loadedchangeset = None
+        lazyfile.datasets.add(self)
+
+    def isLoaded(self):
+        """Has the data been read?"""
+        return self._loadfn is None
+
+    def loadData(self):
+        """Read the data, if not already read."""
+        if self._loadfn is None:
+            return
+        real = self._loadfn(self.lazyfile.get(self.lazypath))
+        self._loadfn = None
+        for col in self.lazycolumns:
+            # do not replace values set before loading
+            self._lazyvals.setdefault(col, getattr(real, col))
+
+        vals = [self._lazyvals[col] for col in self.lazycolumns]
+        if all(v is None or isinstance(v, N.ndarray) for v in vals):
+            self._loadedrefs = [
+                None if v is None else weakref.ref(v) for v in vals]
+            self._loadedchangeset = self.changeset
+
+    def hdf5Source(self):
+        """Return (lazyfile, path) of the item in the HDF5 file with
+        the values of the dataset, or None if the values may have
+        been changed since they were read."""
+        if self.lazyfile is None:
+            return None
+        if self._loadfn is not None:
+            return self.lazyfile, self.lazypath
+        if ( self._loadedrefs is None or
+             self._loadedchangeset != self.changeset ):
+            return None
+        for col, ref in zip(self.lazycolumns, self._loadedrefs):
+            val = self._lazyvals.get(col)
+            if (None if ref is None else ref()) is not val:
+                return None
+        return self.lazyfile, self.lazypath
+
+    def userSize(self):
+        if not self.isLoaded():
+            return '×'.join(str(x) for x in self.lazyshape)
+        return super().userSize()
+
+    def __len__(self):
+        if not self.isLoaded():
+            return self.lazyshape[0]
+        return super().__len__()
+
+    def saveDataDumpToHDF5(self, group, name):
+        """Save to HDF5, avoiding reading the data if the group can
+        copy the unchanged item the values were read from."""
+        source = self.hdf5Source()
+        # only copied if the name is the same, as it is stored too
+        if ( source is not None and hasattr(group, 'addCopy') and
+             utils.unescapeHDFDataName(source[1].split('/')[-1]) == name ):
+            group.addCopy(
+                utils.escapeHDFDataName(name), self, source,
+                lambda grp: super(DatasetLazyMixin, self).saveDataDumpToHDF5(
+                    grp, name))
+        else:
+            super().saveDataDumpToHDF5(group, name)
+
+class Dataset1DLazy(DatasetLazyMixin, Dataset):
+    """1D dataset read when first used."""
+
+    lazycolumns = Dataset.columns
+    data = _LazyColumn('data')
+    serr = _LazyColumn('serr')
+    nerr = _LazyColumn('nerr')
+    perr = _LazyColumn('perr')
+
+    def __init__(self, lazyfile, path, loadfn, shape):
+        Dataset1DBase.__init__(self)
+        self._initLazy(lazyfile, path, loadfn, shape)
+
+class Dataset2DLazy(DatasetLazyMixin, Dataset2D):
+    """2D dataset read when first used."""
+
+    lazycolumns = (
+        'data', 'xrange', 'yrange', 'xedge', 'yedge', 'xcent', 'ycent')
+    data = _LazyColumn('data')
+    xrange = _LazyColumn('xrange')
+    yrange = _LazyColumn('yrange')
+    xedge = _LazyColumn('xedge')
+    yedge = _LazyColumn('yedge')
+    xcent = _LazyColumn('xcent')
+    ycent = _LazyColumn('ycent')
+
+    def __init__(self, lazyfile, path, loadfn, shape):
+        Dataset2DBase.__init__(self)
+        self._initLazy(lazyfile, path, loadfn, shape)
+
+class DatasetNDLazy(DatasetLazyMixin, DatasetND):
+    """nD dataset read when first used."""
+
+    lazycolumns = ('data',)
+    data = _LazyColumn('data')
+
+    def __init__(self, lazyfile, path, loadfn, shape):
+        DatasetNDBase.__init__(self)
+        self._initLazy(lazyfile, path, loadfn, shape)
+
+class DatasetDateTimeLazy(DatasetLazyMixin, DatasetDateTime):
+    """Date dataset read when first used."""
+
+    lazycolumns = ('data',)
+    data = _LazyColumn('data')
+
+    def __init__(self, lazyfile, path, loadfn, shape):
+        DatasetDateTimeBase.__init__(self)
+        self._initLazy(lazyfile, path, loadfn, shape)
+        self.perr = self.nerr = self.serr = None
+
+class DatasetTextLazy(DatasetLazyMixin, DatasetText):
+    """Text dataset read when first used."""
+
+    lazycolumns = ('data',)
+    data = _LazyColumn('data')
+
+    def __init__(self, lazyfile, path, loadfn, shape):
+        DatasetConcreteBase.__init__(self)
+        self._initLazy(lazyfile, path, loadfn, shape)
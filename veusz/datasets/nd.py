@@ -22,7 +22,7 @@ import numpy as N
 
 from .. import utils
 
-from .commonfn import _, dsPreviewHelper
+from .commonfn import _, dsPreviewHelper, shareArray, nativeStorageDtype
 from .base import DatasetConcreteBase
 
 class DatasetNDBase(DatasetConcreteBase):
@@ -42,10 +42,10 @@ class DatasetNDBase(DatasetConcreteBase):
         return _('ND (%s), numeric') % self.userSize()
 
     def returnCopy(self):
-        return DatasetND(data=self.data)
+        return DatasetND(data=shareArray(self.data), native=True)
 
     def returnCopyWithNewData(self, **args):
-        return DatasetND(**args)
+        return DatasetND(native=True, **args)
 
     def empty(self):
         """Is the data defined?"""
@@ -69,13 +69,17 @@ class DatasetNDBase(DatasetConcreteBase):
         return fmtrecurse(self.data)
 
 class DatasetND(DatasetNDBase):
-    def __init__(self, data=None):
-        """data is a numpy array of N dimensions."""
+    def __init__(self, data=None, native=False):
+        """data is a numpy array of N dimensions.
+
+        native keeps float32 data, instead of converting
+        to float64."""
 
         DatasetNDBase.__init__(self)
 
         if isinstance(data, N.ndarray):
-            self.data = data.astype(N.float64)
+            dtype = nativeStorageDtype(data.dtype) if native else N.float64
+            self.data = data.astype(dtype, copy=False)
         elif isinstance(data, list) or isinstance(data, tuple):
             self.data = N.array(dtype=N.float64)
         else:
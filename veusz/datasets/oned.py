@@ -21,12 +21,32 @@
 import numpy as N
 
 from .commonfn import (
-    _, dsPreviewHelper, copyOrNone, convertNumpy,
+    _, dsPreviewHelper, shareArray, convertNumpy,
     convertNumpyAbs, convertNumpyNegAbs, datasetNameToDescriptorName)
 from .base import DatasetConcreteBase, DatasetException
+from .stats import ArrayStats, sortedIndexRange
 
 from .. import utils
 
+def _rangeStats(data, serr, nerr, perr):
+    """Calculate stats of values, and values minus and plus errors."""
+    valstats = minstats = maxstats = ArrayStats(data)
+    if serr is not None or nerr is not None:
+        minvals = N.array(data, dtype=N.float64)
+        if serr is not None:
+            minvals -= serr
+        if nerr is not None:
+            minvals += nerr
+        minstats = ArrayStats(minvals)
+    if serr is not None or perr is not None:
+        maxvals = N.array(data, dtype=N.float64)
+        if serr is not None:
+            maxvals += serr
+        if perr is not None:
+            maxvals += perr
+        maxstats = ArrayStats(maxvals)
+    return valstats, minstats, maxstats
+
 class Dataset1DBase(DatasetConcreteBase):
     """Base for 1D datasets."""
 
@@ -80,8 +100,8 @@ class Dataset1DBase(DatasetConcreteBase):
         '''Get range of coordinates for each point in the form
         (minima, maxima).'''
 
-        minvals = self.data.copy()
-        maxvals = self.data.copy()
+        minvals = N.array(self.data, dtype=N.float64)
+        maxvals = N.array(self.data, dtype=N.float64)
 
         if self.serr is not None:
             minvals -= self.serr
@@ -98,30 +118,36 @@ class Dataset1DBase(DatasetConcreteBase):
             maxvals[N.isfinite(maxvals)]
         )
 
+    def rangeStats(self):
+        '''Get cached ArrayStats for the values, the values minus
+        errors and the values plus errors, as a tuple.'''
+        return self.cachedStats(
+            'range', ('data', 'serr', 'nerr', 'perr'), _rangeStats)
+
     def getRange(self):
         '''Get total range of coordinates. Returns None if empty.'''
-        minvals, maxvals = self.getPointRanges()
-        if len(minvals) > 0 and len(maxvals) > 0:
-            return ( minvals.min(), maxvals.max() )
+        valstats, minstats, maxstats = self.rangeStats()
+        if minstats.min is not None and maxstats.max is not None:
+            return ( minstats.min, maxstats.max )
         else:
             return None
 
     def updateRangeAuto(self, axrange, noneg):
-        val = pos = neg = self.data
-        if self.serr is not None:
-            pos = pos + self.serr
-            neg = neg - self.serr
-        if self.perr is not None:
-            pos = pos + self.perr
-        if self.nerr is not None:
-            neg = neg + self.nerr
-
-        for v in val, pos, neg:
-            if noneg:
-                v = v[v>0]
-            if len(v) > 0:
-                axrange[0] = min(axrange[0], N.nanmin(v))
-                axrange[1] = max(axrange[1], N.nanmax(v))
+        for stats in self.rangeStats():
+            r = stats.range(positive=noneg)
+            if r is not None:
+                axrange[0] = min(axrange[0], r[0])
+                axrange[1] = max(axrange[1], r[1])
+
+    def sortedIndexRange(self, minval, maxval, margin=1):
+        '''If the values are sorted, return (start, stop) indices of
+        the values between minval and maxval, including margin values
+        either side. Returns None if they are not sorted.'''
+        sortedness = self.rangeStats()[0].sortedness
+        if sortedness == 0:
+            return None
+        return sortedIndexRange(
+            self.data, sortedness, minval, maxval, margin=margin)
 
     def rangeVisit(self, fn):
         '''Call fn on data points and error values, in order to get range.'''
@@ -157,17 +183,18 @@ class Dataset1DBase(DatasetConcreteBase):
         return ''.join(lines)
 
     def returnCopy(self):
-        """Return version of dataset with no linking."""
-        return Dataset(
-            data=copyOrNone(self.data),
-            serr=copyOrNone(self.serr),
-            perr=copyOrNone(self.perr),
-            nerr=copyOrNone(self.nerr)
+        """Return version of dataset with no linking, sharing the
+        values."""
+        return Dataset1DView(
+            data=shareArray(self.data),
+            serr=shareArray(self.serr),
+            perr=shareArray(self.perr),
+            nerr=shareArray(self.nerr)
         )
 
     def returnCopyWithNewData(self, **args):
         """Return dataset of same type using the column data given."""
-        return Dataset(**args)
+        return Dataset1DView(**args)
 
 class Dataset(Dataset1DBase):
     '''Represents a dataset.'''
@@ -175,20 +202,22 @@ class Dataset(Dataset1DBase):
     editable = True
 
     def __init__(self, data = None, serr = None, nerr = None, perr = None,
-                 linked = None):
+                 linked = None, native = False):
         '''Initialise dataset with the sets of values given.
 
         The values can be given as numpy 1d arrays or lists of numbers
         linked optionally specifies a LinkedFile to link the dataset to
+        native keeps float32 arrays, instead of converting them to
+        float64
         '''
 
         Dataset1DBase.__init__(self, linked=linked)
 
         # convert data to numpy arrays
-        self.data = convertNumpy(data)
-        self.serr = convertNumpyAbs(serr)
-        self.perr = convertNumpyAbs(perr)
-        self.nerr = convertNumpyNegAbs(nerr)
+        self.data = convertNumpy(data, native=native)
+        self.serr = convertNumpyAbs(serr, native=native)
+        self.perr = convertNumpyAbs(perr, native=native)
+        self.nerr = convertNumpyNegAbs(nerr, native=native)
 
         # check the sizes of things match up
         s = self.data.shape
@@ -274,6 +303,38 @@ class Dataset(Dataset1DBase):
 
         self.document.modifiedData(self)
 
+def _viewErrors(vals, negative):
+    """Convert error values, only copying if they have the wrong
+    type or sign."""
+    vals = convertNumpy(vals, native=True)
+    if vals is not None and (vals > 0 if negative else vals < 0).any():
+        vals = -N.abs(vals) if negative else N.abs(vals)
+    return vals
+
+class Dataset1DView(Dataset):
+    """A dataset using columns taken from another dataset, without
+    copying them.
+
+    The columns are normally read-only views of the columns of another
+    dataset (see shareArray), which are copied if the dataset is
+    modified. Columns are only converted if they do not have the right
+    type, or the errors have the wrong sign.
+    """
+
+    def __init__(self, data=None, serr=None, nerr=None, perr=None,
+                 linked=None):
+        Dataset1DBase.__init__(self, linked=linked)
+
+        self.data = convertNumpy(data, native=True)
+        self.serr = _viewErrors(serr, False)
+        self.perr = _viewErrors(perr, False)
+        self.nerr = _viewErrors(nerr, True)
+
+        s = self.data.shape
+        for x in self.serr, self.nerr, self.perr:
+            if x is not None and x.shape != s:
+                raise DatasetException('Lengths of error data do not match data')
+
 class DatasetRange(Dataset1DBase):
     """Dataset consisting of a range of values e.g. 1 to 10 in 10 steps."""
 
@@ -312,7 +373,7 @@ class DatasetRange(Dataset1DBase):
         We override this from DatasetConcreteBase as it would return a
         DatsetExpression otherwise, not chopped sets of data.
         """
-        return Dataset(**self._getItemHelper(key))
+        return Dataset1DView(**self._getItemHelper(key))
 
     def userSize(self):
         """Size of dataset."""
@@ -16,7 +16,7 @@
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 ###############################################################################
 
-from .oned import Dataset1DBase, Dataset
+from .oned import Dataset1DBase, Dataset1DView
 from .twod import Dataset2DBase, Dataset2D
 from .nd import DatasetNDBase, DatasetND
 from .text import DatasetText
@@ -103,7 +103,7 @@ class Dataset1DPlugin(_DatasetPlugin, Dataset1DBase):
         We override this from DatasetConcreteBase as it would return a
         DatsetExpression otherwise, not chopped sets of data.
         """
-        return Dataset(**self._getItemHelper(key))
+        return Dataset1DView(**self._getItemHelper(key))
 
     # parent class sets these attributes, so override setattr to do nothing
     data = property(
@@ -0,0 +1,218 @@
+#    Copyright (C) 2016 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+###############################################################################
+
+"""Circular buffer datasets for live data."""
+
+import numpy as N
+
+from .commonfn import _, convertNumpy, copyOrNone
+from .base import DatasetException
+from .oned import Dataset1DBase, Dataset
+
+from .. import utils
+
+def _valuesToText(vals):
+    """Convert array to a Python list expression, writing non-finite
+    values so that they can be evaluated."""
+    return '[%s]' % ', '.join([
+        repr(v) if N.isfinite(v) else "float('%s')" % v
+        for v in vals.tolist() ])
+
+class DatasetRing(Dataset1DBase):
+    """A 1D dataset with a fixed capacity, keeping the latest values.
+
+    Values are stored in circular buffers, so appending costs O(1)
+    per value and memory use stays constant once the capacity is
+    reached. Each value is written twice, capacity apart, so the
+    values in order are always a contiguous slice of the buffer. The
+    data, serr, nerr and perr attributes are read-only views which are
+    only valid until the next append. The same view is returned until
+    the values change, so it can be used to identify cached results.
+    """
+
+    dstype = _('Ring')
+
+    def __init__(self, capacity, data=None, serr=None, nerr=None, perr=None,
+                 errors=(), linked=None):
+        """Create dataset holding at most capacity values.
+
+        Initial values and errors can be given as numpy arrays or
+        lists. errors is an optional list of error columns to create
+        ('serr', 'nerr', 'perr') if no initial values are given for
+        them.
+        """
+
+        Dataset1DBase.__init__(self, linked=linked)
+
+        capacity = int(capacity)
+        if capacity < 1:
+            raise DatasetException('Ring dataset capacity must be positive')
+        self.capacity = capacity
+
+        # index of oldest value and number of values
+        self.start = 0
+        self.size = 0
+
+        cols = ['data'] + [
+            col for col, vals in (('serr', serr), ('nerr', nerr), ('perr', perr))
+            if vals is not None or col in errors ]
+        self.buffers = {col: N.zeros(capacity*2) for col in cols}
+        # views of the values, by column
+        self.views = {}
+
+        if data is not None:
+            self.append(data, serr=serr, nerr=nerr, perr=perr)
+
+    def _getColumn(self, col):
+        """Get contiguous view of the values in column."""
+        view = self.views.get(col)
+        if view is None:
+            buf = self.buffers.get(col)
+            if buf is None:
+                return None
+            view = buf[self.start:self.start+self.size]
+            view.flags.writeable = False
+            self.views[col] = view
+        return view
+
+    data = property(lambda self: self._getColumn('data'))
+    serr = property(lambda self: self._getColumn('serr'))
+    nerr = property(lambda self: self._getColumn('nerr'))
+    perr = property(lambda self: self._getColumn('perr'))
+
+    def __len__(self):
+        return self.size
+
+    def _write(self, buf, pos, vals):
+        """Write vals at position pos in buffer, wrapping around."""
+        cap = self.capacity
+        num = len(vals)
+        first = min(num, cap-pos)
+        buf[pos:pos+first] = buf[pos+cap:pos+cap+first] = vals[:first]
+        buf[:num-first] = buf[cap:cap+num-first] = vals[first:]
+
+    def append(self, data, serr=None, nerr=None, perr=None):
+        """Append values to the end of the dataset.
+
+        Values are given as numpy arrays, lists or single values. The
+        oldest values are discarded if the capacity is exceeded.
+
+        The document is not notified of the change, so the caller
+        should call document.modifiedData when it wants the change to
+        be visible.
+        """
+
+        cols = {'data': convertNumpy(data)}
+        num = len(cols['data'])
+        for col, vals in (('serr', serr), ('nerr', nerr), ('perr', perr)):
+            if col in self.buffers:
+                if vals is None:
+                    vals = N.full(num, N.nan)
+                vals = convertNumpy(vals)
+                vals = -N.abs(vals) if col == 'nerr' else N.abs(vals)
+                cols[col] = vals
+            elif vals is not None:
+                raise DatasetException(
+                    'Ring dataset was not created with error column %s' % col)
+            if len(cols.get(col, cols['data'])) != num:
+                raise DatasetException('Lengths of error data do not match data')
+
+        cap = self.capacity
+        if num > cap:
+            # only the last values will be retained
+            cols = {col: vals[-cap:] for col, vals in cols.items()}
+            self.start = self.size = 0
+            num = cap
+
+        self.views.clear()
+        end = (self.start + self.size) % cap
+        for col, vals in cols.items():
+            self._write(self.buffers[col], end, vals)
+
+        self.size += num
+        if self.size > cap:
+            self.start = (self.start + self.size - cap) % cap
+            self.size = cap
+
+    def saveState(self, num):
+        """Return state which allows an append of num values to be
+        undone with restoreState."""
+        cap = self.capacity
+        end = (self.start + self.size) % cap
+        idxs = (N.arange(min(num, cap)) + end) % cap
+        vals = {col: buf[idxs] for col, buf in self.buffers.items()}
+        return (self.start, self.size, idxs, vals)
+
+    def restoreState(self, state):
+        """Restore state from saveState."""
+        self.start, self.size, idxs, vals = state
+        self.views.clear()
+        for col, buf in self.buffers.items():
+            buf[idxs] = buf[idxs+self.capacity] = vals[col]
+
+    def clear(self):
+        """Remove all values."""
+        self.start = self.size = 0
+        self.views.clear()
+
+    def returnCopy(self):
+        """Return copy of current values, which are not shared as the
+        buffers are overwritten."""
+        return self.returnCopyWithNewData(
+            **{col: self._getColumn(col) for col in self.buffers})
+
+    def returnCopyWithNewData(self, **args):
+        """Return dataset using copies of the column data given."""
+        return Dataset(**{col: copyOrNone(v) for col, v in args.items()})
+
+    def userSize(self):
+        """Size of dataset."""
+        return '%i/%i' % (self.size, self.capacity)
+
+    def description(self):
+        """Get description of dataset."""
+        return _('1D ring (length %i, capacity %i)') % (
+            self.size, self.capacity)
+
+    def saveDataRelationToText(self, fileobj, name):
+        """Save command to recreate empty ring with same capacity."""
+
+        errors = tuple(c for c in ('serr', 'nerr', 'perr') if c in self.buffers)
+        fileobj.write('SetDataRing(%s, %i, errors=%s)\n' % (
+            repr(name), self.capacity, repr(errors)))
+
+    def saveDataDumpToText(self, fileobj, name):
+        """Save current contents to text."""
+        if self.size == 0:
+            return
+
+        # appending the values to the empty ring restores the contents
+        fileobj.write('AppendData(%s, %s' % (
+            repr(name), _valuesToText(self.data)))
+        for col, arg in (('serr', 'symerr'), ('nerr', 'negerr'),
+                         ('perr', 'poserr')):
+            if col in self.buffers:
+                fileobj.write(', %s=%s' % (
+                    arg, _valuesToText(self._getColumn(col))))
+        fileobj.write(')\n')
+
+    def saveDataDumpToHDF5(self, group, name):
+        """Save contents to HDF5 as a 1D dataset, recording capacity."""
+        Dataset.saveDataDumpToHDF5(self, group, name)
+        odgrp = group[utils.escapeHDFDataName(name)]
+        odgrp.attrs['vsz_capacity'] = self.capacity
@@ -0,0 +1,125 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+###############################################################################
+
+"""Statistics of dataset values, which are cached by datasets.
+
+Datasets keep the statistics until the arrays they were calculated
+from are replaced, or invalidateStats is called when values are
+modified in place (see DatasetBase.cachedStats).
+"""
+
+import weakref
+
+import numpy as N
+
+class ArrayStats:
+    """Statistics of the values in an array.
+
+    min, max: range of finite values (None if there are none)
+    minpos, maxpos: range of finite values above zero (None if none)
+    numnonfinite: number of NaN or infinite values
+    sortedness: 1 if the array is 1D, has only finite values and
+                they never decrease, -1 if they never increase,
+                otherwise 0
+    """
+
+    __slots__ = (
+        'min', 'max', 'minpos', 'maxpos', 'numnonfinite', 'sortedness')
+
+    def __init__(self, vals):
+        vals = N.asarray(vals)
+        ndim = vals.ndim
+        finite = N.isfinite(vals)
+        numfinite = int(N.count_nonzero(finite))
+        self.numnonfinite = vals.size - numfinite
+        if self.numnonfinite:
+            vals = vals[finite]
+
+        self.min = self.max = self.minpos = self.maxpos = None
+        if numfinite > 0:
+            self.min = float(vals.min())
+            self.max = float(vals.max())
+            if self.min > 0:
+                self.minpos, self.maxpos = self.min, self.max
+            elif self.max > 0:
+                self.minpos = float(vals[vals > 0].min())
+                self.maxpos = self.max
+
+        self.sortedness = 0
+        if ndim == 1 and self.numnonfinite == 0:
+            if N.all(vals[1:] >= vals[:-1]):
+                self.sortedness = 1
+            elif N.all(vals[1:] <= vals[:-1]):
+                self.sortedness = -1
+
+    def range(self, positive=False):
+        """Return (min, max) of finite values, or only of the
+        positive values if positive is set. Returns None if there are
+        no values."""
+        if positive:
+            return None if self.minpos is None else (self.minpos, self.maxpos)
+        return None if self.min is None else (self.min, self.max)
+
+class StatsCache:
+    """Values calculated from arrays, kept until the arrays are
+    replaced."""
+
+    def __init__(self):
+        # map of names to (weakrefs to arrays, value)
+        self.entries = {}
+
+    def get(self, name, arrays, fn):
+        """Return fn(*arrays), caching value under name.
+
+        Arrays can be None. Values are only cached if the other items
+        are numpy arrays, which are weakly referenced."""
+
+        entry = self.entries.get(name)
+        if entry is not None:
+            refs, value = entry
+            if len(refs) == len(arrays) and all(
+                    (r is None and a is None) or
+                    (r is not None and r() is a)
+                    for r, a in zip(refs, arrays)):
+                return value
+
+        value = fn(*arrays)
+        if all(a is None or isinstance(a, N.ndarray) for a in arrays):
+            refs = tuple(
+                None if a is None else weakref.ref(a) for a in arrays)
+            self.entries[name] = (refs, value)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+def sortedIndexRange(vals, sortedness, minval, maxval, margin=1):
+    """Return (start, stop) indices of the values between minval and
+    maxval in 1D array vals, which is sorted in increasing order if
+    sortedness is 1, or decreasing order if -1. margin extra values
+    either side are included."""
+
+    num = len(vals)
+    if sortedness > 0:
+        start = N.searchsorted(vals, minval, side='left')
+        stop = N.searchsorted(vals, maxval, side='right')
+    else:
+        rev = vals[::-1]
+        start = num - N.searchsorted(rev, maxval, side='right')
+        stop = num - N.searchsorted(rev, minval, side='left')
+    return max(int(start)-margin, 0), min(int(stop)+margin, num)
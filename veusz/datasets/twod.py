@@ -22,7 +22,7 @@ import numpy as N
 
 from .. import utils
 
-from .commonfn import _, dsPreviewHelper, convertNumpy
+from .commonfn import _, dsPreviewHelper, convertNumpy, shareArray
 from .base import (
     DatasetConcreteBase, DatasetException, DatasetExpressionException)
 
@@ -172,13 +172,13 @@ class Dataset2DBase(DatasetConcreteBase):
 
     def returnCopy(self):
         return Dataset2D(
-            N.array(self.data),
+            shareArray(self.data),
             xrange=self.xrange, yrange=self.yrange,
             xedge=self.xedge, yedge=self.yedge,
-            xcent=self.xcent, ycent=self.ycent )
+            xcent=self.xcent, ycent=self.ycent, native=True )
 
     def returnCopyWithNewData(self, **args):
-        return Dataset2D(**args)
+        return Dataset2D(native=True, **args)
 
 class Dataset2D(Dataset2DBase):
     '''Represents a two-dimensional dataset.'''
@@ -187,7 +187,7 @@ class Dataset2D(Dataset2DBase):
 
     def __init__(self, data=None, xrange=None, yrange=None,
                  xedge=None, yedge=None,
-                 xcent=None, ycent=None):
+                 xcent=None, ycent=None, native=False):
         '''Create a two dimensional dataset based on data.
 
         data: 2d numpy of imaging data
@@ -201,11 +201,14 @@ class Dataset2D(Dataset2DBase):
         _or_
          xcent: list of values (npix values)
          ycent: list of values (npix values)
+
+        native: keep float32 data, instead of converting
+         to float64
         '''
 
         Dataset2DBase.__init__(self)
 
-        self.data = convertNumpy(data, dims=2)
+        self.data = convertNumpy(data, dims=2, native=native)
 
         # try to regularise data if possible
         # by converting regular grids to ranges
@@ -136,8 +136,12 @@ class CaptureDialog(VeuszDialog):
         """User requested capture."""
 
         # object to interpret data from stream
-        descriptor = self.descriptorEdit.text()
-        simprd = simpleread.SimpleRead(descriptor)
+        binary = self.binaryCheck.isChecked()
+        if binary:
+            simprd = capture.BinaryCaptureRead()
+        else:
+            descriptor = self.descriptorEdit.text()
+            simprd = simpleread.SimpleRead(descriptor)
 
         maxlines = None
         timeout = None
@@ -170,16 +174,17 @@ class CaptureDialog(VeuszDialog):
             # create stream
             if method == 0:
                 # file/socket
-                stream = capture.FileCaptureStream(self.filenameEdit.text())
+                stream = capture.FileCaptureStream(
+                    self.filenameEdit.text(), binary=binary)
             elif method == 1:
                 # internet socket
                 stream = capture.SocketCaptureStream(
                     self.hostEdit.text(),
-                    int(self.portEdit.text()) )
+                    int(self.portEdit.text()), binary=binary)
             elif method == 2:
                 # external program
                 stream = capture.CommandCaptureStream(
-                    self.commandLineEdit.text())
+                    self.commandLineEdit.text(), binary=binary)
         except EnvironmentError as e:
             # problem opening stream
             qt.QMessageBox.critical(
@@ -203,6 +208,10 @@ class CapturingDialog(VeuszDialog):
     """Capturing data dialog.
     Shows progress to user."""
 
+    # minimum interval between document updates (s), so that fast
+    # sources do not swamp the plot with redraws
+    minupdateinterval = 0.1
+
     def __init__(self, document, simprd, stream, parent,
                  updateinterval = None):
         """Initialse capture dialog:
@@ -245,7 +254,9 @@ class CapturingDialog(VeuszDialog):
         # timer to update document
         self.updatetimer = qt.QTimer(self)
         self.updateoperation = None
+        self.updatelines = 0
         if updateinterval:
+            updateinterval = max(updateinterval, self.minupdateinterval)
             self.updatetimer.timeout.connect(self.slotUpdateTimer)
             self.updatetimer.start( int(updateinterval*1000) )
 
@@ -284,6 +295,11 @@ class CapturingDialog(VeuszDialog):
     def slotUpdateTimer(self):
         """Called to update document while data is being captured."""
 
+        # only publish if new data have arrived since the last update
+        if self.stream is None or self.stream.linesread == self.updatelines:
+            return
+        self.updatelines = self.stream.linesread
+
         # undo any previous update
         if self.updateoperation:
             self.updateoperation.undo(self.document)
@@ -407,6 +407,7 @@ class ExportDialog(VeuszDialog):
             backcolor=setdb['export_background'],
             svgtextastext=setdb['export_SVG_text_as_text'],
             svgdpi=setdb['export_DPI_SVG'],
+            linetolerance=setdb['export_line_tolerance'],
         )
 
         def _overwriteQuestion(filename):
@@ -43,6 +43,9 @@ color_names = {
 class PreferencesDialog(VeuszDialog):
     """Preferences dialog."""
 
+    # order of items in hdf5CompressionCombo
+    hdf5compressions = ('none', 'gzip', 'lzf')
+
     def __init__(self, mainwindow):
         """Setup dialog."""
         VeuszDialog.__init__(self, mainwindow, 'preferences.ui', modal=True)
@@ -54,6 +57,10 @@ class PreferencesDialog(VeuszDialog):
 
         # view settings
         self.antialiasCheck.setChecked( setdb['plot_antialias'] )
+        self.rasterCacheCheck.setChecked( setdb['plot_rastercache'] )
+        self.threadedPaintCheck.setChecked( setdb['plot_threadedpaint'] )
+        self.progressiveCheck.setChecked( setdb['plot_progressive'] )
+        self.fastNavigationCheck.setChecked( setdb['plot_fastnavigation'] )
         self.englishCheck.setChecked( setdb['ui_english'] )
         for intv in self.plotwindow.updateintervals:
             self.intervalCombo.addItem(intv[1])
@@ -70,6 +77,9 @@ class PreferencesDialog(VeuszDialog):
             self.threadSpinBox.setEnabled(False)
             self.threadSpinBox.setToolTip(
                 _("Disabled because of lack of threaded drawing support"))
+            self.threadedPaintCheck.setEnabled(False)
+            self.threadedPaintCheck.setToolTip(
+                _("Disabled because of lack of threaded drawing support"))
 
         # use cwd for file dialogs
         (self.dirDocCWDRadio if setdb['dirname_usecwd'] else self.dirDocPrevRadio).click()
@@ -77,6 +87,12 @@ class PreferencesDialog(VeuszDialog):
         # add import paths
         self.docFileAddImportPaths.setChecked( setdb['docfile_addimportpaths'] )
 
+        # compression in HDF5 documents
+        self.hdf5CompressionCombo.setCurrentIndex(
+            self.hdf5compressions.index(setdb['docfile_hdf5_compression']))
+        self.hdf5ShuffleCheck.setChecked( setdb['docfile_hdf5_shuffle'] )
+        self.hdf5ThreadSpinBox.setValue( setdb['docfile_hdf5_threads'] )
+
         # exporting documents
         {
             'doc': self.dirExportDocRadio,
@@ -207,6 +223,10 @@ class PreferencesDialog(VeuszDialog):
         setdb['plot_updatepolicy'] = (
             self.plotwindow.updateintervals[self.intervalCombo.currentIndex()][0] )
         setdb['plot_antialias'] = self.antialiasCheck.isChecked()
+        setdb['plot_rastercache'] = self.rasterCacheCheck.isChecked()
+        setdb['plot_threadedpaint'] = self.threadedPaintCheck.isChecked()
+        setdb['plot_progressive'] = self.progressiveCheck.isChecked()
+        setdb['plot_fastnavigation'] = self.fastNavigationCheck.isChecked()
         setdb['ui_english'] = self.englishCheck.isChecked()
         setdb['plot_numthreads'] = self.threadSpinBox.value()
         setdb['translation_file'] = self.translationEdit.text()
@@ -218,6 +238,12 @@ class PreferencesDialog(VeuszDialog):
         # add import paths
         setdb['docfile_addimportpaths'] = self.docFileAddImportPaths.isChecked()
 
+        # HDF5 documents
+        setdb['docfile_hdf5_compression'] = self.hdf5compressions[
+            self.hdf5CompressionCombo.currentIndex()]
+        setdb['docfile_hdf5_shuffle'] = self.hdf5ShuffleCheck.isChecked()
+        setdb['docfile_hdf5_threads'] = self.hdf5ThreadSpinBox.value()
+
         for radio, val in (
                 (self.dirExportDocRadio, 'doc'),
                 (self.dirExportCWDRadio, 'cwd'),
@@ -53,6 +53,7 @@ class CommandInterface(qt.QObject):
         'Add',
         'AddCustom',
         'AddImportPath',
+        'AppendData',
         'CurrentPath',
         'CloneWidget',
         'CreateHistogram',
@@ -66,6 +67,7 @@ class CommandInterface(qt.QObject):
         'GetDatasets',
         'ImportFITSFile',
         'List',
+        'LoadAllData',
         'NodeChildren',
         'NodeType',
         'ReloadData',
@@ -83,7 +85,9 @@ class CommandInterface(qt.QObject):
         'SetDataExpression',
         'SetDataND',
         'SetDataRange',
+        'SetDataRing',
         'SetDataText',
+        'SetMany',
         'SetToReference',
         'SetVerbose',
         'SettingType',
@@ -406,6 +410,7 @@ class CommandInterface(qt.QObject):
         mode can be:
          'vsz': standard veusz text format
          'hdf5': HDF5 format
+         'zip': zip file with data as numpy arrays
         """
         self.document.save(filename, mode)
 
@@ -418,6 +423,30 @@ class CommandInterface(qt.QObject):
         if self.verbose:
             print( _("Set setting '%s' to %s") % (setting_path, repr(setn.get())) )
 
+    def SetMany(self, values):
+        """Set the values of several settings, given a dict of setting
+        paths to values.
+
+        The settings are changed in a single operation, so the
+        document is only updated once. Nothing is changed if any path
+        or value is invalid.
+        """
+        if not values:
+            return
+
+        ops = []
+        for setting_path, val in values.items():
+            setn = self.document.resolveSettingPath(
+                self.currentwidget, setting_path)
+            # raises InvalidType if not valid
+            setn.normalize(val)
+            ops.append(operations.OperationSettingSet(setn, val))
+        self.document.applyOperation(
+            operations.OperationMultiple(ops, descr=_('change settings')))
+
+        if self.verbose:
+            print( _("Set %i settings") % len(ops) )
+
     def SetToReference(self, setting_path, val):
         """Set setting to a reference value."""
         setn = self.document.resolveSettingPath(self.currentwidget, setting_path)
@@ -448,6 +477,41 @@ class CommandInterface(qt.QObject):
                 )
             )
 
+    def SetDataRing(self, name, capacity, val=None, symerr=None,
+                    negerr=None, poserr=None, errors=()):
+        """Create/set ring dataset name, which holds the last capacity
+        values appended to it with AppendData.
+
+        val, symerr, negerr and poserr are optional initial values.
+        errors is a list of error columns to create if initial errors
+        are not given ('serr', 'nerr' or 'perr').
+        """
+
+        data = datasets.DatasetRing(
+            capacity, data=val, serr=symerr, nerr=negerr, perr=poserr,
+            errors=errors)
+        op = operations.OperationDatasetSet(name, data)
+        self.document.applyOperation(op)
+
+        if self.verbose:
+            print(
+                _("Set ring dataset '%s' with capacity %i") % (
+                    name, data.capacity)
+            )
+
+    def AppendData(self, name, val, symerr=None, negerr=None, poserr=None):
+        """Append values (and optionally errors) to ring dataset name."""
+
+        op = operations.OperationDatasetRingAppend(
+            name, val, serr=symerr, nerr=negerr, perr=poserr)
+        self.document.applyOperation(op)
+
+        if self.verbose:
+            print(
+                _("Appended to dataset '%s':\n"
+                  " Values = %s") % (name, str(val))
+            )
+
     def SetDataDateTime(self, name, vals):
         """Set datetime dataset to be values given.
         vals is a list of python datetime objects
@@ -750,6 +814,12 @@ class CommandInterface(qt.QObject):
 
         return self.document.reloadLinkedDatasets()
 
+    def LoadAllData(self):
+        """Read any datasets which would otherwise be read when first
+        used, such as those in HDF5 documents."""
+
+        self.document.loadAllData()
+
     def Action(self, action, widget='.'):
         """Performs action on current widget."""
 
@@ -764,7 +834,8 @@ class CommandInterface(qt.QObject):
 
     def Export(self, filename, color=True, page=[0], dpi=100,
                antialias=True, quality=85, backcolor='#ffffff00',
-               pdfdpi=150, svgdpi=96, svgtextastext=False):
+               pdfdpi=150, svgdpi=96, svgtextastext=False,
+               linetolerance=0.):
         """Export plot to filename.
 
         color is True or False if color is requested in output file
@@ -777,6 +848,8 @@ class CommandInterface(qt.QObject):
         pdfdpi is the dpi to use when exporting eps or pdf files
         svgdpi is the dpi to use when exporting svg files
         svgtextastext: write text in SVG as text, rather than curves
+        linetolerance: lines in vector formats are simplified to a few
+         points in columns of this width in output pixels (0 to disable)
         """
 
         # compatibility where page was a single number
@@ -794,7 +867,8 @@ class CommandInterface(qt.QObject):
             backcolor=backcolor,
             pdfdpi=pdfdpi,
             svgdpi=svgdpi,
-            svgtextastext=svgtextastext
+            svgtextastext=svgtextastext,
+            linetolerance=linetolerance,
         )
         e.add(filename, pages)
         e.finish()
@@ -23,6 +23,8 @@
 
 import codecs
 import os.path
+import threading
+import time
 import traceback
 import datetime
 from io import StringIO
@@ -38,6 +40,8 @@ from .. import qtall as qt
 from . import widgetfactory
 from . import painthelper
 from . import evaluate
+from . import hdf5save
+from . import zipdoc
 
 from .. import datasets
 from .. import utils
@@ -68,6 +72,19 @@ class DocSuspend:
     def __exit__(self, type, value, traceback):
         self.doc.enableUpdates()
 
+class DocChange:
+    """Wait for any painting of the document to finish before it is
+    modified, stopping painting which can be cancelled."""
+    def __init__(self, doc):
+        self.doc = doc
+    def __enter__(self):
+        self.doc.paintwaiting += 1
+        self.doc.paintlock.acquire()
+        self.doc.paintwaiting -= 1
+        return self
+    def __exit__(self, type, value, traceback):
+        self.doc.paintlock.release()
+
 class Document(qt.QObject):
     """Document class for holding the graph data.
     """
@@ -95,6 +112,7 @@ class Document(qt.QObject):
 
         # change tracking of document as a whole
         self.changeset = 0            # increased when the document changes
+        self.datachangeset = 0        # increased when datasets change
 
         # map tags to dataset names
         self.datasettags = defaultdict(list)
@@ -106,20 +124,31 @@ class Document(qt.QObject):
         # default document locale
         self.locale = qt.QLocale()
 
+        # map (widget or None, path) to item resolved by resolvePath
+        self.pathindex = {}
+
         # evaluation context
         self.evaluate = evaluate.Evaluate(self)
 
+        # held while painting or modifying the document, with the
+        # number of modifications waiting for painting to finish
+        self.paintlock = threading.RLock()
+        self.paintwaiting = 0
+
         self.clearHistory()
         self.wipe()
 
     def wipe(self):
         """Wipe out any stored data."""
-        self.data = {}
-        self.basewidget = widgetfactory.thefactory.makeWidget(
-            'document', None, self)
-        self.setModified(False)
-        self.filename = ""
-        self.evaluate.wipe()
+        with DocChange(self):
+            self.data = {}
+            self.datachangeset += 1
+            self.pathindex.clear()
+            self.basewidget = widgetfactory.thefactory.makeWidget(
+                'document', None, self)
+            self.setModified(False)
+            self.filename = ""
+            self.evaluate.wipe()
         self.sigWiped.emit()
 
     def clearHistory(self):
@@ -146,6 +175,11 @@ class Document(qt.QObject):
         """Return context manager for suspending updates."""
         return DocSuspend(self)
 
+    def change(self):
+        """Return context manager to hold while modifying the
+        document, so that it is not modified while being painted."""
+        return DocChange(self)
+
     def makeDefaultDoc(self, mode='graph'):
         """Add default widgets to create document.
 
@@ -180,9 +214,10 @@ class Document(qt.QObject):
         If redoing is not True, the redo stack is cleared
         """
 
-        with DocSuspend(self):
+        with DocChange(self), DocSuspend(self):
             retn = operation.do(self)
             self.changeset += 1
+            setting.invalidateReferenceCache()
 
         if self.historybatch:
             # in batch mode, create an OperationMultiple for all changes
@@ -215,9 +250,10 @@ class Document(qt.QObject):
         """Undo the previous operation."""
 
         operation = self.historyundo.pop()
-        with DocSuspend(self):
+        with DocChange(self), DocSuspend(self):
             operation.undo(self)
             self.changeset += 1
+            setting.invalidateReferenceCache()
         self.historyredo.append(operation)
 
     def canUndo(self):
@@ -239,20 +275,27 @@ class Document(qt.QObject):
 
     def setData(self, name, dataset):
         """Set dataset in document."""
-        self.data[name] = dataset
-        dataset.document = self
+        with DocChange(self):
+            self.data[name] = dataset
+            dataset.document = self
+            self.datachangeset += 1
 
         # update the change tracking
         self.setModified()
 
     def deleteData(self, name):
         """Remove a dataset"""
-        del self.data[name]
+        with DocChange(self):
+            del self.data[name]
+            self.datachangeset += 1
         self.setModified()
 
     def modifiedData(self, dataset):
         """Notify dataset was modified"""
         assert dataset in self.data.values()
+        with DocChange(self):
+            dataset.invalidateStats()
+            self.datachangeset += 1
         self.setModified()
 
     def getLinkedFiles(self, filenames=None):
@@ -283,7 +326,7 @@ class Document(qt.QObject):
 
         # load in the files, merging the vars read and errors
         if links:
-            with self.suspend():
+            with DocChange(self), self.suspend():
                 for lf in links:
                     nread, nerrors = lf.reloadLinks(self)
                     read += nread
@@ -302,9 +345,11 @@ class Document(qt.QObject):
 
     def renameDataset(self, oldname, newname):
         """Rename the dataset."""
-        d = self.data[oldname]
-        del self.data[oldname]
-        self.data[newname] = d
+        with DocChange(self):
+            d = self.data[oldname]
+            del self.data[oldname]
+            self.data[newname] = d
+            self.datachangeset += 1
 
         self.setModified()
 
@@ -312,6 +357,14 @@ class Document(qt.QObject):
         """Get data with name"""
         return self.data[name]
 
+    def loadAllData(self):
+        """Read any datasets which are read from files when first
+        used (e.g. from HDF5 documents)."""
+        with DocChange(self):
+            for ds in self.data.values():
+                if isinstance(ds, datasets.DatasetLazyMixin):
+                    ds.loadData()
+
     def setModified(self, ismodified=True):
         """Set the modified flag on the data, and inform views."""
 
@@ -345,8 +398,29 @@ class Document(qt.QObject):
                 raise RuntimeError(err)
 
     def paintTo(self, painthelper, page):
-        """Paint page specified to the paint helper."""
-        self.basewidget.draw(painthelper, page)
+        """Paint page specified to the paint helper.
+
+        The number of references resolved while painting is recorded
+        in painthelper.referencelookups and referencecached, and the
+        time taken in painthelper.painttime. Layers
+        of widgets which were not drawn are removed from any layer
+        cache of the paint helper.
+
+        The document is not modified while painting, so this can be
+        called from another thread. If the paint helper is
+        cancellable, painting stops with PaintCancelled if the
+        document is to be modified.
+        """
+        with self.paintlock:
+            start = time.perf_counter()
+            painthelper.changeset = self.changeset
+            setting.referencecounter.reset()
+            self.basewidget.draw(painthelper, page)
+            painthelper.painttime = time.perf_counter() - start
+            painthelper.referencelookups = setting.referencecounter.lookups
+            painthelper.referencecached = setting.referencecounter.cached
+            if painthelper.layercache is not None:
+                painthelper.layercache.prune(painthelper)
 
     def getNumberPages(self):
         """Return the number of pages in the document."""
@@ -435,25 +509,17 @@ class Document(qt.QObject):
 
         self.setModified(False)
 
-    def saveToHDF5File(self, fileobj):
-        """Save to HDF5 (h5py) output file given."""
-
-        # groups in output hdf5
-        vszgrp = fileobj.create_group('Veusz')
-        vszgrp.attrs['vsz_version'] = utils.version()
-        vszgrp.attrs['vsz_saved_at'] = datetime.datetime.utcnow().isoformat()
-        vszgrp.attrs['vsz_format'] = 1  # version number (currently unused)
-        datagrp = vszgrp.create_group('Data')
-        docgrp = vszgrp.create_group('Document')
-
-        textstream = StringIO()
+    def _saveScriptWithData(self, textstream, filename, datagroup):
+        """Write the start of the script for a document with the data
+        saved separately, saving the datasets into datagroup (a h5py
+        like group)."""
 
         self._writeFileHeader(textstream, 'saved document')
 
         # add file directory to import path if we know it
         reldirname = None
-        if getattr(fileobj, 'filename', False):
-            reldirname = os.path.dirname( os.path.abspath(fileobj.filename) )
+        if filename:
+            reldirname = os.path.dirname( os.path.abspath(filename) )
             textstream.write('AddImportPath(%s)\n' % utils.rrepr(reldirname))
 
         # add custom definitions
@@ -468,19 +534,48 @@ class Document(qt.QObject):
 
         # save the remaining datasets
         for name, dataset in sorted(self.data.items()):
-            dataset.saveToFile(textstream, name, mode='hdf5', hdfgroup=datagrp)
+            dataset.saveToFile(
+                textstream, name, mode='hdf5', hdfgroup=datagroup)
 
-        # handle tagging
-        # get a list of all tags and which datasets have them
+    def _datasetsByTag(self):
+        """Return dict of tags to sorted lists of datasets with tag."""
         bytag = defaultdict(list)
         for name, dataset in sorted(self.data.items()):
             for t in dataset.tags:
                 bytag[t].append(name)
+        return bytag
+
+    def saveToHDF5File(self, fileobj, options=None):
+        """Save to HDF5 (h5py) output file given.
+
+        options is a HDF5SaveOptions giving chunking and compression
+        (default from user settings).
+
+        Returns a dict of lazily read datasets which were copied from
+        the file they were read from, mapped to their paths in fileobj.
+        """
+
+        if options is None:
+            options = hdf5save.HDF5SaveOptions.fromSettings()
+
+        # groups in output hdf5
+        vszgrp = fileobj.create_group('Veusz')
+        vszgrp.attrs['vsz_version'] = utils.version()
+        vszgrp.attrs['vsz_saved_at'] = datetime.datetime.utcnow().isoformat()
+        vszgrp.attrs['vsz_format'] = 1  # version number (currently unused)
+        datagrp = vszgrp.create_group('Data')
+        docgrp = vszgrp.create_group('Document')
+
+        textstream = StringIO()
+        with hdf5save.HDF5DataWriter(datagrp, options) as writer:
+            self._saveScriptWithData(
+                textstream, getattr(fileobj, 'filename', None), writer.root)
+            writer.write()
 
         # write out tags as datasets
         tagsgrp = docgrp.create_group('Tags')
-        for tag, dsnames in sorted(bytag.items()):
-            tagsgrp[tag] = [v.encode('utf-8') for v in sorted(dsnames)]
+        for tag, dsnames in sorted(self._datasetsByTag().items()):
+            tagsgrp[tag] = [v.encode('utf-8') for v in dsnames]
 
         # save the actual tree structure
         textstream.write(self.basewidget.getSaveText())
@@ -489,22 +584,51 @@ class Document(qt.QObject):
         docgrp['document'] = [ textstream.getvalue().encode('utf-8') ]
 
         self.setModified(False)
+        return writer.copied
+
+    def saveToZipFile(self, filename):
+        """Save to zip document, with the data as numpy arrays."""
+
+        datagroup = hdf5save.RecordGroup(())
+        textstream = StringIO()
+        self._saveScriptWithData(textstream, filename, datagroup)
+        textstream.write(self.basewidget.getSaveText())
+
+        zipdoc.writeZipDocument(
+            filename, textstream.getvalue(), datagroup,
+            dict(self._datasetsByTag()))
+
+        self.setModified(False)
 
-    def save(self, filename, mode='vsz'):
+    def save(self, filename, mode='vsz', hdf5options=None):
         """Save to output file.
 
-        mode is 'vsz' or 'hdf5'
+        mode is 'vsz', 'hdf5' or 'zip'
+        hdf5options is an optional HDF5SaveOptions for hdf5 mode
         """
-        if mode == 'vsz':
-            with codecs.open(filename, 'w', 'utf-8') as f:
-                self.saveToFile(f)
-        elif mode == 'hdf5':
-            if h5py is None:
-                raise RuntimeError('Missing h5py module')
-            with h5py.File(filename, 'w') as f:
-                self.saveToHDF5File(f)
-        else:
-            raise RuntimeError('Invalid save mode')
+
+        # the lock is held, as datasets read from the file being
+        # replaced are changed
+        with DocChange(self):
+            # datasets loaded from a zip document may be memory mapped
+            # from the file being replaced
+            zipdoc.detachMappedArrays(filename, self.data.values())
+
+            if mode == 'vsz':
+                datasets.LazyHDF5File.prepareWrite(filename)
+                with codecs.open(filename, 'w', 'utf-8') as f:
+                    self.saveToFile(f)
+            elif mode == 'hdf5':
+                if h5py is None:
+                    raise RuntimeError('Missing h5py module')
+                hdf5save.writeHDF5Document(
+                    filename,
+                    lambda f: self.saveToHDF5File(f, options=hdf5options))
+            elif mode == 'zip':
+                datasets.LazyHDF5File.prepareWrite(filename)
+                self.saveToZipFile(filename)
+            else:
+                raise RuntimeError('Invalid save mode')
 
         self.filename = filename
 
@@ -513,7 +637,7 @@ class Document(qt.QObject):
              callbackimporterror=None):
         """Load document from file.
 
-        mode is 'vsz' or 'hdf5'
+        mode is 'vsz', 'hdf5' or 'zip'
         """
         from . import loader
         loader.loadDocument(
@@ -560,16 +684,37 @@ class Document(qt.QObject):
             self.basewidget,
             dpi=dpi, scaling=scaling, integer=integer)
 
+    def invalidatePathIndex(self):
+        """Forget resolved paths, after the widget tree is modified."""
+        self.pathindex.clear()
+
     def resolvePath(self, fromobj, path):
         """Resolve item relative to fromobj.
 
         If fromobj is None, then an absolute path is assumed.
 
         Returns a widget, setting or settings as appropriate.
+
+        Resolved paths are kept in an index, which is cleared when
+        widgets are added, removed, renamed or moved.
         """
 
+        if path[:1]=='/' or fromobj is None:
+            fromobj = None
+        key = (fromobj, path)
+        try:
+            return self.pathindex[key]
+        except KeyError:
+            pass
+        obj = self._lookupPath(fromobj, path)
+        self.pathindex[key] = obj
+        return obj
+
+    def _lookupPath(self, fromobj, path):
+        """Find item by walking the tree (see resolvePath)."""
+
         # where to search from
-        obj = self.basewidget if (path[:1]=='/' or fromobj is None) else fromobj
+        obj = self.basewidget if fromobj is None else fromobj
 
         # iterate over path parts
         for p in path.split('/'):
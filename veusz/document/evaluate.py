@@ -107,6 +107,10 @@ class Evaluate:
         self.exprdscache = {}
         self.exprdscachechangeset = None
 
+        # whether SETTING() has been evaluated, so expressions may
+        # depend on setting values as well as datasets
+        self.settingsused = False
+
         # whether we hit security tests
         self.setSecurity(False)
 
@@ -118,6 +122,9 @@ class Evaluate:
         c = self.context
         c.clear()
 
+        # datasets made from expressions may now have other values
+        self.doc.datachangeset += 1
+
         # add numpy things
         # we try to avoid various bits and pieces for safety
         for name, val in N.__dict__.items():
@@ -378,6 +385,7 @@ class Evaluate:
 
     def _evalsetting(self, path):
         """SETTING() eval: return setting given full path."""
+        self.settingsused = True
         return self.doc.resolveSettingPath(None, path).get()
 
     @staticmethod
@@ -357,7 +357,8 @@ class AsyncExport(qt.QObject):
 
     def __init__(self, doc, color=True, bitmapdpi=100,
                  antialias=True, quality=85, backcolor='#ffffff00',
-                 pdfdpi=150, svgdpi=96, svgtextastext=False):
+                 pdfdpi=150, svgdpi=96, svgtextastext=False,
+                 linetolerance=0.):
         """Initialise export class. Parameters are:
         doc: document to write
         color: use color or try to use monochrome
@@ -368,6 +369,8 @@ class AsyncExport(qt.QObject):
         pdfdpi: dpi for pdf and eps files
         svgdpi: dpi for svg files
         svgtextastext: write text in SVG as text, rather than curves
+        linetolerance: lines in vector formats are simplified to a few
+         points in columns of this width in output pixels (0 to disable)
         """
 
         qt.QObject.__init__(self)
@@ -380,6 +383,7 @@ class AsyncExport(qt.QObject):
         self.pdfdpi = pdfdpi
         self.svgdpi = svgdpi
         self.svgtextastext = svgtextastext
+        self.linetolerance = linetolerance
 
         self.backqcolor = self.doc.evaluate.colors.get(self.backcolor)
 
@@ -445,11 +449,23 @@ class AsyncExport(qt.QObject):
         ext = os.path.splitext(filename)[1].lower()
         dpi = self.getDPI(ext)
 
+        # lines are simplified to pixel columns for bitmaps, or to the
+        # tolerance requested for vector formats (self tests are exact)
+        bitmap = ext in {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.xpm'}
+        if bitmap:
+            linetolerance = 1.
+        elif ext == '.selftest':
+            linetolerance = 0.
+        else:
+            linetolerance = self.linetolerance
+
         # render each page to a PaintHelper
         phelpers = []
         for page in pages:
             size = self.doc.pageSize(page, dpi=dpi, integer=False)
-            phelper = painthelper.PaintHelper(self.doc, size, dpi=dpi)
+            phelper = painthelper.PaintHelper(
+                self.doc, size, dpi=dpi, linetolerance=linetolerance,
+                bitmap=bitmap, antialias=self.antialias)
             self.doc.paintTo(phelper, page)
             phelpers.append(phelper)
 
@@ -0,0 +1,325 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+##############################################################################
+
+"""Writing datasets into HDF5 saved documents.
+
+Datasets describe themselves using saveDataDumpToHDF5, writing into
+an h5py-like group. Here they are first written into a recording
+group. Datasets read lazily from an HDF5 document, whose values have
+not changed, are copied from the item they were read from, without
+decompressing and compressing the data again. Other recorded arrays
+are written using chunking, compression and shuffling, optionally
+compressing chunks in a thread pool.
+
+Documents are written to a new file, which replaces any existing one
+when finished.
+"""
+
+import collections
+import itertools
+import os.path
+import posixpath
+import tempfile
+import zlib
+from concurrent import futures
+
+import numpy as N
+
+from .. import datasets
+from .. import setting
+from .. import utils
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+class HDF5SaveOptions:
+    """Options for writing arrays in HDF5 documents."""
+
+    def __init__(self, compression='gzip', level=4, shuffle=True,
+                 chunkbytes=1<<20, threads=0, minbytes=16384):
+        """
+        compression: None, 'gzip' or 'lzf'
+        level: gzip compression level (0-9)
+        shuffle: apply byte shuffle filter before compressing
+        chunkbytes: target size of chunks in bytes
+        threads: number of threads to compress gzip chunks (0 for none)
+        minbytes: arrays smaller than this are not chunked
+        """
+        if compression not in (None, 'gzip', 'lzf'):
+            raise ValueError('Invalid compression type')
+        self.compression = compression
+        self.level = level
+        self.shuffle = shuffle
+        self.chunkbytes = chunkbytes
+        self.threads = threads
+        self.minbytes = minbytes
+
+    @classmethod
+    def fromSettings(kls):
+        """Get options from user settings."""
+        setdb = setting.settingdb
+        compression = setdb['docfile_hdf5_compression']
+        return kls(
+            compression=None if compression == 'none' else compression,
+            shuffle=setdb['docfile_hdf5_shuffle'],
+            threads=setdb['docfile_hdf5_threads'],
+        )
+
+def chunkShape(shape, itemsize, chunkbytes):
+    """Choose a chunk shape for an array, reducing leading dimensions
+    until the chunk is not much larger than chunkbytes."""
+
+    chunk = list(shape)
+    for i in range(len(chunk)):
+        rest = itemsize * int(N.prod(chunk[i+1:]))
+        if rest*chunk[i] <= chunkbytes:
+            break
+        chunk[i] = max(1, chunkbytes // rest)
+        if rest <= chunkbytes:
+            break
+    return tuple(chunk)
+
+def _compressChunk(block, chunk, level, shuffle):
+    """Compress block of array as an HDF5 gzip (optionally shuffled)
+    chunk. This is called in a worker thread."""
+
+    if block.shape != chunk:
+        # edge chunks are padded to the full chunk size
+        full = N.zeros(chunk, dtype=block.dtype)
+        full[tuple(slice(0, n) for n in block.shape)] = block
+        block = full
+    block = N.ascontiguousarray(block)
+    if shuffle and block.itemsize > 1:
+        # same as the HDF5 shuffle filter: first bytes of each item,
+        # then the second bytes, etc.
+        data = block.view(N.uint8).reshape(-1, block.itemsize).T.tobytes()
+    else:
+        data = block.tobytes()
+    return zlib.compress(data, level)
+
+class RecordRef:
+    """Placeholder for a reference to a recorded node."""
+    def __init__(self, path):
+        self.path = path
+
+class RecordGroup:
+    """Records the groups, arrays and attributes written by
+    saveDataDumpToHDF5, acting like a h5py group or dataset."""
+
+    def __init__(self, path, value=None):
+        self.path = path
+        self.value = value
+        self.attrs = {}
+        self.children = {}
+        # set for items added with addCopy
+        self.dataset = self.source = self.saver = None
+
+    @property
+    def ref(self):
+        return RecordRef(self.path)
+
+    def create_group(self, name):
+        node = self.children[name] = RecordGroup(self.path+(name,))
+        return node
+
+    def __setitem__(self, name, value):
+        self.children[name] = RecordGroup(self.path+(name,), value)
+
+    def __getitem__(self, name):
+        return self.children[name]
+
+    def __contains__(self, name):
+        return name in self.children
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def addCopy(self, name, dataset, source, saver):
+        """Add item which is a copy of the unchanged values of lazily
+        read dataset, found at source (LazyHDF5File, path). saver(group)
+        is only called to save the contents into group if needed."""
+        node = self.children[name] = RecordGroup(self.path+(name,))
+        node.dataset = dataset
+        node.source = source
+        node.saver = saver
+
+    def resolve(self):
+        """Return node with the contents recorded."""
+        if self.saver is None:
+            return self
+        parent = RecordGroup(self.path[:-1])
+        self.saver(parent)
+        return parent.children[self.path[-1]]
+
+    def walk(self):
+        """Iterate over this node and its descendents."""
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+class HDF5DataWriter:
+    """Write datasets into an HDF5 group.
+
+    Datasets are saved into the root attribute, which acts like a h5py
+    group, using saveDataDumpToHDF5. The recorded items are then
+    written to the group with write(). Use as a context manager, so
+    that any thread pool is shut down.
+    """
+
+    def __init__(self, group, options):
+        self.group = group
+        self.options = options
+        self.root = RecordGroup(())
+        self.pool = None
+        # lazily read datasets copied, mapped to their new paths
+        self.copied = {}
+
+    def __enter__(self):
+        if self.options.threads > 0 and self.options.compression == 'gzip':
+            self.pool = futures.ThreadPoolExecutor(self.options.threads)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def write(self):
+        """Write the recorded items into the group."""
+
+        for key, node in self.root.children.items():
+            if node.source is not None:
+                self._copyItem(key, node.source)
+                self.copied[node.dataset] = self.group[key].name
+                continue
+
+            # write the arrays and groups, then the attributes (which
+            # may refer to the other items)
+            objs = {}
+            self._writeNode(node, self.group, objs)
+            for n in node.walk():
+                obj = objs[n.path]
+                for attr, val in n.attrs.items():
+                    if isinstance(val, RecordRef):
+                        val = objs[val.path].ref
+                    obj.attrs[attr] = val
+
+    def _copyItem(self, key, source):
+        """Copy item from source (LazyHDF5File, path) to key in the
+        group, keeping the stored (compressed) data."""
+
+        lazyfile, path = source
+        srcitem = lazyfile.get(path)
+        self.group.copy(srcitem, self.group, name=key)
+        item = self.group[key]
+
+        def copiedItem(srcobj):
+            relpath = posixpath.relpath(srcobj.name, srcitem.name)
+            return item if relpath == '.' else item[relpath]
+
+        # object references are not copied between files, so point
+        # them at the copied items
+        srcitems = [srcitem]
+        if isinstance(srcitem, h5py.Group):
+            srcitem.visititems(lambda name, obj: srcitems.append(obj))
+        for srcobj in srcitems:
+            for attr, val in srcobj.attrs.items():
+                if isinstance(val, h5py.Reference):
+                    copiedItem(srcobj).attrs[attr] = copiedItem(
+                        srcitem.file[val]).ref
+
+    def _writeNode(self, node, h5grp, objs):
+        """Write node into h5grp, recording the objects created."""
+        name = node.path[-1]
+        if node.value is None:
+            obj = h5grp.create_group(name)
+            for child in node.children.values():
+                self._writeNode(child, obj, objs)
+        else:
+            obj = self.writeArray(h5grp, name, node.value)
+        objs[node.path] = obj
+
+    def writeArray(self, h5grp, name, value):
+        """Write array to group, returning h5py dataset."""
+
+        opts = self.options
+        arr = N.asarray(value)
+        if ( opts.compression is None or arr.dtype.kind not in 'biuf' or
+             arr.ndim == 0 or arr.nbytes < opts.minbytes ):
+            h5grp[name] = arr
+            return h5grp[name]
+
+        chunk = chunkShape(arr.shape, arr.itemsize, opts.chunkbytes)
+        dset = h5grp.create_dataset(
+            name, shape=arr.shape, dtype=arr.dtype, chunks=chunk,
+            compression=opts.compression,
+            compression_opts=opts.level if opts.compression=='gzip' else None,
+            shuffle=opts.shuffle)
+
+        if self.pool is None or not hasattr(dset.id, 'write_direct_chunk'):
+            # compression done by HDF5 library
+            dset[...] = arr
+            return dset
+
+        # compress chunks in threads, writing them in order, keeping
+        # a limited number in flight to bound memory usage
+        pending = collections.deque()
+        maxpending = opts.threads*4
+        offsets = itertools.product(*[
+            range(0, n, c) for n, c in zip(arr.shape, chunk)])
+        for offset in offsets:
+            block = arr[tuple(slice(o, o+c) for o, c in zip(offset, chunk))]
+            pending.append((offset, self.pool.submit(
+                _compressChunk, block, chunk, opts.level, opts.shuffle)))
+            if len(pending) >= maxpending:
+                off, fut = pending.popleft()
+                dset.id.write_direct_chunk(off, fut.result())
+        while pending:
+            off, fut = pending.popleft()
+            dset.id.write_direct_chunk(off, fut.result())
+
+        return dset
+
+def writeHDF5Document(filename, writefn):
+    """Write HDF5 document.
+
+    writefn(hdffile) writes the document into the h5py.File given,
+    returning a dict of the lazily read datasets it copied, mapped to
+    their paths in the file.
+
+    The file is written to a temporary file first, then renamed, so
+    that an existing file is kept if writing fails. Datasets read
+    from an existing file which are not copied are read before it is
+    replaced.
+    """
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, tempname = tempfile.mkstemp(
+        dir=dirname, prefix='.veusz_', suffix='.tmp')
+    os.close(fd)
+    try:
+        with h5py.File(tempname, 'w') as f:
+            copied = writefn(f)
+        # the file may be open to read lazily loaded datasets
+        datasets.LazyHDF5File.prepareWrite(filename, copied)
+        utils.replaceFile(tempname, filename)
+    except:
+        os.unlink(tempname)
+        raise
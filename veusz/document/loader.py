@@ -18,17 +18,22 @@
 
 # note: no future statements here for backward compatibility
 
+import ast
 import sys
 import os.path
 import traceback
 import io
+import zipfile
 import numpy as N
 
 from .. import qtall as qt
+from .. import setting
 from .. import utils
 
 from .commandinterface import CommandInterface
 from . import datasets
+from . import widgetfactory
+from . import zipdoc
 
 # loaded lazily
 h5py = None
@@ -80,6 +85,90 @@ def _importcaller(interface, name, callbackimporterror):
                 break
     return wrapped
 
+def _parseSimpleScript(script, filename, interface):
+    """Parse a script containing only calls to interface commands with
+    literal arguments, as written when saving documents.
+
+    Returns a list of (lineno, command, args, kwargs) or None if the
+    script contains anything else.
+    """
+
+    try:
+        tree = ast.parse(script, filename, 'exec')
+    except (SyntaxError, ValueError):
+        return None
+
+    allowed = set(interface.safe_commands) | set(interface.import_commands)
+    commands = []
+    for stmt in tree.body:
+        if ( not isinstance(stmt, ast.Expr) or
+             not isinstance(stmt.value, ast.Call) or
+             not isinstance(stmt.value.func, ast.Name) or
+             stmt.value.func.id not in allowed ):
+            return None
+        call = stmt.value
+        try:
+            args = [ast.literal_eval(a) for a in call.args]
+            kwargs = {}
+            for kw in call.keywords:
+                if kw.arg is None:
+                    return None
+                kwargs[kw.arg] = ast.literal_eval(kw.value)
+        except ValueError:
+            # not a literal (e.g. starred argument or expression)
+            return None
+        commands.append((stmt.lineno, call.func.id, args, kwargs))
+    return commands
+
+def _executeSimple(thedoc, interface, commands, callbackimporterror):
+    """Run commands from _parseSimpleScript.
+
+    The widget tree commands are applied directly, without creating
+    operations, as there is no need to undo loading a document. Other
+    commands are called using the interface. The caller should hold
+    the document change lock.
+    """
+
+    def add(widgettype, widget=None, **args):
+        parent = interface.currentwidget
+        if widget is not None:
+            parent = thedoc.resolveWidgetPath(parent, widget)
+        widgetfactory.thefactory.makeWidget(
+            widgettype, parent, thedoc, **args)
+
+    def setval(setting_path, val):
+        thedoc.resolveSettingPath(
+            interface.currentwidget, setting_path).set(val)
+
+    def setref(setting_path, val):
+        setval(setting_path, setting.Reference(val))
+
+    funcs = {
+        'Add': add,
+        'Set': setval,
+        'SetToReference': setref,
+        'To': interface.To,
+    }
+    for name in interface.import_commands:
+        funcs[name] = _importcaller(interface, name, callbackimporterror)
+
+    for lineno, cmd, args, kwargs in commands:
+        func = funcs.get(cmd)
+        if func is None:
+            func = getattr(interface, cmd)
+        try:
+            func(*args, **kwargs)
+        except LoadError:
+            raise
+        except Exception as e:
+            info = sys.exc_info()
+            backtrace = ''.join(traceback.format_exception(*info))
+            raise LoadError(
+                _('Error on line %i: %s') % (lineno, str(e)),
+                backtrace=backtrace)
+
+    thedoc.changeset += 1
+
 def executeScript(thedoc, filename, script,
                   callbackunsafe=None,
                   callbackimporterror=None):
@@ -94,6 +183,10 @@ def executeScript(thedoc, filename, script,
       ok to execute any unsafe commands found. Return True if ok.
     callbackimporterror(filename, error): should be set to function to return new filename in case of import error, or False if none
 
+    Documents only containing commands with literal arguments, as
+    written by Veusz, are run without exec, which is much faster for
+    large documents.
+
     User should wipe docment before calling this.
     """
 
@@ -102,6 +195,17 @@ def executeScript(thedoc, filename, script,
         backtrace = ''.join(traceback.format_exception(*info))
         return LoadError(str(exc), backtrace=backtrace)
 
+    interface = CommandInterface(thedoc)
+    # allow import to happen relative to loaded file
+    importpath = os.path.dirname(os.path.abspath(filename))
+
+    commands = _parseSimpleScript(script, filename, interface)
+    if commands is not None:
+        interface.AddImportPath(importpath)
+        with thedoc.change(), thedoc.suspend():
+            _executeSimple(thedoc, interface, commands, callbackimporterror)
+        return
+
     # compile script and check for security (if reqd)
     while True:
         try:
@@ -119,7 +223,6 @@ def executeScript(thedoc, filename, script,
             raise genexception(e)
 
     env = thedoc.evaluate.context.copy()
-    interface = CommandInterface(thedoc)
 
     # allow safe commands as-is
     for cmd in interface.safe_commands:
@@ -146,10 +249,9 @@ def executeScript(thedoc, filename, script,
 
     # get ready for loading document
     env['__file__'] = filename
-    # allow import to happen relative to loaded file
-    interface.AddImportPath( os.path.dirname(os.path.abspath(filename)) )
+    interface.AddImportPath(importpath)
 
-    with thedoc.suspend():
+    with thedoc.change(), thedoc.suspend():
         try:
             # actually run script text
             exec(compiled, env)
@@ -165,31 +267,58 @@ def loadHDF5Dataset1D(datagrp):
     # this gives error: 'perr' in datagrp
     parts = set(datagrp) & set(('data', 'serr', 'perr', 'nerr'))
     for v in parts:
-        args[v] = N.array(datagrp[v])
-    return datasets.Dataset(**args)
+        args[v] = N.asarray(datagrp[v])
+    if 'vsz_capacity' in datagrp.attrs:
+        return datasets.DatasetRing(datagrp.attrs['vsz_capacity'], **args)
+    return datasets.Dataset(native=True, **args)
 
 def loadHDF5Dataset2D(datagrp):
     args = {}
     parts = set(datagrp) & set(
         ('data', 'xcent', 'xedge', 'ycent', 'yedge', 'xrange', 'yrange'))
     for v in parts:
-        args[v] = N.array(datagrp[v])
-    return datasets.Dataset2D(**args)
+        args[v] = N.asarray(datagrp[v])
+    return datasets.Dataset2D(native=True, **args)
+
+def loadHDF5DatasetND(datagrp):
+    return datasets.DatasetND(data=N.asarray(datagrp), native=True)
 
 def loadHDF5DatasetDate(datagrp):
-    return datasets.DatasetDateTime(data=datagrp['data'])
+    return datasets.DatasetDateTime(data=N.asarray(datagrp['data']))
 
 def loadHDF5DatasetText(datagrp):
     data = [d.decode('utf-8') for d in datagrp['data']]
     return datasets.DatasetText(data=data)
 
-def loadHDF5Datasets(thedoc, hdffile):
-    """Load all the Veusz datasets in the HDF5 file."""
-    alldatagrp = hdffile['Veusz']['Data']
+# classes for datasets read when first used
+lazyclasses = {
+    '1d': datasets.Dataset1DLazy,
+    '2d': datasets.Dataset2DLazy,
+    'nd': datasets.DatasetNDLazy,
+    'date': datasets.DatasetDateTimeLazy,
+    'text': datasets.DatasetTextLazy,
+}
+
+def makeLazyHDF5Dataset(lazyfile, datagrp, datatype, loadfn):
+    """Return a dataset which reads datagrp from lazyfile using
+    loadfn when it is first used."""
+
+    shapeitem = datagrp['data'] if isinstance(datagrp, h5py.Group) else datagrp
+    return lazyclasses[datatype](
+        lazyfile, datagrp.name, loadfn, shapeitem.shape)
+
+def loadDataGroup(thedoc, alldatagrp, lazyfile=None):
+    """Load all the Veusz datasets in the HDF5 (or zip document)
+    group.
+
+    If lazyfile is a LazyHDF5File for the HDF5 file, datasets are
+    read when first used.
+    """
 
     datafuncs = {
         '1d': loadHDF5Dataset1D,
         '2d': loadHDF5Dataset2D,
+        'nd': loadHDF5DatasetND,
         'date': loadHDF5DatasetDate,
         'text': loadHDF5DatasetText,
     }
@@ -199,9 +328,20 @@ def loadHDF5Datasets(thedoc, hdffile):
         datatype = bconv(datagrp.attrs['vsz_datatype'])
         veuszname = utils.unescapeHDFDataName(bconv(name))
 
-        dataset = datafuncs[datatype](datagrp)
+        if lazyfile is not None and 'vsz_capacity' not in datagrp.attrs:
+            dataset = makeLazyHDF5Dataset(
+                lazyfile, datagrp, datatype, datafuncs[datatype])
+        else:
+            dataset = datafuncs[datatype](datagrp)
         thedoc.setData(veuszname, dataset)
 
+def loadHDF5Datasets(thedoc, hdffile, lazyfile=None):
+    """Load all the Veusz datasets in the HDF5 file.
+
+    If lazyfile is given, datasets are read when first used.
+    """
+    loadDataGroup(thedoc, hdffile['Veusz']['Data'], lazyfile=lazyfile)
+
 def tagHDF5Datasets(thedoc, hdffile):
     """Tag datasets loaded from HDF5 file."""
     tags = hdffile['Veusz']['Document']['Tags']
@@ -223,7 +363,7 @@ def loadHDF5Doc(thedoc, filename,
     except ImportError:
         raise LoadError(_("No HDF5 support as h5py module is missing"))
 
-    with thedoc.suspend():
+    with thedoc.change(), thedoc.suspend():
         thedoc.wipe()
         thedoc.filename = filename
         thedoc.evaluate.updateSecurityFromPath()
@@ -254,19 +394,59 @@ def loadHDF5Doc(thedoc, filename,
             callbackunsafe=callbackunsafe,
             callbackimporterror=callbackimporterror)
 
-        # then load datasets
-        loadHDF5Datasets(thedoc, hdffile)
+        # then load datasets, which are read when needed (the file
+        # is kept open for this)
+        lazyfile = datasets.LazyHDF5File(filename, hdffile)
+        loadHDF5Datasets(thedoc, hdffile, lazyfile=lazyfile)
         # and then tag
         tagHDF5Datasets(thedoc, hdffile)
 
-        hdffile.close()
+def loadZipDoc(thedoc, filename,
+               callbackunsafe=None,
+               callbackimporterror=None):
+    """Load a zip document of the name given."""
+
+    try:
+        reader = zipdoc.ZipDocumentReader(filename)
+    except EnvironmentError as e:
+        raise LoadError(
+            _("Cannot open document '%s'\n\n%s") %
+            (os.path.basename(filename), e.strerror) )
+    except (zipfile.BadZipFile, KeyError, ValueError):
+        raise LoadError(
+            _("File '%s' is not a valid Veusz document") %
+            os.path.basename(filename) )
+
+    maxformat = 1
+    if reader.format > maxformat:
+        raise LoadError(
+            _(
+                "This document version (%i) is not supported. "
+                "It was written by Veusz %s.\n"
+                "This Veusz only supports document version %i."
+            ) % (reader.format, reader.version, maxformat))
+
+    with thedoc.change(), thedoc.suspend():
+        thedoc.wipe()
+        thedoc.filename = filename
+        thedoc.evaluate.updateSecurityFromPath()
+
+        executeScript(
+            thedoc, filename, reader.script,
+            callbackunsafe=callbackunsafe,
+            callbackimporterror=callbackimporterror)
+
+        loadDataGroup(thedoc, reader.data)
+        for tag, names in reader.tags.items():
+            for name in names:
+                thedoc.data[name].tags.add(tag)
 
 def loadDocument(thedoc, filename, mode='vsz',
                  callbackunsafe=None,
                  callbackimporterror=None):
     """Load document from file.
 
-    mode is 'vsz' or 'hdf5'
+    mode is 'vsz', 'hdf5' or 'zip'
     """
 
     if mode == 'vsz':
@@ -296,6 +476,12 @@ def loadDocument(thedoc, filename, mode='vsz',
             callbackunsafe=callbackunsafe,
             callbackimporterror=callbackimporterror)
 
+    elif mode == 'zip':
+        loadZipDoc(
+            thedoc, filename,
+            callbackunsafe=callbackunsafe,
+            callbackimporterror=callbackimporterror)
+
     else:
         raise RuntimeError('Invalid load mode')
 
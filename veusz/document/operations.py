@@ -354,6 +354,7 @@ class OperationWidgetMove(Operation):
                 self.oldname = child.name
                 child.name = child.chooseName()
 
+        document.invalidatePathIndex()
         self.newchildpath = child.path
 
     def undo(self, document):
@@ -373,6 +374,8 @@ class OperationWidgetMove(Operation):
         if self.oldname is not None:
             child.name = self.oldname
 
+        document.invalidatePathIndex()
+
 class OperationWidgetAdd(Operation):
     """Add a widget of specified type to parent."""
 
@@ -445,6 +448,32 @@ class OperationDatasetSet(Operation):
         else:
             document.setData(self.datasetname, self.olddata)
 
+class OperationDatasetRingAppend(Operation):
+    """Append values to a ring dataset."""
+
+    descr = _('append to dataset')
+
+    def __init__(self, datasetname, data, serr=None, nerr=None, perr=None):
+        self.datasetname = datasetname
+        self.vals = {'data': data, 'serr': serr, 'nerr': nerr, 'perr': perr}
+
+    def do(self, document):
+        """Append values, keeping those which are overwritten."""
+        ds = document.data[self.datasetname]
+        if not isinstance(ds, datasets.DatasetRing):
+            raise ValueError(
+                "Dataset '%s' is not a ring dataset" % self.datasetname)
+
+        self.oldstate = ds.saveState(len(N.atleast_1d(self.vals['data'])))
+        ds.append(**self.vals)
+        document.modifiedData(ds)
+
+    def undo(self, document):
+        """Restore previous values."""
+        ds = document.data[self.datasetname]
+        ds.restoreState(self.oldstate)
+        document.modifiedData(ds)
+
 class OperationDatasetDelete(Operation):
     """Delete a dateset."""
 
@@ -1006,7 +1035,7 @@ class OperationDatasetSetVal(Operation):
     def do(self, document):
         """Set the value."""
         ds = document.data[self.datasetname]
-        datacol = getattr(ds, self.columnname)
+        datacol = ds.writableColumn(self.columnname)
         self.oldval = datacol[self.row]
         datacol[self.row] = self.val
         ds.changeValues(self.columnname, datacol)
@@ -1014,7 +1043,7 @@ class OperationDatasetSetVal(Operation):
     def undo(self, document):
         """Restore the value."""
         ds = document.data[self.datasetname]
-        datacol = getattr(ds, self.columnname)
+        datacol = ds.writableColumn(self.columnname)
         datacol[self.row] = self.oldval
         ds.changeValues(self.columnname, datacol)
 
@@ -1034,13 +1063,13 @@ class OperationDatasetSetVal2D(Operation):
         """Set the value."""
         ds = document.data[self.datasetname]
         self.oldval = ds.data[self.row, self.col]
-        ds.data[self.row, self.col] = self.val
+        ds.writableColumn('data')[self.row, self.col] = self.val
         document.modifiedData(ds)
 
     def undo(self, document):
         """Restore the value."""
         ds = document.data[self.datasetname]
-        ds.data[self.row, self.col] = self.oldval
+        ds.writableColumn('data')[self.row, self.col] = self.oldval
         document.modifiedData(ds)
 
 class OperationDatasetDeleteRow(Operation):
@@ -19,6 +19,10 @@
 """Helper for doing the plotting of the document.
 """
 
+import threading
+import time
+import weakref
+
 from .. import qtall as qt
 from .. import utils
 
@@ -29,6 +33,11 @@ except ImportError:
     def RecordPaintDevice(width, height, dpix, dpiy):
         return qt.QPicture()
 
+class PaintCancelled(Exception):
+    """Raised when cancellable painting is stopped, as the document is
+    going to be modified."""
+    pass
+
 class DrawState:
     """Each widget plotted has a recorded state in this object."""
 
@@ -50,6 +59,104 @@ class DrawState:
         # list of child widgets states
         self.children = []
 
+        # time taken to play the recorded layer, and an image of the
+        # layer as (key, image, rect on page) if it was slow
+        self.playtime = None
+        self.raster = None
+        self.rasterlock = threading.Lock()
+
+# layers taking longer than this to play (in seconds) are kept as
+# images when rendering with a raster cache
+_rastermintime = 0.02
+# but not if the image would have more pixels than this
+_rastermaxpixels = 2048*2048
+
+def _rectPixels(rect):
+    """Number of pixels in QRect."""
+    return rect.width() * rect.height()
+
+class LayerCache:
+    """Recorded layers of widgets, kept between paints of a page so
+    that unchanged widgets do not have to be drawn again.
+
+    The layers of a widget are stored with a key describing
+    everything its drawing depends on, and are only reused by a later
+    paint if its key is equal.
+    """
+
+    def __init__(self):
+        # map widgets to (key, autocolors, textrects, states), where
+        # autocolors is a list of automatic color keys and indices
+        # looked up while drawing, textrects a list of rectangles
+        # added to avoid overlapping text and states a list of
+        # ((widget, layer), state)
+        self.entries = weakref.WeakKeyDictionary()
+
+    def get(self, widget, key):
+        """Return (autocolors, textrects, states) for widget if stored
+        with key, or None."""
+        entry = self.entries.get(widget)
+        if entry is not None and entry[0] == key:
+            return entry[1:]
+        return None
+
+    def set(self, widget, key, autocolors, textrects, states):
+        """Store layers for widget."""
+        self.entries[widget] = (key, autocolors, textrects, states)
+
+    def prune(self, helper):
+        """Remove widgets which were not drawn by helper."""
+        drawn = set(w for w, layer in helper.states)
+        for widget in list(self.entries):
+            if widget not in drawn:
+                del self.entries[widget]
+
+class _TextRects(utils.RectangleOverlapTester):
+    """Rectangles of text drawn on the page, to avoid overlapping
+    text, which also logs the rectangles added if log is set."""
+
+    def __init__(self):
+        utils.RectangleOverlapTester.__init__(self)
+        self.log = None
+
+    def addRect(self, rect):
+        utils.RectangleOverlapTester.addRect(self, rect)
+        if self.log is not None:
+            self.log.append(rect)
+
+class _LayerRecorder:
+    """Context manager which stores the layers drawn for a widget in
+    the layer cache."""
+
+    def __init__(self, helper, widget, key):
+        self.helper = helper
+        self.widget = widget
+        self.key = key
+
+    def __enter__(self):
+        self.helper.autocolorlog = []
+        self.helper.textrects.log = []
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        helper = self.helper
+        autocolors = helper.autocolorlog
+        textrects = helper.textrects.log
+        helper.autocolorlog = helper.textrects.log = None
+        if exc_type is None:
+            states = [
+                (k, s) for k, s in helper.states.items()
+                if k[0] is self.widget ]
+            helper.layercache.set(
+                self.widget, self.key, autocolors, textrects, states)
+
+class _NullRecorder:
+    """Context manager used if layers are not being cached."""
+
+    def __enter__(self):
+        pass
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
 class PainterRoot(qt.QPainter):
     """Base class for painting of widgets."""
 
@@ -67,6 +174,10 @@ class PainterRoot(qt.QPainter):
         self.pagesize = helper.pagesize
         self.maxdim = max(*self.pagesize)
         self.textrects = helper.textrects
+        self.linetolerance = helper.linetolerance
+        self.bitmap = helper.bitmap
+        self.antialias = helper.antialias
+        self.draft = helper.draft
 
     def docColor(self, name):
         """Return color from document."""
@@ -113,7 +224,9 @@ class PaintHelper:
 
     def __init__(self, document, pagesize,
                  scaling=1, devicepixelratio=1, dpi=(100, 100),
-                 directpaint=None):
+                 directpaint=None, linetolerance=1.,
+                 bitmap=False, antialias=True, layercache=None,
+                 cancellable=False, draft=False):
         """
         pagesize: tuple (pixelw, pixelh), which can be float.
          This is the page size in the coordinates presented to graph drawing.
@@ -122,6 +235,17 @@ class PaintHelper:
         dpi: tuple of X and Y dpi for graph coordinates
         directpaint: use this painter directly, rather than using RecordPainter
           to store each widget painting
+        linetolerance: lines are simplified to a few points in columns of
+          this width in native pixels (0 to disable)
+        bitmap: output is a bitmap, so markers can be drawn as images
+        antialias: whether bitmap output is antialiased
+        layercache: LayerCache to reuse the recorded layers of widgets
+          which have not changed since an earlier paint
+        cancellable: stop painting by raising PaintCancelled if the
+          document is going to be modified (when painting in another
+          thread)
+        draft: quick preview paint, where widgets can draw with less
+          detail
         """
 
         self.document = document
@@ -131,6 +255,10 @@ class PaintHelper:
         self.cgscale = scaling / devicepixelratio
         self.devicepixelratio = devicepixelratio
         self.pixperpt = self.dpi[1] / 72.
+        self.linetolerance = linetolerance
+        self.bitmap = bitmap
+        self.antialias = antialias
+        self.draft = draft
 
         # page size in native pixels (without default zoom)
         self.rawpagesize = max(pagesize[0], 1), max(pagesize[1], 1)
@@ -159,7 +287,23 @@ class PaintHelper:
         self.autoplottermap = {}
 
         # to avoid overlapping text
-        self.textrects = utils.RectangleOverlapTester()
+        self.textrects = _TextRects()
+
+        # number of references looked up or cached when painting
+        self.referencelookups = self.referencecached = 0
+        # time taken to paint (seconds)
+        self.painttime = None
+
+        # whether painting stops if the document is to be modified
+        self.cancellable = cancellable
+        # changeset of document when painted
+        self.changeset = None
+
+        # cache of recorded layers (not used for direct painting)
+        self.layercache = layercache if directpaint is None else None
+        # automatic color keys and indices looked up while recording
+        self.autocolorlog = None
+        self._layerdockey = None
 
     @property
     def maxdim(self):
@@ -181,6 +325,9 @@ class PaintHelper:
         layer: layer to plot widget, or None to get next automatically
         """
 
+        if self.cancellable and self.document.paintwaiting:
+            raise PaintCancelled()
+
         # automatically add a layer if not given
         if layer is None:
             layer = 0
@@ -229,21 +376,102 @@ class PaintHelper:
         except KeyError:
             return None
 
-    def renderToPainter(self, painter):
+    def renderToPainter(self, painter, rastercache=False, region=None):
         """Render saved output to painter.
-        """
-        self._renderState(self.rootstate, painter)
 
-    def _renderState(self, state, painter, indent=0):
-        """Render state to painter."""
-
-        painter.save()
-        state.record.play(painter)
-        painter.restore()
+        If rastercache is set, the layers of clipped widgets which are
+        slow to play are kept as images, which are drawn instead if
+        the layers are rendered again (for instance when reused from
+        a LayerCache). painter should draw onto native pixels without
+        any scaling, but may be translated. region is the part of the
+        page being rendered (QRect in native pixels), if not the whole
+        page. An image is reused for any region it covers, for
+        instance when scrolling.
+        """
+        rasterregion = None
+        if rastercache:
+            rasterregion = region if region is not None else qt.QRect(
+                0, 0, int(self.rawpagesize[0]), int(self.rawpagesize[1]))
+        self._renderState(self.rootstate, painter, rasterregion=rasterregion)
+
+    def _renderState(self, state, painter, indent=0, rasterregion=None):
+        """Render state to painter, using images of slow layers
+        inside rasterregion if set."""
+
+        if rasterregion is not None and state.clip is not None:
+            self._renderStateRaster(state, painter, rasterregion)
+        else:
+            painter.save()
+            state.record.play(painter)
+            painter.restore()
 
         for child in state.children:
             #print '  '*indent, child.widget
-            self._renderState(child, painter, indent=indent+1)
+            self._renderState(
+                child, painter, indent=indent+1, rasterregion=rasterregion)
+
+    def _renderStateRaster(self, state, painter, region):
+        """Render state to painter, using an image of the layer if it
+        was slow to play before. The image must cover the part of the
+        layer inside region."""
+
+        hints = painter.renderHints()
+        key = (self.scaling, int(hints))
+        needed = self._rasterRect(state).intersected(region)
+        if needed.isEmpty():
+            # the layer is clipped outside region
+            return
+        raster = state.raster
+        if ( raster is None or raster[0] != key or
+             not raster[2].contains(needed) ):
+            if ( state.playtime is None or state.playtime < _rastermintime or
+                 _rectPixels(needed) > _rastermaxpixels ):
+                start = time.perf_counter()
+                painter.save()
+                state.record.play(painter)
+                painter.restore()
+                state.playtime = time.perf_counter() - start
+                return
+
+            # other threads rendering parts of the page use the same image
+            with state.rasterlock:
+                raster = state.raster
+                if ( raster is None or raster[0] != key or
+                     not raster[2].contains(needed) ):
+                    raster = state.raster = self._makeRaster(
+                        state, key, hints, needed)
+
+        painter.drawImage(raster[2].topLeft(), raster[1])
+
+    def _rasterRect(self, state):
+        """Return QRect on page (in native pixels) covered by the
+        layer of state."""
+        clip = state.clip
+        return qt.QRectF(
+            clip.topLeft()*self.scaling,
+            clip.bottomRight()*self.scaling).toAlignedRect()
+
+    def _makeRaster(self, state, key, hints, needed):
+        """Draw layer of state into an image, returning (key, image,
+        rect), where rect is the QRect of the image on the page.
+
+        The image covers the whole layer if it is small enough, so it
+        can be reused when other regions of the page are rendered, or
+        else the needed rectangle."""
+
+        rect = self._rasterRect(state)
+        if _rectPixels(rect) > _rastermaxpixels:
+            rect = needed
+        img = qt.QImage(
+            rect.width(), rect.height(),
+            qt.QImage.Format_ARGB32_Premultiplied)
+        img.fill(0)
+        p = qt.QPainter(img)
+        p.setRenderHints(hints)
+        p.translate(-rect.left(), -rect.top())
+        state.record.play(p)
+        p.end()
+        return (key, img, rect)
 
     def identifyWidgetAtPoint(self, x, y, antialias=True):
         """What widget has drawn at the point x,y?
@@ -354,4 +582,59 @@ class PaintHelper:
         if key not in self.autoplottermap:
             self.autoplottermap[key] = self.autoplottercount
             self.autoplottercount += 1
-        return self.autoplottermap[key]
+        idx = self.autoplottermap[key]
+        if self.autocolorlog is not None:
+            self.autocolorlog.append((key, idx))
+        return idx
+
+    def layerDocKey(self):
+        """Return key for the state of the document and output which
+        affects how every widget is drawn."""
+        if self._layerdockey is None:
+            evaluate = self.document.evaluate
+            colors = evaluate.colors
+            self._layerdockey = (
+                colors.colortheme, tuple(sorted(colors.colors.items())),
+                repr(evaluate.def_colormaps),
+                self.scaling, self.dpi, self.pagesize,
+                self.linetolerance, self.bitmap, self.antialias)
+        return self._layerdockey
+
+    def reuseLayers(self, widget, key):
+        """Add the layers of widget from the layer cache, if they were
+        stored with key by an earlier paint.
+
+        Returns True if the layers were reused, so the widget does not
+        need to be drawn.
+        """
+
+        if self.layercache is None or key is None:
+            return False
+        entry = self.layercache.get(widget, key)
+        if entry is None:
+            return False
+        autocolors, textrects, states = entry
+
+        # the automatic colors used must be the same
+        for ckey, idx in autocolors:
+            if self.autoColorIndex(ckey) != idx:
+                return False
+
+        # later text should not overlap the text of the layers
+        for rect in textrects:
+            self.textrects.addRect(rect)
+
+        for k, s in states:
+            self.states[k] = s
+            if self.widgetstack:
+                self.states[(self.widgetstack[-1], 0)].children.append(s)
+            else:
+                self.rootstate = s
+        return True
+
+    def recordLayers(self, widget, key):
+        """Return context manager, storing the layers of widget drawn
+        inside it in the layer cache with key."""
+        if self.layercache is None or key is None:
+            return _NullRecorder()
+        return _LayerRecorder(self, widget, key)
@@ -0,0 +1,277 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+##############################################################################
+
+"""Zip document format, holding the document script with the data
+saved as numpy .npy arrays.
+
+The zip file contains
+ document.vsz: the document script, without the data
+ manifest.json: description of the datasets and tags
+ data/N.npy: arrays for the datasets
+
+Datasets are written with saveDataDumpToHDF5 into a RecordGroup, as
+for HDF5 documents, and read back as groups which look enough like
+h5py groups for the HDF5 document loader. Arrays are stored
+uncompressed and aligned, so they are memory mapped when loading
+instead of being read and parsed.
+"""
+
+import datetime
+import json
+import os
+import struct
+import tempfile
+import time
+import zipfile
+
+import numpy as N
+
+from .. import utils
+from .hdf5save import RecordRef
+
+# alignment of array data in the zip file
+alignment = 64
+# zip extra field ID used for padding (as used by zipalign)
+_paddingid = 0xd935
+
+scriptname = 'document.vsz'
+manifestname = 'manifest.json'
+
+def _keyText(key):
+    """Names in HDF5 groups can be bytes or str."""
+    return key.decode('utf-8') if isinstance(key, bytes) else key
+
+def _encodeAttr(val):
+    """Convert attribute to a value which can be stored in JSON."""
+    if isinstance(val, RecordRef):
+        return {'ref': [_keyText(p) for p in val.path]}
+    elif isinstance(val, bytes):
+        return {'bytes': val.decode('utf-8')}
+    elif isinstance(val, N.generic):
+        return val.item()
+    return val
+
+def _decodeAttr(val):
+    """Convert attribute back from JSON."""
+    if isinstance(val, dict):
+        if 'bytes' in val:
+            return val['bytes'].encode('utf-8')
+        elif 'ref' in val:
+            return tuple(val['ref'])
+    return val
+
+class _ZipDataWriter:
+    """Write recorded groups and arrays into zip file."""
+
+    def __init__(self, zipf):
+        self.zipf = zipf
+        self.count = 0
+
+    def writeNode(self, node):
+        """Write node, returning description for the manifest."""
+        node = node.resolve()
+        out = {'attrs': {
+            _keyText(k): _encodeAttr(v) for k, v in node.attrs.items()}}
+        if node.value is None:
+            out['children'] = {
+                _keyText(k): self.writeNode(c)
+                for k, c in node.children.items() }
+        else:
+            out['array'] = self.writeArray(N.asarray(node.value))
+        return out
+
+    def writeArray(self, arr):
+        """Write array into zip, returning name of zip member."""
+
+        name = 'data/%i.npy' % self.count
+        self.count += 1
+
+        # pad the local header with an extra field so the data are
+        # aligned (the header is 30 bytes, plus the name and the 20
+        # byte zip64 extra field)
+        zinfo = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        zinfo.compress_type = zipfile.ZIP_STORED
+        start = self.zipf.fp.tell() + 30 + len(name) + 20
+        pad = -start % alignment
+        if 0 < pad < 4:
+            pad += alignment
+        if pad:
+            zinfo.extra = struct.pack('<HH', _paddingid, pad-4) + b'\0'*(pad-4)
+
+        with self.zipf.open(zinfo, 'w', force_zip64=True) as f:
+            N.lib.format.write_array(f, arr, allow_pickle=False)
+        return name
+
+def writeZipDocument(filename, script, datagroup, tags):
+    """Write zip document.
+
+    script: document script text
+    datagroup: RecordGroup with datasets saved into it
+    tags: dict of tag names to lists of dataset names
+
+    The file is written to a temporary file first, then renamed, so
+    that an existing file is kept if writing fails. Any arrays memory
+    mapped from an existing file should be detached first (see
+    detachMappedArrays).
+    """
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, tempname = tempfile.mkstemp(
+        dir=dirname, prefix='.veusz_', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fobj:
+            with zipfile.ZipFile(fobj, 'w', allowZip64=True) as zipf:
+                zipf.writestr(
+                    scriptname, script.encode('utf-8'),
+                    compress_type=zipfile.ZIP_DEFLATED)
+
+                writer = _ZipDataWriter(zipf)
+                data = {
+                    _keyText(k): writer.writeNode(node)
+                    for k, node in datagroup.children.items() }
+
+                manifest = {
+                    'vsz_format': 1,
+                    'vsz_version': utils.version(),
+                    'vsz_saved_at': datetime.datetime.utcnow().isoformat(),
+                    'data': data,
+                    'tags': tags,
+                }
+                zipf.writestr(
+                    manifestname, json.dumps(manifest, indent=1),
+                    compress_type=zipfile.ZIP_DEFLATED)
+
+        utils.replaceFile(tempname, filename)
+    except:
+        os.unlink(tempname)
+        raise
+
+def _isMappedFrom(arr, filename):
+    """Is array (or an array it is a view of) memory mapped from
+    filename?"""
+    while isinstance(arr, N.ndarray):
+        if isinstance(arr, N.memmap) and arr.filename == filename:
+            return True
+        arr = arr.base
+    return False
+
+def detachMappedArrays(filename, datasets):
+    """Replace arrays in datasets which are memory mapped from
+    filename with copies in memory.
+
+    This should be called before filename is overwritten, as mapped
+    files cannot be replaced on Windows, and could change under the
+    arrays on other systems.
+    """
+    filename = os.path.abspath(filename)
+    for ds in datasets:
+        # columns are attributes, or kept here by lazy datasets
+        for attrs in (ds.__dict__, ds.__dict__.get('_lazyvals', {})):
+            for key, val in list(attrs.items()):
+                if _isMappedFrom(val, filename):
+                    attrs[key] = N.array(val)
+
+class ZipArray:
+    """Array read from a zip document, acting like a h5py dataset."""
+
+    def __init__(self, array, attrs):
+        self.array = array
+        self.attrs = attrs
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array)
+
+class ZipGroup(dict):
+    """Group read from a zip document, acting like a h5py group."""
+
+    def __init__(self, attrs):
+        dict.__init__(self)
+        self.attrs = attrs
+
+class ZipDocumentReader:
+    """Read the parts of a zip document.
+
+    Attributes after construction are
+     script: document script
+     data: ZipGroup of datasets
+     tags: dict of tags to list of dataset names
+     format, version: format and Veusz version of file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with zipfile.ZipFile(filename, 'r') as zipf:
+            self.script = zipf.read(scriptname).decode('utf-8')
+            manifest = json.loads(zipf.read(manifestname).decode('utf-8'))
+            self.format = manifest['vsz_format']
+            self.version = manifest['vsz_version']
+            self.tags = manifest['tags']
+
+            self.data = ZipGroup({})
+            for key, node in manifest['data'].items():
+                self.data[key] = self._readNode(zipf, node)
+
+    def _readNode(self, zipf, node):
+        attrs = {k: _decodeAttr(v) for k, v in node['attrs'].items()}
+        if 'array' in node:
+            return ZipArray(self._readArray(zipf, node['array']), attrs)
+        else:
+            grp = ZipGroup(attrs)
+            for key, child in node['children'].items():
+                grp[key] = self._readNode(zipf, child)
+            return grp
+
+    def _readArray(self, zipf, name):
+        """Memory map array from zip file if possible, or read it."""
+
+        zinfo = zipf.getinfo(name)
+        if zinfo.compress_type == zipfile.ZIP_STORED:
+            with open(self.filename, 'rb') as f:
+                f.seek(zinfo.header_offset)
+                header = f.read(30)
+                namelen, extralen = struct.unpack('<HH', header[26:30])
+                f.seek(zinfo.header_offset + 30 + namelen + extralen)
+
+                version = N.lib.format.read_magic(f)
+                if version == (1, 0):
+                    hdr = N.lib.format.read_array_header_1_0(f)
+                elif version == (2, 0):
+                    hdr = N.lib.format.read_array_header_2_0(f)
+                else:
+                    hdr = None
+
+                if hdr is not None:
+                    shape, fortran, dtype = hdr
+                    if not dtype.hasobject and int(N.prod(shape)) > 0:
+                        # copy on write, so the file is never modified
+                        arr = N.memmap(
+                            self.filename, dtype=dtype, mode='c',
+                            offset=f.tell(), shape=shape,
+                            order='F' if fortran else 'C')
+                        return N.asarray(arr)
+
+        with zipf.open(name) as f:
+            return N.load(f, allow_pickle=False)
@@ -17,6 +17,7 @@
 /////////////////////////////////////////////////////////////////////////////
 
 #include <algorithm>
+#include <cmath>
 
 #include "qtloops.h"
 #include "isnan.h"
@@ -231,6 +232,58 @@ void plotPathsToPainter(QPainter& painter, QPainterPath& path,
     }
 }
 
+void plotImagesToPainter(QPainter& painter, const QImage& sprites,
+			 const Numpy1DObj& x, const Numpy1DObj& y,
+			 const Numpy1DObj* index, int spritewidth,
+			 const QRectF* clip)
+{
+  if( spritewidth <= 0 )
+    return;
+  const int numsprites = sprites.width() / spritewidth;
+  const int spriteheight = sprites.height();
+  const qreal halfw = spritewidth*0.5;
+  const qreal halfh = spriteheight*0.5;
+
+  QRectF cliprect( QPointF(-32767,-32767), QPointF(32767,32767) );
+  if( clip != 0 )
+    cliprect = *clip;
+  cliprect.adjust(-halfw, -halfh, halfw, halfh);
+
+  int size = std::min(x.dim, y.dim);
+  if( index != 0 )
+    size = std::min(size, index->dim);
+
+  // keep track of duplicate points
+  QPointF lastpt(-1e6, -1e6);
+  int lastidx = -1;
+
+  for(int i = 0; i < size; ++i)
+    {
+      const QPointF pt(x(i), y(i));
+      if( ! cliprect.contains(pt) )
+	continue;
+
+      int idx = 0;
+      if( index != 0 )
+	{
+	  const double val = (*index)(i);
+	  // also skips nan values
+	  if( ! (val >= 0 && val < numsprites) )
+	    continue;
+	  idx = int(val);
+	}
+      if( idx == lastidx && smallDelta(lastpt, pt) )
+	continue;
+
+      painter.drawImage( QPointF( std::floor(pt.x()-halfw+0.5),
+				  std::floor(pt.y()-halfh+0.5) ),
+			 sprites,
+			 QRectF(idx*spritewidth, 0, spritewidth, spriteheight) );
+      lastpt = pt;
+      lastidx = idx;
+    }
+}
+
 void plotLinesToPainter(QPainter& painter,
 			const Numpy1DObj& x1, const Numpy1DObj& y1,
 			const Numpy1DObj& x2, const Numpy1DObj& y2,
@@ -57,6 +57,16 @@ void plotPathsToPainter(QPainter& painter, QPainterPath& path,
 			const QImage* colorimg = 0,
 			bool scaleline = false);
 
+// plot images to painter
+// sprites contains images of width spritewidth side by side
+// each is centred on the x and y locations, rounded to whole pixels
+// if index is not 0, is an array of which sprite to use for each point
+// clip is a clipping rectangle if set
+void plotImagesToPainter(QPainter& painter, const QImage& sprites,
+			 const Numpy1DObj& x, const Numpy1DObj& y,
+			 const Numpy1DObj* index, int spritewidth,
+			 const QRectF* clip = 0);
+
 void plotLinesToPainter(QPainter& painter,
 			const Numpy1DObj& x1, const Numpy1DObj& y1,
 			const Numpy1DObj& x2, const Numpy1DObj& y2,
@@ -40,11 +40,14 @@ class DatasetPluginException(RuntimeError):
     """
     pass
 
-def numpyCopyOrNone(data):
+def numpyCopyOrNone(data, native=False):
     """If data is None return None
-    Otherwise return a numpy array corresponding to data."""
+    Otherwise return a numpy array corresponding to data.
+    If native is set, float32 arrays keep their type."""
     if data is None:
         return None
+    if native and isinstance(data, N.ndarray):
+        return N.array(data, dtype=datasets.nativeStorageDtype(data.dtype))
     return N.array(data, dtype=N.float64)
 
 class _DatasetBase:
@@ -62,27 +65,31 @@ class _DatasetBase:
 # these classes are returned from dataset plugins
 class Dataset1D(_DatasetBase):
     """1D dataset for ImportPlugin or DatasetPlugin."""
-    def __init__(self, name, data=[], serr=None, perr=None, nerr=None):
+    def __init__(self, name, data=[], serr=None, perr=None, nerr=None,
+                 native=False):
         """1D dataset
         name: name of dataset
         data: data in dataset: list of floats or numpy 1D array
         serr: (optional) symmetric errors on data: list or numpy array
         perr: (optional) positive errors on data: list or numpy array
         nerr: (optional) negative errors on data: list or numpy array
+        native: (optional) keep float32 numpy arrays, instead of
+                converting to float64
 
         If errors are returned for data give serr or nerr and perr.
         nerr should be negative values if used.
         perr should be positive values if used.
         """
         self.name = name
+        self.native = native
         self.update(data=data, serr=serr, perr=perr, nerr=nerr)
 
     def update(self, data=[], serr=None, perr=None, nerr=None):
         """Update values to those given."""
-        self.data = numpyCopyOrNone(data)
-        self.serr = numpyCopyOrNone(serr)
-        self.perr = numpyCopyOrNone(perr)
-        self.nerr = numpyCopyOrNone(nerr)
+        self.data = numpyCopyOrNone(data, native=self.native)
+        self.serr = numpyCopyOrNone(serr, native=self.native)
+        self.perr = numpyCopyOrNone(perr, native=self.native)
+        self.nerr = numpyCopyOrNone(nerr, native=self.native)
 
     def _null(self):
         """Empty data contents."""
@@ -96,13 +103,14 @@ class Dataset1D(_DatasetBase):
     def _unlinkedVeuszDataset(self):
         """Convert this to an equivalent (unlinked) Veusz dataset."""
         return datasets.Dataset(
-            data=self.data, serr=self.serr, perr=self.perr, nerr=self.nerr)
+            data=self.data, serr=self.serr, perr=self.perr, nerr=self.nerr,
+            native=self.native)
 
 class Dataset2D(_DatasetBase):
     """2D dataset for ImportPlugin or DatasetPlugin."""
     def __init__(self, name, data=[[]], rangex=None, rangey=None,
                  xedge=None, yedge=None,
-                 xcent=None, ycent=None):
+                 xcent=None, ycent=None, native=False):
         """2D dataset.
         name: name of dataset
         data: 2D numpy array of values or list of lists of floats
@@ -112,8 +120,11 @@ class Dataset2D(_DatasetBase):
         yedge: y values for grid (instead of rangey)
         xcent: x values for pixel centres (instead of rangex)
         ycent: y values for pixel centres (instead of rangey)
+        native: keep float32 numpy arrays, instead of
+                converting to float64
         """
         self.name = name
+        self.native = native
         self.update(
             data=data, rangex=rangex, rangey=rangey,
             xedge=xedge, yedge=yedge,
@@ -123,7 +134,7 @@ class Dataset2D(_DatasetBase):
     def update(self, data=[[]], rangex=None, rangey=None,
                xedge=None, yedge=None,
                xcent=None, ycent=None):
-        self.data = N.array(data, dtype=N.float64)
+        self.data = numpyCopyOrNone(data, native=self.native)
         self.rangex = rangex
         self.rangey = rangey
         self.xedge = xedge
@@ -147,20 +158,23 @@ class Dataset2D(_DatasetBase):
             data=self.data,
             xrange=self.rangex, yrange=self.rangey,
             xedge=self.xedge, yedge=self.yedge,
-            xcent=self.xcent, ycent=self.ycent)
+            xcent=self.xcent, ycent=self.ycent, native=self.native)
 
 class DatasetND(_DatasetBase):
     """ND dataset for ImportPlugin or DatasetPlugin."""
-    def __init__(self, name, data=[]):
+    def __init__(self, name, data=[], native=False):
         """N-dimensional dataset.
         name: name of dataset
         data: ND numpy array of values (or lists to convert)
+        native: keep float32 numpy arrays, instead of
+                converting to float64
         """
         self.name = name
+        self.native = native
         self.update(data=data)
 
     def update(self, data=[]):
-        self.data = N.array(data, dtype=N.float64)
+        self.data = numpyCopyOrNone(data, native=self.native)
 
     def _null(self):
         """Empty data contents."""
@@ -172,7 +186,7 @@ class DatasetND(_DatasetBase):
 
     def _unlinkedVeuszDataset(self):
         """Convert this to an equivalent (unlinked) Veusz dataset."""
-        return datasets.DatasetND(data=self.data)
+        return datasets.DatasetND(data=self.data, native=self.native)
 
 class DatasetDateTime(_DatasetBase):
     """Date-time dataset for ImportPlugin or DatasetPlugin."""
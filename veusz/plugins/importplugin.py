@@ -23,6 +23,7 @@ import numpy as N
 
 from .. import utils
 from .. import qtall as qt
+from .. import datasets
 
 from . import field
 from . import datasetplugin
@@ -449,8 +450,10 @@ class ImportPluginQdp(ImportPlugin):
 
         return rqdp.retndata
 
-def cnvtImportNumpyArray(name, val, errorsin2d=True):
-    """Convert a numpy array to plugin returns."""
+def cnvtImportNumpyArray(name, val, errorsin2d=True, native=False):
+    """Convert a numpy array to plugin returns.
+
+    If native is set, float32 arrays are not converted to float64."""
 
     try:
         val.shape
@@ -472,27 +475,32 @@ def cnvtImportNumpyArray(name, val, errorsin2d=True):
     # check whether numeric dataset
     try:
         val + 0.
-        val = val.astype(N.float64)
+        if native:
+            val = val.astype(datasets.nativeStorageDtype(val.dtype))
+        else:
+            val = val.astype(N.float64)
     except TypeError:
         raise ImportPluginException(_("Unsupported array type"))
 
     if val.ndim == 1:
-        return datasetplugin.Dataset1D(name, val)
+        return datasetplugin.Dataset1D(name, val, native=native)
     elif val.ndim == 2:
         if errorsin2d and val.shape[1] in (2, 3):
             # return 1d array
             if val.shape[1] == 2:
                 # use as symmetric errors
-                return datasetplugin.Dataset1D(name, val[:,0], serr=val[:,1])
+                return datasetplugin.Dataset1D(
+                    name, val[:,0], serr=val[:,1], native=native)
             else:
                 # asymmetric errors
                 # unclear on ordering here...
                 return datasetplugin.Dataset1D(
-                    name, val[:,0], perr=val[:,1], nerr=val[:,2])
+                    name, val[:,0], perr=val[:,1], nerr=val[:,2],
+                    native=native)
         else:
-            return datasetplugin.Dataset2D(name, val)
+            return datasetplugin.Dataset2D(name, val, native=native)
     else:
-        return datasetplugin.DatasetND(name, val)
+        return datasetplugin.DatasetND(name, val, native=native)
 
 class ImportPluginNpy(ImportPlugin):
     """For reading single datasets from NPY numpy saved files."""
@@ -510,6 +518,10 @@ class ImportPluginNpy(ImportPlugin):
                 "errorsin2d",
                 descr=_("Treat 2 and 3 column 2D arrays as\ndata with error bars"),
                 default=True),
+            field.FieldBool(
+                "native_dtype",
+                descr=_("Keep float32 data type"),
+                default=False),
         ]
 
     def getPreview(self, params):
@@ -549,7 +561,8 @@ class ImportPluginNpy(ImportPlugin):
 
         return [
             cnvtImportNumpyArray(
-                name, retn, errorsin2d=params.field_results["errorsin2d"])
+                name, retn, errorsin2d=params.field_results["errorsin2d"],
+                native=params.field_results["native_dtype"])
         ]
 
 class ImportPluginNpz(ImportPlugin):
@@ -566,6 +579,10 @@ class ImportPluginNpz(ImportPlugin):
                 "errorsin2d",
                 descr=_("Treat 2 and 3 column 2D arrays as\ndata with error bars"),
                 default=True),
+            field.FieldBool(
+                "native_dtype",
+                descr=_("Keep float32 data type"),
+                default=False),
         ]
 
     def getPreview(self, params):
@@ -614,7 +631,8 @@ class ImportPluginNpz(ImportPlugin):
         out = []
         for f in sorted(retn.files):
             out.append( cnvtImportNumpyArray(
-                f, retn[f], errorsin2d=params.field_results["errorsin2d"]) )
+                f, retn[f], errorsin2d=params.field_results["errorsin2d"],
+                native=params.field_results["native_dtype"]) )
 
         return out
 
@@ -17,7 +17,8 @@
 ###############################################################################
 
 from .settingdb import *
-from .reference import Reference, ReferenceMultiple
+from .reference import (
+    Reference, ReferenceMultiple, invalidateReferenceCache, referencecounter)
 from .setting import *
 from .settings import *
 from .collections import *
@@ -18,12 +18,16 @@
 
 """Collections of predefined settings for common settings."""
 
+import functools
+
 from .. import qtall as qt
 
 from . import setting
 from .settings import Settings
 from .reference import Reference
 
+# cached, so that the settings of each widget share the text
+@functools.lru_cache(maxsize=None)
 def _(text, disambiguation=None, context="Setting"):
     """Translate text."""
     return qt.QCoreApplication.translate(context, text, disambiguation)
@@ -16,17 +16,62 @@
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 ###############################################################################
 
+import threading
+
+# resolved references are cached until this is increased, when the
+# widget tree or a setting changes
+_generation = 0
+
+def invalidateReferenceCache():
+    """Forget cached resolutions of references."""
+    global _generation
+    _generation += 1
+
+class ReferenceCounter(threading.local):
+    """Count how references are resolved, for instrumentation.
+
+    Each thread has its own counts, as pages can be painted in
+    drawing threads."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # looked up in the tree
+        self.lookups = 0
+        # used a cached value
+        self.cached = 0
+
+referencecounter = ReferenceCounter()
+
 class ReferenceBase:
     """Reference objects are inherited from this base class.
 
     They should have a "value" property.
     """
 
+    __slots__ = ('value', '_cache')
+
     class ResolveException(ValueError):
         pass
 
     def __init__(self, value):
         self.value = value
+        # (generation, setting, resolved setting)
+        self._cache = None
+
+    def _getCached(self, thissetting):
+        """Get the cached resolution for thissetting, or None."""
+        cache = self._cache
+        if ( cache is not None and cache[0] == _generation and
+             cache[1] is thissetting ):
+            referencecounter.cached += 1
+            return cache[2]
+        referencecounter.lookups += 1
+        return None
+
+    def _setCached(self, thissetting, item):
+        self._cache = (_generation, thissetting, item)
 
     def getPaths(self):
         """Return list of paths linked by reference."""
@@ -48,10 +93,20 @@ class Reference(ReferenceBase):
     /StyleSheet/linewidth
     """
 
+    __slots__ = ('split', 'resolved')
+
+    # the same paths are used by many settings (e.g. stylesheet links
+    # for every widget of a type), so share the path and its parts
+    _pathcache = {}
+
     def __init__(self, value):
         """Initialise reference with value, which is a string as above."""
+        try:
+            value, self.split = self._pathcache[value]
+        except KeyError:
+            self.split = tuple(value.split('/'))
+            self._pathcache[value] = (value, self.split)
         ReferenceBase.__init__(self, value)
-        self.split = value.split('/')
         self.resolved = None
 
     def getPaths(self):
@@ -63,8 +118,13 @@ class Reference(ReferenceBase):
 
         # this is for stylesheet references which don't move
         if self.resolved:
+            referencecounter.cached += 1
             return self.resolved
 
+        item = self._getCached(thissetting)
+        if item is not None:
+            return item
+
         item = thissetting.parent
         parts = list(self.split)
         if parts[0] == '':
@@ -100,6 +160,8 @@ class Reference(ReferenceBase):
         # hopefully this won't ever change
         if len(self.split) > 2 and self.split[1] == 'StyleSheet':
             self.resolved = item
+        else:
+            self._setCached(thissetting, item)
 
         return item
 
@@ -116,6 +178,8 @@ class ReferenceMultiple(ReferenceBase):
     right of the list override those on the left.
     """
 
+    __slots__ = ('refs',)
+
     def __init__(self, paths):
         """Initialise with a list of paths."""
         ReferenceBase.__init__(self, paths)
@@ -135,7 +199,10 @@ class ReferenceMultiple(ReferenceBase):
         Hopefully this algorithm isn't too slow...
         """
 
-        retn = None
+        retn = self._getCached(thissetting)
+        if retn is not None:
+            return retn
+
         minjumps = 99999
         for ref in self.refs:
             try:
@@ -158,6 +225,7 @@ class ReferenceMultiple(ReferenceBase):
         if retn is None:
             raise self.ResolveException("Not linked to any settings")
 
+        self._setCached(thissetting, retn)
         return retn
 
     def setOnModified(self, setn, fn):
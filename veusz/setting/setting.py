@@ -34,7 +34,7 @@ import numpy as N
 from .. import qtall as qt
 from . import controls
 from .settingdb import settingdb, uilocale, ui_floattostring, ui_stringtofloat
-from .reference import ReferenceBase, Reference
+from .reference import ReferenceBase, Reference, invalidateReferenceCache
 
 from .. import utils
 from .. import datasets
@@ -44,7 +44,18 @@ class OnModified(qt.QObject):
     onModified = qt.pyqtSignal()
 
 class Setting:
-    """A class to store a value with a particular type."""
+    """A class to store a value with a particular type.
+
+    As documents can have very many settings, they use __slots__ to
+    save memory (subclasses should define __slots__ too). The object
+    emitting modification signals is only created when something
+    connects to it.
+    """
+
+    __slots__ = (
+        'readonly', 'parent', 'name', 'descr', 'usertext', 'formatting',
+        'hidden', 'default', 'pixmap', '_onmodified', '_val', '_ref',
+        '__weakref__')
 
     # differentiate widgets, settings and setting
     nodetype = 'setting'
@@ -75,7 +86,7 @@ class Setting:
         self.formatting = formatting
         self.hidden = hidden
         self.default = value
-        self.onmodified = OnModified()
+        self._onmodified = None
         self._val = self._ref = None
 
         # calls the set function for the val property
@@ -129,12 +140,21 @@ class Setting:
             self._val = self.normalize(v)
             self._ref = None
 
-        self.onmodified.onModified.emit()
+        invalidateReferenceCache()
+        if self._onmodified is not None:
+            self._onmodified.onModified.emit()
 
     val = property(
         get, set, None,
         'Get or modify the value of the setting')
 
+    @property
+    def onmodified(self):
+        """Object with onModified signal, emitted when setting changes."""
+        if self._onmodified is None:
+            self._onmodified = OnModified()
+        return self._onmodified
+
     def isReference(self):
         """Is this a setting a reference to another object."""
         return bool(self._ref)
@@ -241,6 +261,7 @@ class Setting:
 
         self._ref = None
         self._val = self.normalize(val)
+        invalidateReferenceCache()
 
     def normalize(self, val):
         """Convert external value to normalized form for storing
@@ -290,6 +311,8 @@ class SettingBackwardCompat(Setting):
     This is used for backward-compatibility.
     """
 
+    __slots__ = ('relpath', 'translatefn')
+
     typename = 'backward-compat'
 
     def __init__(self, name, newrelpath, val, translatefn=None,
@@ -348,6 +371,8 @@ class SettingBackwardCompat(Setting):
 class Str(Setting):
     """String setting."""
 
+    __slots__ = ()
+
     typename = 'str'
 
     def normalize(self, val):
@@ -367,6 +392,8 @@ class Str(Setting):
 class Notes(Str):
     """String for making notes."""
 
+    __slots__ = ()
+
     typename = 'str-notes'
 
     def makeControl(self, *args):
@@ -376,6 +403,8 @@ class Notes(Str):
 class Bool(Setting):
     """Bool setting."""
 
+    __slots__ = ()
+
     typename = 'bool'
 
     def normalize(self, val):
@@ -402,6 +431,8 @@ class Bool(Setting):
 class Int(Setting):
     """Integer settings."""
 
+    __slots__ = ('maxval', 'minval')
+
     typename = 'int'
 
     def __init__(self, name, value, minval=-1000000, maxval=1000000,
@@ -462,6 +493,8 @@ def _finiteRangeFloat(f, minval=-1e300, maxval=1e300):
 class Float(Setting):
     """Float settings."""
 
+    __slots__ = ('maxval', 'minval')
+
     typename = 'float'
 
     def __init__(self, name, value, minval=-1e200, maxval=1e200,
@@ -508,6 +541,8 @@ class Float(Setting):
 class FloatOrAuto(Float):
     """Save a float or text auto."""
 
+    __slots__ = ()
+
     typename = 'float-or-auto'
 
     def normalize(self, val):
@@ -536,6 +571,8 @@ class FloatOrAuto(Float):
 class FloatSlider(Float):
     """A float with a slider control."""
 
+    __slots__ = ('scale', 'step', 'tick')
+
     typename = 'float-slider'
 
     def __init__(self, name, value, step=10, tick=50, scale=1, **args):
@@ -560,6 +597,8 @@ class FloatSlider(Float):
 class IntOrAuto(Setting):
     """Save an int or text auto."""
 
+    __slots__ = ()
+
     typename = 'int-or-auto'
 
     def normalize(self, val):
@@ -647,6 +686,8 @@ $'''
 class Distance(Setting):
     """A veusz distance measure, e.g. 1pt or 3%."""
 
+    __slots__ = ()
+
     typename = 'distance'
 
     # match a distance
@@ -764,12 +805,16 @@ class Distance(Setting):
 class DistancePt(Distance):
     """For a distance in points."""
 
+    __slots__ = ()
+
     def makeControl(self, *args):
         return controls.DistancePt(self, *args)
 
 class DistancePhysical(Distance):
     """For physical distances (no fractional)."""
 
+    __slots__ = ()
+
     def isDist(self, val):
         m = self.distre.match(val)
         if m:
@@ -784,6 +829,8 @@ class DistancePhysical(Distance):
 class DistanceOrAuto(Distance):
     """A distance or the value Auto"""
 
+    __slots__ = ()
+
     typename = 'distance-or-auto'
 
     distre = re.compile( distre_expr + r'|^Auto$', re.VERBOSE )
@@ -797,6 +844,8 @@ class DistanceOrAuto(Distance):
 class Choice(Setting):
     """One out of a list of strings."""
 
+    __slots__ = ('descriptions', 'uilist', 'vallist')
+
     # maybe should be implemented as a dict to speed up checks
 
     typename = 'choice'
@@ -852,6 +901,8 @@ class Choice(Setting):
 class ChoiceOrMore(Setting):
     """One out of a list of strings, or anything else."""
 
+    __slots__ = ('descriptions', 'vallist')
+
     # maybe should be implemented as a dict to speed up checks
 
     typename = 'choice-or-more'
@@ -891,6 +942,8 @@ class ChoiceOrMore(Setting):
 class FloatChoice(ChoiceOrMore):
     """A numeric value, which can also be chosen from the list of values."""
 
+    __slots__ = ()
+
     typename = 'float-choice'
 
     def normalize(self, val):
@@ -917,6 +970,8 @@ class FloatChoice(ChoiceOrMore):
 class FloatDict(Setting):
     """A dictionary, taking floats as values."""
 
+    __slots__ = ()
+
     typename = 'float-dict'
 
     def normalize(self, val):
@@ -967,6 +1022,8 @@ class FloatDict(Setting):
 class FloatList(Setting):
     """A list of float values."""
 
+    __slots__ = ()
+
     typename = 'float-list'
 
     def normalize(self, val):
@@ -1014,6 +1071,8 @@ class FloatList(Setting):
 class WidgetPath(Str):
     """A setting holding a path to a widget. This is checked for validity."""
 
+    __slots__ = ('allowedwidgets', 'relativetoparent')
+
     typename = 'widget-path'
 
     def __init__(self, name, val, relativetoparent=True,
@@ -1087,6 +1146,8 @@ class WidgetPath(Str):
 class Dataset(Str):
     """A setting to choose from the possible datasets."""
 
+    __slots__ = ('datatype', 'dimensions')
+
     typename = 'dataset'
 
     def __init__(self, name, val, dimensions=1, datatype='numeric',
@@ -1126,6 +1187,8 @@ class Dataset(Str):
 class Strings(Setting):
     """A multiple set of strings."""
 
+    __slots__ = ()
+
     typename = 'str-multi'
 
     def normalize(self, val):
@@ -1153,6 +1216,8 @@ class Strings(Setting):
 class Datasets(Setting):
     """A setting to choose one or more of the possible datasets."""
 
+    __slots__ = ('datatype', 'dimensions')
+
     typename = 'dataset-multi'
 
     def __init__(self, name, val, dimensions=1, datatype='numeric',
@@ -1215,6 +1280,8 @@ class DatasetExtended(Dataset):
     """Choose a dataset, give an expression or specify a list of float
     values."""
 
+    __slots__ = ()
+
     typename = 'dataset-extended'
 
     def normalize(self, val):
@@ -1306,6 +1373,8 @@ class DatasetOrStr(Dataset):
     Non string datasets are converted to string arrays using this.
     """
 
+    __slots__ = ()
+
     typename = 'dataset-or-str'
 
     def __init__(self, name, val, **args):
@@ -1335,6 +1404,8 @@ class DatasetOrStr(Dataset):
 class Color(ChoiceOrMore):
     """A color setting."""
 
+    __slots__ = ()
+
     typename = 'color'
 
     def __init__(self, name, value, **args):
@@ -1371,6 +1442,8 @@ class Color(ChoiceOrMore):
 class FillStyle(Choice):
     """A setting for the different fill styles provided by Qt."""
 
+    __slots__ = ()
+
     typename = 'fill-style'
 
     _fillstyles = [
@@ -1418,6 +1491,8 @@ class FillStyle(Choice):
 class LineStyle(Choice):
     """A setting choosing a particular line style."""
 
+    __slots__ = ()
+
     typename = 'line-style'
 
     # list of allowed line styles
@@ -1476,6 +1551,8 @@ class Axis(Str):
     direction is 'horizontal', 'vertical' or 'both'
     """
 
+    __slots__ = ('direction',)
+
     typename = 'axis'
 
     def __init__(self, name, val, direction, **args):
@@ -1499,6 +1576,8 @@ class Axis(Str):
 class WidgetChoice(Str):
     """Hold the name of a child widget."""
 
+    __slots__ = ('widgettypes',)
+
     typename = 'widget-choice'
 
     def __init__(self, name, val, widgettypes={}, **args):
@@ -1575,6 +1654,8 @@ class WidgetChoice(Str):
 class Marker(Choice):
     """Choose a marker type from one allowable."""
 
+    __slots__ = ()
+
     typename = 'marker'
 
     def __init__(self, name, value, **args):
@@ -1590,6 +1671,8 @@ class Marker(Choice):
 class Arrow(Choice):
     """Choose an arrow type from one allowable."""
 
+    __slots__ = ()
+
     typename = 'arrow'
 
     def __init__(self, name, value, **args):
@@ -1606,6 +1689,8 @@ class LineSet(Setting):
     """A setting which corresponds to a set of lines.
     """
 
+    __slots__ = ()
+
     typename='line-multi'
 
     def normalize(self, val):
@@ -1668,6 +1753,8 @@ class FillSet(Setting):
     This setting keeps an internal array of LineSettings.
     """
 
+    __slots__ = ()
+
     typename = 'fill-multi'
 
     def normalize(self, val):
@@ -1727,6 +1814,8 @@ class FillSet(Setting):
 class Filename(Str):
     """Represents a filename setting."""
 
+    __slots__ = ()
+
     typename = 'filename'
 
     def makeControl(self, *args):
@@ -1740,6 +1829,8 @@ class Filename(Str):
 class ImageFilename(Filename):
     """Represents an image filename setting."""
 
+    __slots__ = ()
+
     typename = 'filename-image'
 
     def makeControl(self, *args):
@@ -1748,6 +1839,8 @@ class ImageFilename(Filename):
 class SVGFilename(Filename):
     """Represents an svg filename setting."""
 
+    __slots__ = ()
+
     typename = 'filename-svg'
 
     def makeControl(self, *args):
@@ -1756,6 +1849,8 @@ class SVGFilename(Filename):
 class FontFamily(Str):
     """Represents a font family."""
 
+    __slots__ = ()
+
     typename = 'font-family'
 
     def makeControl(self, *args):
@@ -1765,6 +1860,8 @@ class FontFamily(Str):
 class FontStyle(Str):
     """Represents a font style."""
 
+    __slots__ = ('familysetnname',)
+
     typename = 'font-style'
 
     def __init__(self, name, val, familysetnname, **args):
@@ -1789,6 +1886,8 @@ class ErrorStyle(Choice):
     The allowed values are below in _errorstyles.
     """
 
+    __slots__ = ()
+
     typename = 'errorbar-style'
 
     _errorstyles = (
@@ -1819,6 +1918,8 @@ class ErrorStyle(Choice):
 class AlignHorz(Choice):
     """Alignment horizontally."""
 
+    __slots__ = ()
+
     typename = 'align-horz'
 
     def __init__(self, name, value, **args):
@@ -1830,6 +1931,8 @@ class AlignHorz(Choice):
 class AlignVert(Choice):
     """Alignment vertically."""
 
+    __slots__ = ()
+
     typename = 'align-vert'
 
     def __init__(self, name, value, **args):
@@ -1841,6 +1944,8 @@ class AlignVert(Choice):
 class AlignHorzWManual(Choice):
     """Alignment horizontally."""
 
+    __slots__ = ()
+
     typename = 'align-horz-+manual'
 
     def __init__(self, name, value, **args):
@@ -1853,6 +1958,8 @@ class AlignHorzWManual(Choice):
 class AlignVertWManual(Choice):
     """Alignment vertically."""
 
+    __slots__ = ()
+
     typename = 'align-vert-+manual'
 
     def __init__(self, name, value, **args):
@@ -1866,6 +1973,8 @@ class AlignVertWManual(Choice):
 class BoolSwitch(Bool):
     """Bool switching setting."""
 
+    __slots__ = ('sfalse', 'strue')
+
     def __init__(self, name, value, settingsfalse=[], settingstrue=[],
                  **args):
         """Enables/disables a set of settings if True or False
@@ -1887,6 +1996,8 @@ class BoolSwitch(Bool):
 class ChoiceSwitch(Choice):
     """Show or hide other settings based on the choice given here."""
 
+    __slots__ = ('showfn',)
+
     def __init__(self, name, vallist, value,
                  showfn=lambda x: ((),()),
                  **args):
@@ -1910,6 +2021,8 @@ class ChoiceSwitch(Choice):
 class FillStyleExtended(ChoiceSwitch):
     """A setting for the different fill styles provided by Qt."""
 
+    __slots__ = ()
+
     typename = 'fill-style-ext'
 
     @staticmethod
@@ -1940,6 +2053,8 @@ class FillStyleExtended(ChoiceSwitch):
 class RotateInterval(Choice):
     '''Rotate a label with intervals given.'''
 
+    __slots__ = ()
+
     def __init__(self, name, val, **args):
         Choice.__init__(
             self, name,
@@ -1968,12 +2083,16 @@ class Colormap(Str):
     change later.
     """
 
+    __slots__ = ()
+
     def makeControl(self, *args):
         return controls.Colormap(self, self.getDocument(), *args)
 
 class AxisBound(FloatOrAuto):
     """Axis bound - either numeric, Auto or date."""
 
+    __slots__ = ()
+
     typename = 'axis-bound'
 
     def makeControl(self, *args):
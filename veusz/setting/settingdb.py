@@ -39,11 +39,16 @@ defaultValues = {
     'export_quality': 85,
     'export_background': '#ffffff00',
     'export_SVG_text_as_text': False,
+    'export_line_tolerance': 0.,
 
     # plot options
     'plot_updatepolicy': -1, # update on document changed
     'plot_antialias': True,
     'plot_numthreads': 2,
+    'plot_rastercache': True,
+    'plot_threadedpaint': False,
+    'plot_progressive': True,
+    'plot_fastnavigation': True,
 
     # recent files list
     'main_recentfiles': [],
@@ -82,6 +87,11 @@ defaultValues = {
     # add import paths
     'docfile_addimportpaths': True,
 
+    # compression of data in HDF5 documents ('none', 'gzip' or 'lzf')
+    'docfile_hdf5_compression': 'gzip',
+    'docfile_hdf5_shuffle': True,
+    'docfile_hdf5_threads': 2,
+
     # ask tutorial before?
     'ask_tutorial': False,
 
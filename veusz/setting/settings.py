@@ -99,6 +99,13 @@ class Settings:
             if isinstance(self.setdict[n], Settings)
         ]
 
+    def valueSnapshot(self):
+        """Return nested tuples of the names and values of settings,
+        which is equal to a later snapshot if no values changed."""
+        return tuple(
+            (s.name, s.valueSnapshot() if isinstance(s, Settings) else s.val)
+            for s in self.getList() )
+
     def isSetting(self, name):
         """Is the name a supported setting?"""
         return name in self.setdict
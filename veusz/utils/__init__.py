@@ -22,6 +22,7 @@ from .version import *
 from .textrender import Renderer, FontMetrics, latexEscape
 from .safe_eval import compileChecked, SafeEvalException
 from .fitlm import fitLM
+from .decimate import decimateLine
 
 from .utilfuncs import *
 from .points import getPointPainterPath, MarkerCodes, plotMarkers, \
@@ -34,6 +35,6 @@ from .extbrushfilling import *
 from .feedback import feedback, FeedbackCheckThread, disableFeedback
 
 from ..helpers.qtloops import addNumpyToPolygonF, plotPathsToPainter, \
-    plotLinesToPainter, plotClippedPolyline, polygonClip, \
+    plotImagesToPainter, plotLinesToPainter, plotClippedPolyline, polygonClip, \
     plotClippedPolygon, plotBoxesToPainter, addNumpyPolygonToPath, \
     RotatedRectangle, RectangleOverlapTester
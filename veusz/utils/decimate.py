@@ -0,0 +1,76 @@
+#    Copyright (C) 2021 Jeremy S. Sanders
+#    Email: Jeremy Sanders <jeremy@jeremysanders.net>
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+###############################################################################
+
+"""Reduce the number of points in lines before drawing them.
+
+Consecutive points of a line which lie in the same column (of width
+colwidth) are replaced by the first, minimum, maximum and last points
+in the column. If the columns are device pixels, the drawn line
+covers the same pixels, so lines with many more points than pixels
+(such as long time series with sorted x values) are much faster to
+draw.
+"""
+
+import numpy as N
+
+def decimateLine(xpts, ypts, colwidth):
+    """Return (xpts, ypts) reduced to at most four points for each
+    run of consecutive points in the same column of width colwidth.
+
+    Points with non-finite values, which break the line, are kept
+    and end any run, so each finite part of the line is reduced
+    separately. The original arrays are returned if there would not
+    be many fewer points.
+    """
+
+    num = len(xpts)
+    if colwidth <= 0 or num < 8:
+        return xpts, ypts
+    finite = N.isfinite(xpts) & N.isfinite(ypts)
+    allfinite = N.all(finite)
+    if not allfinite:
+        xfin = N.where(finite, xpts, 0.)
+        yfin = N.where(finite, ypts, 0.)
+    else:
+        xfin, yfin = xpts, ypts
+
+    # starts of runs of points in the same column, with each
+    # non-finite point in a run of its own
+    cols = N.floor(xfin * (1./colwidth))
+    change = cols[1:] != cols[:-1]
+    if not allfinite:
+        change |= ~finite[1:] | ~finite[:-1]
+    starts = N.concatenate(([0], N.flatnonzero(change)+1))
+    if len(starts)*2 > num:
+        return xpts, ypts
+    ends = N.concatenate((starts[1:], [num]))
+
+    # index of the first minimum and maximum in each run
+    lengths = ends - starts
+    idxs = N.arange(num)
+    imin = N.minimum.reduceat(N.where(
+        yfin == N.repeat(N.minimum.reduceat(yfin, starts), lengths),
+        idxs, num), starts)
+    imax = N.minimum.reduceat(N.where(
+        yfin == N.repeat(N.maximum.reduceat(yfin, starts), lengths),
+        idxs, num), starts)
+
+    # keep the points in their original order
+    keep = N.zeros(num, dtype=bool)
+    keep[starts] = keep[ends-1] = keep[imin] = keep[imax] = True
+    return xpts[keep], ypts[keep]
@@ -18,11 +18,14 @@
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 ###############################################################################
 
+import threading
+
 import numpy as N
 
 from .. import qtall as qt
 from . import colormap
-from ..helpers.qtloops import plotPathsToPainter, scalePath
+from ..helpers.qtloops import plotPathsToPainter, plotImagesToPainter, \
+    scalePath
 
 """Symbol plotting part of Veusz
 
@@ -581,6 +584,131 @@ MarkerCodes = (
     'lineup', 'linedown', 'lineleft', 'lineright',
 )
 
+# images of markers, for drawing markers on bitmaps
+_spritecache = {}
+# held when using the cache, as markers are drawn in several threads
+_spritelock = threading.Lock()
+# maximum number of items in sprite cache
+_spritecachesize = 64
+# number of colors used for colormapped markers on bitmaps
+_spritecolors = 256
+# maximum size of image markers are drawn onto
+_maxlayerpixels = 8192*8192
+
+def _simpleBrush(brush):
+    """Is the brush a plain color or empty?"""
+    return brush.style() in (qt.Qt.NoBrush, qt.Qt.SolidPattern)
+
+def _penKey(pen):
+    return (
+        pen.style(), pen.widthF(), pen.color().rgba(), pen.capStyle(),
+        pen.joinStyle(), pen.isCosmetic(), tuple(pen.dashPattern()))
+
+def _markerSprites(painter, path, brushes, key):
+    """Return (image, width) of marker path drawn using each brush,
+    side by side, at the painter native resolution."""
+
+    with _spritelock:
+        sprites = _spritecache.get(key)
+    if sprites is not None:
+        return sprites
+
+    scaling = painter.scaling
+    pen = painter.pen()
+    margin = pen.widthF() if pen.style() != qt.Qt.NoPen else 0.
+    box = path.boundingRect().adjusted(-margin, -margin, margin, margin)
+    halfw = max(abs(box.left()), abs(box.right()))*scaling + 1
+    halfh = max(abs(box.top()), abs(box.bottom()))*scaling + 1
+    width, height = 2*int(N.ceil(halfw)), 2*int(N.ceil(halfh))
+
+    img = qt.QImage(
+        width*len(brushes), height, qt.QImage.Format_ARGB32_Premultiplied)
+    img.fill(0)
+    p = qt.QPainter(img)
+    p.setRenderHint(qt.QPainter.Antialiasing, painter.antialias)
+    p.setPen(pen)
+    for i, brush in enumerate(brushes):
+        p.resetTransform()
+        p.translate((i+0.5)*width, 0.5*height)
+        p.scale(scaling, scaling)
+        p.setBrush(brush)
+        p.drawPath(path)
+    p.end()
+
+    sprites = (img, width)
+    with _spritelock:
+        if len(_spritecache) >= _spritecachesize:
+            _spritecache.clear()
+        _spritecache[key] = sprites
+    return sprites
+
+def _plotMarkerSprites(painter, path, pathkey, xpos, ypos, clip,
+                       cmap, colorvals):
+    """Plot markers by drawing images of them, for bitmap output.
+
+    The markers are drawn onto an image covering clip at the native
+    resolution, which is then drawn on the painter. Positions are
+    rounded to native pixels. Colormapped markers use a set of
+    _spritecolors colors.
+
+    Returns False if the markers cannot be drawn this way.
+    """
+
+    pen, brush = painter.pen(), painter.brush()
+    if not _simpleBrush(brush) or not _simpleBrush(pen.brush()):
+        return False
+
+    # the images are made for the painter scaling only
+    scaling = painter.scaling
+    trans = painter.worldTransform()
+    if ( trans.type() > qt.QTransform.TxScale or
+         trans.m11() != scaling or trans.m22() != scaling ):
+        return False
+
+    # image to draw markers onto, covering clip in native pixels
+    layerw = int(N.ceil(clip.width()*scaling))
+    layerh = int(N.ceil(clip.height()*scaling))
+    if layerw <= 0 or layerh <= 0 or layerw*layerh > _maxlayerpixels:
+        return False
+
+    if colorvals is None:
+        brushes = [brush]
+        colorkey = (brush.style(), brush.color().rgba())
+        index = None
+    else:
+        # quantise the color values, with an extra color for invalid values
+        trans = (1-brush.color().alphaF())*100
+        levels = N.hstack((N.linspace(0., 1., _spritecolors), [N.nan]))
+        colorimg = colormap.applyColorMap(
+            cmap, 'linear', levels.reshape(1, len(levels)), 0., 1., trans)
+        brushes = [
+            qt.QBrush(qt.QColor.fromRgba(colorimg.pixel(i, 0)))
+            for i in range(len(levels)) ]
+        colorkey = (N.asarray(cmap).tobytes(), trans)
+        vals = N.asarray(colorvals, dtype=N.float64)
+        index = N.rint(N.clip(vals, 0., 1.) * (_spritecolors-1))
+        index[~N.isfinite(vals)] = _spritecolors
+
+    key = (pathkey, _penKey(pen), colorkey, scaling, painter.antialias)
+    sprites, spritewidth = _markerSprites(painter, path, brushes, key)
+
+    layer = qt.QImage(layerw, layerh, qt.QImage.Format_ARGB32_Premultiplied)
+    layer.fill(0)
+    p = qt.QPainter(layer)
+    plotImagesToPainter(
+        p, sprites,
+        (N.asarray(xpos, dtype=N.float64)-clip.left())*scaling,
+        (N.asarray(ypos, dtype=N.float64)-clip.top())*scaling,
+        index, spritewidth,
+        qt.QRectF(0, 0, layer.width(), layer.height()))
+    p.end()
+
+    painter.drawImage(
+        qt.QRectF(clip.left(), clip.top(),
+                  layer.width()/scaling, layer.height()/scaling),
+        layer)
+    return True
+
 def plotMarkers(painter, xpos, ypos, markername, markersize, scaling=None,
                 clip=None, cmap=None, colorvals=None, scaleline=False,
                 equalarea=False):
@@ -620,6 +748,15 @@ def plotMarkers(painter, xpos, ypos, markername, markersize, scaling=None,
     if equalarea and markername in area_scales:
         path = scalePath(path, area_scales[markername])
 
+    # on bitmaps, draw images of the markers if their size is fixed
+    if ( scaling is None and clip is not None and
+         getattr(painter, 'bitmap', False) and
+         _plotMarkerSprites(
+             painter, path, (markername, markersize, equalarea),
+             xpos, ypos, clip, cmap, colorvals) ):
+        painter.restore()
+        return
+
     # if using colored points
     colorimg = None
     if colorvals is not None:
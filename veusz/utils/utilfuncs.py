@@ -238,14 +238,22 @@ class NonBlockingReaderThread(threading.Thread):
 
     If exiteof is True, then exit capturing when we can capture no
     more data.
+
+    If binary is True, the file object should be opened in binary
+    mode. Data are read in chunks rather than lines and returned as
+    a bytearray.
     """
 
-    def __init__(self, fileobject, exiteof=True):
+    # maximum number of bytes to read at once in binary mode
+    chunksize = 65536
+
+    def __init__(self, fileobject, exiteof=True, binary=False):
         """Create the thread object."""
         threading.Thread.__init__(self)
         self.fileobject = fileobject
         self.lock = threading.Lock()
-        self.data = ''
+        self.binary = binary
+        self.data = bytearray() if binary else ''
         self.done = False
         self.exiteof = exiteof
 
@@ -258,7 +266,7 @@ class NonBlockingReaderThread(threading.Thread):
         self.lock.acquire()
         data = self.data
         done = self.done
-        self.data = ''
+        self.data = bytearray() if self.binary else ''
         self.lock.release()
         if isinstance(data, Exception):
             # if the reader errored somewhere
@@ -266,12 +274,21 @@ class NonBlockingReaderThread(threading.Thread):
         else:
             return data, done
 
+    def _readChunk(self):
+        """Read the next line (or chunk in binary mode)."""
+        if self.binary:
+            # read1 avoids blocking until a full chunk is available
+            reader = getattr(self.fileobject, 'read1', self.fileobject.read)
+            return reader(self.chunksize)
+        else:
+            return self.fileobject.readline()
+
     def run(self):
         """Do the reading from the file object."""
 
         while True:
             try:
-                data = self.fileobject.readline()
+                data = self._readChunk()
             except Exception as e:
                 # error in reading
                 self.lock.acquire()
@@ -589,6 +606,18 @@ def findOnPath(cmd):
             return cmdtry
     return None
 
+def replaceFile(tempname, filename):
+    """Rename the file tempname to filename, replacing any existing
+    file. The permissions of an existing file are kept, otherwise
+    the default permissions are used."""
+    if os.path.exists(filename):
+        os.chmod(tempname, os.stat(filename).st_mode & 0o7777)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tempname, 0o666 & ~umask)
+    os.replace(tempname, filename)
+
 def listIndex(inlist, item):
     """Return index of item in list or -1 if not available."""
     try:
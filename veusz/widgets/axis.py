@@ -180,6 +180,8 @@ class TickLabel(setting.Text):
 class AutoRange(setting.ChoiceOrMore):
     """Choose how to choose range of axis."""
 
+    __slots__ = ()
+
     # +5% or -5%
     re_dr_plusminus = re.compile(
         r'''
@@ -722,6 +724,9 @@ class Axis(widget.Widget):
     def dataToPlotterCoords(self, posn, data):
         """Convert data values to plotter coordinates, scaling if necessary."""
         self.updateAxisLocation(posn)
+        if isinstance(data, N.ndarray) and data.dtype != N.float64:
+            # datasets can hold float32 values
+            data = data.astype(N.float64)
         return self._graphToPlotter(data*self.settings.datascale)
 
     def plotterToGraphCoords(self, bounds, vals):
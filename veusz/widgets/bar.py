@@ -21,16 +21,33 @@
 import numpy as N
 
 from .. import qtall as qt
+from .. import datasets
 from .. import document
 from .. import setting
 from .. import utils
 
 from .plotters import GenericPlotter
+from .axisbroken import AxisBroken
+from .axisfunction import AxisFunction
 
 def _(text, disambiguation=None, context='BarPlotter'):
     """Translate text."""
     return qt.QCoreApplication.translate(context, text, disambiguation)
 
+def _minSpacingIndices(vals):
+    """For sorted values, return the indices i where the spacing
+    vals[i+1]-vals[i] is smallest, for the values and their
+    logarithms."""
+    if len(vals) < 2:
+        return ()
+    idxs = {int(N.argmin(N.abs(N.diff(vals))))}
+    pos = vals[vals > 0]
+    if len(pos) >= 2:
+        # positive values are at one end of sorted values
+        offset = 0 if vals[0] > 0 else len(vals)-len(pos)
+        idxs.add(offset + int(N.argmin(N.abs(N.diff(N.log(pos))))))
+    return tuple(sorted(idxs))
+
 class BarFill(setting.Settings):
     '''Filling of bars.'''
     def __init__(self, name, **args):
@@ -219,29 +236,60 @@ class BarPlotter(GenericPlotter):
                     axrange[0] = min(1-0.5, axrange[0])
                     axrange[1] = max(maxlen+0.5,  axrange[1])
 
-    def findBarPositions(self, lengths, positions, axes, posn):
-        """Work out centres of bar / bar groups and maximum width."""
+    def findBarPositions(self, lengths, positions, axes, posn, clip):
+        """Work out centres of bar / bar groups and maximum width.
+
+        Returns (posns, maxwidth, start, stop). If the positions are
+        sorted, only the visible bars and one either side are
+        converted, which are bars start to stop. Otherwise all the
+        bars are converted.
+        """
 
         ishorz = self.settings.direction == 'horizontal'
 
         if positions is None:
             p = N.arange( max([len(d.data) for d in lengths]) )+1.
+            sortedness = 1
         else:
             p = positions.data
+            sortedness = positions.rangeStats()[0].sortedness
 
         # work out positions of bars
         # get vertical axis if horz, and vice-versa
         axis = axes[ishorz]
-        posns = axis.dataToPlotterCoords(posn, p)
-        if len(posns) <= 1:
-            if ishorz:
-                maxwidth = posn[2]-posn[0]
+
+        if sortedness == 0 or isinstance(axis, (AxisBroken, AxisFunction)):
+            posns = axis.dataToPlotterCoords(posn, p)
+            if len(posns) <= 1:
+                maxwidth = posn[2]-posn[0] if ishorz else posn[3]-posn[1]
             else:
-                maxwidth = posn[3]-posn[1]
+                maxwidth = N.nanmin(N.abs(posns[1:]-posns[:-1]))
+            return posns, maxwidth, 0, len(posns)
+
+        # the minimum spacing on a linear or log axis is between one
+        # of these pairs of values, so the other values do not need
+        # converting to find the width
+        if positions is None:
+            idxs = _minSpacingIndices(p)
         else:
-            maxwidth = N.nanmin(N.abs(posns[1:]-posns[:-1]))
+            idxs = positions.cachedStats(
+                'barspacing', ('data',), _minSpacingIndices)
+        if idxs:
+            pairs = axis.dataToPlotterCoords(
+                posn, p[N.array([(i, i+1) for i in idxs]).ravel()])
+            maxwidth = N.nanmin(N.abs(pairs[1::2]-pairs[0::2]))
+        else:
+            maxwidth = posn[2]-posn[0] if ishorz else posn[3]-posn[1]
+
+        # select the visible bars in data coordinates
+        start, stop = 0, len(p)
+        vrange = self.visibleDataRange(axis, posn, clip, maxwidth)
+        if vrange is not None:
+            start, stop = datasets.sortedIndexRange(
+                p, sortedness, vrange[0], vrange[1])
 
-        return posns,  maxwidth
+        posns = axis.dataToPlotterCoords(posn, p[start:stop])
+        return posns, maxwidth, start, stop
 
     def calculateErrorBars(self, dataset, vals):
         """Get values for error bars."""
@@ -547,9 +595,10 @@ class BarPlotter(GenericPlotter):
         if not lengths:
             return
 
-        # where the bars are to be placed horizontally
-        barposns, maxwidth = self.findBarPositions(
-            lengths, positions, axes, widgetposn)
+        # where the bars are to be placed horizontally (if the
+        # positions are in order, only for the visible bars)
+        barposns, maxwidth, start, stop = self.findBarPositions(
+            lengths, positions, axes, widgetposn, clip)
 
         # only use finite positions
         origposnlen = len(barposns)
@@ -566,7 +615,7 @@ class BarPlotter(GenericPlotter):
                 v = getattr(dataset, key)
                 if v is not None:
                     vals[key] = extend1DArray(
-                        N.nan_to_num(v), origposnlen)[validposn]
+                        N.nan_to_num(v[start:stop]), origposnlen)[validposn]
             dsvals.append(vals)
 
         # actually do the drawing
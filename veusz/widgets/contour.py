@@ -284,11 +284,9 @@ class Contour(plotters.GenericPlotter):
         if data is None or data.dimensions != 2 or data.data.size == 0:
             return
 
-        minval, maxval = N.nanmin(data.data), N.nanmax(data.data)
-        if not N.isfinite(minval):
-            minval = 0.
-        if not N.isfinite(maxval):
-            maxval = 1.
+        datarange = data.dataStats().range()
+        if datarange is not None:
+            minval, maxval = datarange
 
         # override if not auto
         if s.min != 'Auto':
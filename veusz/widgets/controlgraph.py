@@ -353,7 +353,9 @@ class _GraphMarginBox(qt.QGraphicsItem):
 
     def updateWidget(self):
         """Update widget margins."""
-        self.params.widget.updateControlItem(self.params)
+        widget = self.params.widget
+        with widget.document.change():
+            widget.updateControlItem(self.params)
 
 ##############################################################################
 
@@ -506,7 +508,9 @@ class _GraphResizableBox(qt.QGraphicsItem):
 
     def updateWidget(self):
         """Tell the user the graphicsitem has been moved or resized."""
-        self.params.widget.updateControlItem(self.params)
+        widget = self.params.widget
+        with widget.document.change():
+            widget.updateControlItem(self.params)
 
     def boundingRect(self):
         """Intentionally zero bounding rect."""
@@ -619,7 +623,9 @@ class _GraphLine(qt.QGraphicsLineItem, _ScaledShape):
         pt1 = self.p0.scaledX()+x, self.p0.scaledY()+y
         pt2 = self.p1.scaledX()+x, self.p1.scaledY()+y
 
-        self.params.widget.updateControlItem(self.params, pt1, pt2)
+        widget = self.params.widget
+        with widget.document.change():
+            widget.updateControlItem(self.params, pt1, pt2)
 
 #############################################################################
 
@@ -797,7 +803,9 @@ class _GraphAxisLine(qt.QGraphicsItem):
 
     def updateWidget(self):
         """Tell widget to update."""
-        self.params.widget.updateControlItem(self.params)
+        widget = self.params.widget
+        with widget.document.change():
+            widget.updateControlItem(self.params)
 
     def boundingRect(self):
         """Intentionally zero bounding rect."""
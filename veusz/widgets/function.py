@@ -38,6 +38,8 @@ class FunctionPlotter(GenericPlotter):
     typename='function'
     allowusercreation=True
     description=_('Plot a function')
+    # functions can use any dataset or custom definition
+    cachelayers = False
 
     @classmethod
     def addSettings(klass, s):
@@ -232,18 +232,17 @@ class Image(plotters.GenericPlotter):
         """Update data range from data."""
 
         s = self.settings
+        # cached range of finite values
+        datarange = None
+        if data is not None and len(data.data) != 0:
+            datarange = data.dataStats().range()
+
         minval = s.min
         if minval == 'Auto':
-            if data is not None and len(data.data) != 0:
-                minval = N.nanmin(data.data)
-            else:
-                minval = 0.
+            minval = datarange[0] if datarange is not None else 0.
         maxval = s.max
         if maxval == 'Auto':
-            if data is not None and len(data.data) != 0:
-                maxval = N.nanmax(data.data)
-            else:
-                maxval = minval + 1
+            maxval = datarange[1] if datarange is not None else minval + 1
 
         # this is used currently by colorbar objects
         return (minval, maxval)
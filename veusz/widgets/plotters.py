@@ -37,6 +37,8 @@ class GenericPlotter(widget.Widget):
 
     typename='genericplotter'
     isplotter = True
+    # whether recorded layers can be reused if unchanged
+    cachelayers = True
 
     @classmethod
     def allowedParentTypes(klass):
@@ -104,6 +106,22 @@ class GenericPlotter(widget.Widget):
         cliprect = qt.QRectF(qt.QPointF(x1, y1), qt.QPointF(x2, y2))
         return cliprect
 
+    def visibleDataRange(self, axis, posn, cliprect, margin=0.):
+        """Return (minimum, maximum) data values on axis which are
+        inside cliprect, extended by margin in plotter coordinates.
+
+        Returns None if the range cannot be calculated.
+        """
+
+        if axis.settings.direction == 'horizontal':
+            edges = [cliprect.left()-margin, cliprect.right()+margin]
+        else:
+            edges = [cliprect.top()-margin, cliprect.bottom()+margin]
+        vals = axis.plotterToDataCoords(posn, N.array(edges))
+        if not N.all(N.isfinite(vals)):
+            return None
+        return min(vals), max(vals)
+
     def getAxisLabels(self, direction):
         """Get labels for datapoints and coordinates, or None if none.
         direction is 'horizontal' or 'vertical'
@@ -170,15 +188,57 @@ class GenericPlotter(widget.Widget):
 
         # clip data within bounds of plotter
         cliprect = self.clipAxesBounds(axes, posn)
-        painter = painthelper.painter(self, posn, clip=cliprect)
-        with painter:
-            self.dataDraw(painter, axes, posn, cliprect)
+
+        # reuse layers from earlier paint if nothing has changed
+        key = self.layerCacheKey(painthelper, axes, posn, cliprect)
+        if painthelper.reuseLayers(self, key):
+            return posn
+
+        with painthelper.recordLayers(self, key):
+            painter = painthelper.painter(self, posn, clip=cliprect)
+            with painter:
+                self.dataDraw(painter, axes, posn, cliprect)
 
         for c in self.children:
             c.draw(posn, painthelper, outerbounds)
 
         return posn
 
+    def layerCacheKey(self, painthelper, axes, posn, cliprect):
+        """Return key for the recorded layers of the widget, which is
+        equal if it would be drawn the same, or None to not cache.
+
+        The key includes the settings, the state of the datasets of
+        the document and the state of the axes. Datasets are not
+        looked up, so any change to the data redraws the widget.
+        """
+
+        if ( painthelper.layercache is None or not self.cachelayers or
+             self.children ):
+            return None
+
+        doc = self.document
+        if doc.evaluate.settingsused:
+            # dataset expressions can use any setting
+            datakey = ('doc', doc.changeset)
+        else:
+            datakey = ('data', doc.datachangeset)
+
+        axiskeys = tuple(
+            (a, a.settings.valueSnapshot(), tuple(a.plottedrange),
+             tuple(a.currentbounds))
+            for a in axes )
+
+        return (
+            painthelper.layerDocKey(),
+            self.settings.valueSnapshot(),
+            datakey,
+            axiskeys,
+            tuple(posn),
+            (cliprect.left(), cliprect.top(),
+             cliprect.right(), cliprect.bottom()),
+        )
+
     def dataDraw(self, painter, axes, posn, cliprect):
         """Actually plot the data."""
         pass
@@ -35,6 +35,10 @@ def _(text, disambiguation=None, context='XY'):
     """Translate text."""
     return qt.QCoreApplication.translate(context, text, disambiguation)
 
+# in draft paints, the density of points is shown if there are more
+# markers than this
+_draftdensitypoints = 20000
+
 class ErrorBarDraw:
     """For plotting error bars."""
 
@@ -420,6 +424,18 @@ class PointPlotter(GenericPlotter):
             'circle',
             descr=_('Type of marker to plot'),
             usertext=_('Marker'), formatting=True), 0 )
+        s.add( setting.Choice(
+            'markerMode',
+            ('markers', 'density'),
+            'markers',
+            descr=_('Plot each marker, or the density of points'),
+            usertext=_('Marker mode'),
+            descriptions=(
+                _('Plot a marker at each point'),
+                _('Plot the number of points in bins of the marker size, '
+                  'using the marker fill color map and color scaling'),
+            ),
+            formatting=True), 0 )
 
         s.add( setting.ErrorStyle(
             'errorStyle',
@@ -702,10 +718,15 @@ class PointPlotter(GenericPlotter):
                        cliprect ):
         """Draw the line connecting the points."""
 
+        s = self.settings
+        if s.PlotLine.steps == 'off' and painter.linetolerance > 0:
+            # reduce to a few points per pixel column
+            xvals, yvals = utils.decimateLine(
+                xvals, yvals, painter.linetolerance / painter.scaling)
+
         pts = self._getLinePoints(xvals, yvals, posn, xdata, ydata)
         if len(pts) < 2:
             return
-        s = self.settings
 
         # do filling
         for fillstyle in s.FillBelow, s.FillAbove:
@@ -873,6 +894,90 @@ class PointPlotter(GenericPlotter):
             s.MarkerFill.colorMapInvert
         )
 
+    def _drawDensity(self, painter, xplt, yplt, cliprect):
+        """Draw the number of points in bins of the marker size as an
+        image, using the color map.
+
+        The counts divided by the maximum count are scaled using the
+        color min, max and scaling settings. Empty bins are not drawn.
+        """
+
+        s = self.settings
+
+        # bins are the marker size, but at least a pixel
+        binsize = max(
+            s.get('markerSize').convert(painter), 1./painter.scaling)
+        nx = max(int(N.ceil(cliprect.width() / binsize)), 1)
+        ny = max(int(N.ceil(cliprect.height() / binsize)), 1)
+
+        # count points in each bin
+        ix = N.floor((xplt - cliprect.left()) * (1./binsize))
+        iy = N.floor((yplt - cliprect.top()) * (1./binsize))
+        inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        flatidx = iy[inside].astype(N.intp)*nx + ix[inside].astype(N.intp)
+        counts = N.bincount(flatidx, minlength=nx*ny).reshape(ny, nx)
+        maxcount = counts.max()
+        if maxcount == 0:
+            return
+
+        fracs = counts * (1./maxcount)
+        fracs[counts == 0] = N.nan
+
+        brush = s.MarkerFill.makeQBrush(painter)
+        trans = (1-brush.color().alphaF())*100
+        if s.MarkerFill.colorMap == 'none':
+            # use the fill color for all the bins
+            col = brush.color()
+            cmap = N.array([[col.blue(), col.green(), col.red(), 255]]*2)
+        else:
+            cmap = self.document.evaluate.getColormap(
+                s.MarkerFill.colorMap, s.MarkerFill.colorMapInvert)
+
+        # image rows start at the bottom
+        img = utils.applyColorMap(
+            cmap, s.Color.scaling, fracs[::-1], s.Color.min, s.Color.max,
+            trans)
+        painter.drawImage(
+            qt.QRectF(cliprect.left(), cliprect.top(),
+                      nx*binsize, ny*binsize),
+            img)
+
+    def _visibleIndexRange(self, painter, axes, posn, cliprect,
+                           xv, text, scalepoints):
+        """If the x values are sorted, return (start, stop) indices of
+        the points which need to be plotted, or None to plot all."""
+
+        s = self.settings
+        # x errors and labels extend away from the points, and bezier
+        # curves depend on the points outside the range
+        if ( not isinstance(xv, datasets.Dataset1DBase) or
+             xv.hasErrors() or (text and not s.Label.hide) or
+             s.PlotLine.bezierJoin ):
+            return None
+
+        # allow for markers and error bar ends sticking out
+        markersize = s.get('markerSize').convert(painter)
+        if scalepoints is not None:
+            r = scalepoints.getRange()
+            if r is not None:
+                markersize *= max(1., abs(r[0]), abs(r[1]))
+        margin = (
+            2*markersize*max(1., s.ErrorBarLine.endsize) +
+            s.PlotLine.get('width').convert(painter))
+
+        vrange = self.visibleDataRange(axes[0], posn, cliprect, margin)
+        if vrange is None:
+            return None
+        # one point either side, so lines to them are drawn
+        indexrange = xv.sortedIndexRange(vrange[0], vrange[1], margin=1)
+        if indexrange is None:
+            return None
+
+        # keep the same points when thinning
+        start, stop = indexrange
+        start -= start % (s.thinfactor*s.errorthin)
+        return start, stop
+
     def dataDraw(self, painter, axes, posn, cliprect):
         """Plot the data on a plotter."""
 
@@ -905,8 +1010,26 @@ class PointPlotter(GenericPlotter):
             length = min( len(xv.data), len(yv.data) )
             text = text*(length // len(text)) + text[:length % len(text)]
 
+        # if the x values are in order, only use the visible part
+        indexrange = self._visibleIndexRange(
+            painter, axes, posn, cliprect, xv, text, scalepoints)
+        if indexrange is not None:
+            start, stop = indexrange
+            xv, yv = xv[start:stop], yv[start:stop]
+            if scalepoints is not None:
+                scalepoints = scalepoints[start:stop]
+            if colorpoints is not None:
+                colorpoints = colorpoints[start:stop]
+
         # loop over chopped up values
         nanbreak = s.nanHandling == 'break-on'
+        densitypts = []
+
+        # quick draft plots of many markers show their density instead
+        density = s.markerMode == 'density' or (
+            painter.draft and s.marker != 'none' and
+            scalepoints is None and colorpoints is None and
+            min(len(xv.data), len(yv.data)) > _draftdensitypoints)
 
         for xvals, yvals, tvals, ptvals, cvals in (
             datasets.generateValidDatasetParts(
@@ -958,7 +1081,13 @@ class PointPlotter(GenericPlotter):
 
             # plot the points (we do this last so they are on top)
             markersize = s.get('markerSize').convert(painter)
-            if not s.MarkerLine.hide or not s.MarkerFill.hide:
+            if density:
+                # density of all the parts is plotted afterwards
+                if not s.MarkerFill.hide:
+                    densitypts.append((
+                        xpltpoint[::s.thinfactor], ypltpoint[::s.thinfactor]))
+
+            elif not s.MarkerLine.hide or not s.MarkerFill.hide:
 
                 #print "Painting marker fill"
                 if not s.MarkerFill.hide:
@@ -1017,5 +1146,10 @@ class PointPlotter(GenericPlotter):
                     painter, xpltpoint, ypltpoint,
                     tvals, markersize)
 
+        if densitypts:
+            self._drawDensity(
+                painter, N.concatenate([x for x, y in densitypts]),
+                N.concatenate([y for x, y in densitypts]), cliprect)
+
 # allow the factory to instantiate an x,y plotter
 document.thefactory.register(PointPlotter)
@@ -19,6 +19,7 @@
 import numpy as N
 
 from .. import setting
+from .. import datasets
 from .. import document
 from .. import utils
 from .. import qtall as qt
@@ -150,6 +151,40 @@ class VectorField(plotters.GenericPlotter):
 
         painter.restore()
 
+    def _maxVectorExtent(self, painter, data1, data2, baselength):
+        """Maximum distance in plotter coordinates which vectors extend
+        from their pixel centres, or None if unknown."""
+
+        s = self.settings
+        r1, r2 = data1.dataStats().range(), data2.dataStats().range()
+        if r1 is None or r2 is None:
+            return None
+        max1 = max(abs(r1[0]), abs(r1[1]))
+        max2 = max(abs(r2[0]), abs(r2[1]))
+        if s.mode == 'cartesian':
+            length = N.sqrt(max1**2 + max2**2)
+        else:
+            length = max1
+        arrowsize = s.get('arrowsize').convert(painter)
+        if s.scalearrow:
+            arrowsize *= length
+        return length*baselength + arrowsize
+
+    def _visiblePixelRange(self, centres, axis, posn, cliprect, margin):
+        """Return (start, stop) indices of the pixel centres to plot.
+        Only those visible (allowing for margin) are used if the
+        centres are in order."""
+
+        num = len(centres)
+        if margin is None or not N.isfinite(margin):
+            return 0, num
+        sortedness = datasets.ArrayStats(centres).sortedness
+        vrange = self.visibleDataRange(axis, posn, cliprect, margin)
+        if sortedness == 0 or vrange is None:
+            return 0, num
+        return datasets.sortedIndexRange(
+            centres, sortedness, vrange[0], vrange[1], margin=0)
+
     def dataDraw(self, painter, axes, posn, cliprect):
         """Draw the widget."""
 
@@ -177,6 +212,15 @@ class VectorField(plotters.GenericPlotter):
         # get pixel coordinates
         xc, yc = data1.getPixelCentres()
         xc, yc = xc[:xw], yc[:yw]
+
+        # only use the rows and columns which are visible
+        margin = self._maxVectorExtent(painter, data1, data2, baselength)
+        x0, x1 = self._visiblePixelRange(xc, axes[0], posn, cliprect, margin)
+        y0, y1 = self._visiblePixelRange(yc, axes[1], posn, cliprect, margin)
+        xc, yc = xc[x0:x1], yc[y0:y1]
+        data1st, data2nd = data1st[y0:y1, x0:x1], data2nd[y0:y1, x0:x1]
+        xw, yw = len(xc), len(yc)
+
         xdsvals = N.reshape(N.tile(xc, yw), xw*yw)
         ydsvals = N.reshape(N.tile(yc[:, N.newaxis], xw), xw*yw)
 
@@ -147,6 +147,7 @@ class Widget:
                 raise ValueError('New name "%s" already exists' % name)
 
         self.name = name
+        self._treeChanged()
 
     def addDefaultSubWidgets(self):
         '''Add default sub widgets to widget, if any'''
@@ -185,12 +186,19 @@ class Widget:
                 return True
         return False
 
+    def _treeChanged(self):
+        """Forget cached paths and references after the tree changes."""
+        setting.invalidateReferenceCache()
+        if self.document is not None:
+            self.document.invalidatePathIndex()
+
     def addChild(self, child, index=9999999):
         """Add child to list.
 
         index is a position to place the new child
         """
         self.children.insert(index, child)
+        self._treeChanged()
 
     def createUniqueName(self, prefix):
         """Create a name using the prefix which hasn't been used before."""
@@ -242,6 +250,7 @@ class Widget:
 
         if i < nc:
             self.children.pop(i)
+            self._treeChanged()
         else:
             raise ValueError("Cannot remove graph '%s' - does not exist" % name)
 
@@ -398,6 +407,7 @@ class Widget:
             if existingname:
                 w.name = w.chooseName()
 
+            self._treeChanged()
             return True
 
     def updateControlItem(self, controlitem, pos):
@@ -1089,7 +1089,7 @@ class MainWindow(qt.QMainWindow):
             try:
                 with utils.OverrideCursor():
                     ext = os.path.splitext(self.filename)[1]
-                    mode = 'hdf5' if ext == '.vszh5' else 'vsz'
+                    mode = {'.vszh5': 'hdf5', '.vszz': 'zip'}.get(ext, 'vsz')
                     self.document.save(self.filename, mode)
                     self.updateStatusbar(_("Saved to %s") % self.filename)
             except EnvironmentError as e:
@@ -1182,6 +1182,7 @@ class MainWindow(qt.QMainWindow):
         filters = [_('Veusz document files (*.vsz)')]
         if h5py is not None:
             filters += [_('Veusz HDF5 document files (*.vszh5)')]
+        filters += [_('Veusz zip document files (*.vszz)')]
         filename = self.fileSaveDialog(filters, _('Save as'))
         if filename:
             self.filename = filename
@@ -1241,6 +1242,8 @@ class MainWindow(qt.QMainWindow):
                 mode = 'vsz'
             elif ext in ('.h5', '.hdf5', '.he5', '.vszh5'):
                 mode = 'hdf5'
+            elif ext == '.vszz':
+                mode = 'zip'
             else:
                 raise document.LoadError(
                     _("Did not recognise file type '%s'") % ext)
@@ -1308,7 +1311,7 @@ class MainWindow(qt.QMainWindow):
     def slotFileOpen(self):
         """Open an existing file in a new window."""
 
-        filters = ['*.vsz']
+        filters = ['*.vsz', '*.vszz']
         if h5py is not None:
             filters.append('*.vszh5')
 
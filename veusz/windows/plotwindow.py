@@ -63,15 +63,47 @@ class PickerCrosshairItem( qt.QGraphicsPathItem ):
         qt.QGraphicsPathItem.focusOutEvent(self, event)
         self.hide()
 
+class _TiledJob:
+    """A region of a page being rendered in horizontal tiles by
+    several threads."""
+
+    def __init__(self, helper, region, numtiles):
+        self.image = _blankPageImage(
+            helper, (region.width(), region.height()))
+        self.region = region
+        self.remaining = numtiles
+
+def _blankPageImage(helper, size=None):
+    """Return image for page (or part of page with size), filled with
+    the page color."""
+    if size is None:
+        size = int(helper.rawpagesize[0]), int(helper.rawpagesize[1])
+    img = qt.QImage(size[0], size[1], qt.QImage.Format_ARGB32_Premultiplied)
+    img.fill( setting.settingdb.color('page').rgb() )
+    return img
+
 class RenderControl(qt.QObject):
     """Object for rendering plots in a separate thread."""
 
     # emitted when new item on plot queue
     sigQueueChange = qt.pyqtSignal(int)
 
-    # when a rendering job is finished
+    # when a rendering job is finished (jobid, image, region of page
+    # in image, helper)
     signalRenderFinished = qt.pyqtSignal(
-        int, qt.QImage, document.PaintHelper)
+        int, qt.QImage, qt.QRect, document.PaintHelper)
+
+    # when a tile of a job is finished (jobid, image, position,
+    # region of page rendered by job, helper)
+    signalTileFinished = qt.pyqtSignal(
+        int, qt.QImage, qt.QPoint, qt.QRect, document.PaintHelper)
+
+    # when painting a document in a thread fails (with sys.exc_info())
+    signalPaintError = qt.pyqtSignal(object)
+
+    # minimum height of tiles in pixels, when pages are split into
+    # tiles to render in several threads
+    mintileheight = 128
 
     def __init__(self, plotwindow):
         """Start up numthreads rendering threads."""
@@ -116,62 +148,201 @@ class RenderControl(qt.QObject):
         """Exit threads started."""
         self.updateNumberThreads(num=0)
 
+    def renderToImage(self, helper, rect=None, region=None):
+        """Render part of page in rect (QRect in native pixels) or
+        the whole page to a new image. region is the part of the page
+        being rendered, if rect is a tile of it."""
+
+        if rect is None:
+            img = _blankPageImage(helper)
+        else:
+            img = _blankPageImage(helper, (rect.width(), rect.height()))
+
+        painter = qt.QPainter(img)
+        aa = helper.antialias
+        painter.setRenderHint(qt.QPainter.Antialiasing, aa)
+        painter.setRenderHint(qt.QPainter.TextAntialiasing, aa)
+        if rect is not None:
+            painter.translate(-rect.left(), -rect.top())
+        helper.renderToPainter(
+            painter, rastercache=self.plotwindow.rastercache,
+            region=region if region is not None else rect)
+        painter.end()
+        return img
+
     def processNextJob(self):
         """Take a job from the queue and process it.
 
-        emits renderfinished(jobid, img, painthelper)
+        emits renderfinished(jobid, img, region, painthelper)
         when done, if job has not been superseded
+
+        If the job is a tile of a page, emits
+        tilefinished(jobid, img, position, region, painthelper) when
+        the tile is done, then renderfinished when all the tiles are
+        done.
+
+        If the job is to paint a page of the document, a job to render
+        it is added afterwards.
         """
 
         self.mutex.lock()
-        jobid, helper = self.latestjobs[-1]
+        jobid, helper, tiledjob, rect, page = self.latestjobs[-1]
         del self.latestjobs[-1]
         lastadded = self.latestaddedjob
         self.mutex.unlock()
 
+        if page is not None:
+            if lastadded == jobid:
+                self.paintJob(jobid, helper, page, rect)
+            self.sigQueueChange.emit(-1)
+            return
+
         # don't process jobs which have been superseded
+        img = None
+        region = rect if tiledjob is None else tiledjob.region
         if lastadded == jobid:
-            img = qt.QImage(
-                int(helper.rawpagesize[0]), int(helper.rawpagesize[1]),
-                qt.QImage.Format_ARGB32_Premultiplied)
-            img.fill( setting.settingdb.color('page').rgb() )
-
-            painter = qt.QPainter(img)
-            aa = self.plotwindow.antialias
-            painter.setRenderHint(qt.QPainter.Antialiasing, aa)
-            painter.setRenderHint(qt.QPainter.TextAntialiasing, aa)
-            helper.renderToPainter(painter)
-            painter.end()
+            img = self.renderToImage(helper, rect=rect, region=region)
 
-            self.mutex.lock()
-            # just throw away result if it older than the latest one
-            if jobid > self.latestdrawnjob:
-                self.signalRenderFinished.emit(jobid, img, helper)
+        self.mutex.lock()
+        finished = True
+        if tiledjob is not None:
+            if img is not None:
+                painter = qt.QPainter(tiledjob.image)
+                painter.drawImage(rect.topLeft()-region.topLeft(), img)
+                painter.end()
+                if jobid > self.latestdrawnjob:
+                    self.signalTileFinished.emit(
+                        jobid, img, rect.topLeft(), region, helper)
+            tiledjob.remaining -= 1
+            finished = tiledjob.remaining == 0
+            if finished and img is not None:
+                img = tiledjob.image
+
+        # just throw away result if it older than the latest one
+        # (draft paints are shown until the full paint with the same
+        # job id is finished)
+        if finished and img is not None and jobid > self.latestdrawnjob:
+            self.signalRenderFinished.emit(jobid, img, region, helper)
+            if not helper.draft:
                 self.latestdrawnjob = jobid
-            self.mutex.unlock()
+        self.mutex.unlock()
 
         # tell any listeners that a job has been processed
-        self.sigQueueChange.emit(-1)
+        if finished:
+            self.sigQueueChange.emit(-1)
+
+    def tileRects(self, region):
+        """Return list of QRect tiles to split region of page into, or
+        None if it should be rendered in one piece.
+
+        Regions are split into horizontal strips, two for each thread,
+        if there are several threads."""
+
+        height = region.height()
+        numtiles = min(2*len(self.threads), height // self.mintileheight)
+        if len(self.threads) < 2 or numtiles < 2:
+            return None
+
+        edges = [
+            region.top() + height*i // numtiles
+            for i in range(numtiles+1) ]
+        return [
+            qt.QRect(region.left(), y1, region.width(), y2-y1)
+            for y1, y2 in zip(edges[:-1], edges[1:]) ]
 
-    def addJob(self, helper):
-        """Process drawing job in PaintHelper given."""
+    def addJob(self, helper, region=None):
+        """Process drawing job in PaintHelper given.
+
+        region is the part of the page to render (QRect in native
+        pixels), or None for the whole page.
+        """
+
+        self.mutex.lock()
+        self.latestaddedjob += 1
+        jobid = self.latestaddedjob
+        self.mutex.unlock()
+        self.queueRender(jobid, helper, region)
+
+    def queueRender(self, jobid, helper, region=None):
+        """Add job to render region of PaintHelper with jobid to
+        queue."""
 
         # indicate that there is a new item to be processed to listeners
         self.sigQueueChange.emit(1)
 
+        if region is None:
+            region = qt.QRect(
+                0, 0, int(helper.rawpagesize[0]), int(helper.rawpagesize[1]))
+
+        rects = self.tileRects(region)
+        if rects is None:
+            entries = [(helper, None, region, None)]
+        else:
+            tiledjob = _TiledJob(helper, region, len(rects))
+            # jobs are taken from the end, so render from the top
+            entries = [(helper, tiledjob, r, None) for r in rects[::-1]]
+
         # add the job to the queue
         self.mutex.lock()
-        self.latestaddedjob += 1
-        self.latestjobs.append( (self.latestaddedjob, helper) )
+        for entry in entries:
+            self.latestjobs.append( (jobid,) + entry )
         self.mutex.unlock()
 
         if self.threads:
-            # tell a thread to process job
-            self.sem.release(1)
+            # tell threads to process job
+            self.sem.release(len(entries))
         else:
             # process job in current thread if multithreading disabled
             self.processNextJob()
 
+    def addPaintJob(self, helper, page, region=None,
+                    drafthelper=None, draftregion=None):
+        """Paint page of document to PaintHelper in a thread, then
+        render region of it (or the whole page if None). Threads must
+        be enabled.
+
+        If drafthelper is given, it is painted and its draftregion
+        rendered first as a preview.
+
+        The helpers should be cancellable, so that painting stops if
+        the document is modified.
+        """
+
+        helpers = [(helper, region)]
+        if drafthelper is not None:
+            # jobs are taken from the end
+            helpers.append((drafthelper, draftregion))
+
+        self.sigQueueChange.emit(len(helpers))
+        self.mutex.lock()
+        self.latestaddedjob += 1
+        for h, r in helpers:
+            self.latestjobs.append(
+                (self.latestaddedjob, h, None, r, page) )
+        self.mutex.unlock()
+        self.sem.release(len(helpers))
+
+    def paintJob(self, jobid, helper, page, region=None):
+        """Paint page of document to helper, then add a job to render
+        region of it if not superseded."""
+
+        doc = helper.document
+        try:
+            doc.paintTo(helper, page)
+        except document.PaintCancelled:
+            return
+        except Exception:
+            # errors are only reported if the document was unchanged
+            if doc.changeset == helper.changeset:
+                self.signalPaintError.emit(sys.exc_info())
+            return
+
+        self.mutex.lock()
+        superseded = self.latestaddedjob != jobid
+        self.mutex.unlock()
+        if not superseded:
+            self.queueRender(jobid, helper, region)
+
 class RenderThread( qt.QThread ):
     """A thread for processing rendering jobs.
     This is controlled by a RenderControl object
@@ -236,6 +407,20 @@ class PlotWindow( qt.QGraphicsView ):
         (10000, _('Every 10s')),
     )
 
+    # pages taking longer than this to paint (in seconds) are first
+    # shown as a quick draft, at this fraction of the resolution
+    draftmintime = 0.25
+    draftscale = 0.5
+
+    # time to wait (in ms) for more zooming or moving before redrawing
+    navdelay = 200
+
+    # pages with more than this many times the pixels of the window
+    # are only rendered around the visible region, extended by this
+    # fraction of the window size on each side
+    regionminarea = 4
+    regionmargin = 0.5
+
     def __init__(self, document, parent, menu=None):
         """Initialise the window.
 
@@ -251,6 +436,8 @@ class PlotWindow( qt.QGraphicsView ):
         pixmap = qt.QPixmap(1, 1)
         self.dpi = (pixmap.logicalDpiX(), pixmap.logicalDpiY())
         self.pixmapitem = self.scene.addPixmap(pixmap)
+        # zoom factor of scene coordinates
+        self.scenezoom = 1.
 
         # whether full screen mode
         self.isfullscreen = False
@@ -299,6 +486,10 @@ class PlotWindow( qt.QGraphicsView ):
         self.rendercontrol = RenderControl(self)
         self.rendercontrol.signalRenderFinished.connect(
             self.slotRenderFinished)
+        self.rendercontrol.signalTileFinished.connect(
+            self.slotTileFinished)
+        self.rendercontrol.signalPaintError.connect(
+            self.slotPaintError)
         self.rendercontrol.sigQueueChange.connect(
             self.sigQueueChange)
 
@@ -321,6 +512,32 @@ class PlotWindow( qt.QGraphicsView ):
         # for turning clicking into scrolling after a period
         self.scrolltimer.timeout.connect(self.slotBecomeScrollClick)
 
+        # for combining rapid zooming or moving into one redraw
+        self.navtimer = qt.QTimer(self)
+        self.navtimer.setSingleShot(True)
+        self.navtimer.setInterval(self.navdelay)
+        self.navtimer.timeout.connect(self.slotNavigationPaused)
+
+        # pending axis ranges, in plotter coordinates of the page
+        # image navhelper drew (navimage, with its position on the
+        # page in native pixels), for previewing navigation; the page
+        # image is kept until they are applied
+        self.navranges = {}
+        self.navdescr = None
+        self.navhelper = None
+        self.navimage = None
+        self.navorigin = None
+
+        # whether graph is being dragged in recenter mode
+        self.navdragpos = None
+        self.navdragged = False
+
+        # render new regions of large pages when scrolling
+        self.horizontalScrollBar().valueChanged.connect(
+            self.slotCheckRegion)
+        self.verticalScrollBar().valueChanged.connect(
+            self.slotCheckRegion)
+
         # get plot view updating policy
         #  -1: update on document changes
         #   0: never update automatically
@@ -333,6 +550,19 @@ class PlotWindow( qt.QGraphicsView ):
 
         # load antialias settings
         self.antialias = setting.settingdb['plot_antialias']
+        # keep images of slow widgets
+        self.rastercache = setting.settingdb['plot_rastercache']
+        # paint document in drawing threads
+        self.threadedpaint = setting.settingdb['plot_threadedpaint']
+        # show drafts of slow pages first
+        self.progressive = setting.settingdb['plot_progressive']
+        # time taken for last paint of page
+        self.lastpainttime = 0.
+        # preview zooming and moving before redrawing
+        self.fastnavigation = setting.settingdb['plot_fastnavigation']
+
+        # recorded layers of widgets kept between updates
+        self.resetLayerCache()
 
         # allow window to get focus, to allow context menu
         self.setFocusPolicy(qt.Qt.StrongFocus)
@@ -354,7 +584,7 @@ class PlotWindow( qt.QGraphicsView ):
         if p.width() <= 1 and p.height() <= 1:
             # if the document has been uninitialized, get the doc size
             return qt.QSize(*self.document.docSize())
-        return p.size()
+        return self.sceneRect().size().toSize()
 
     def showToolbar(self, show=True):
         """Show or hide toolbar"""
@@ -586,8 +816,8 @@ class PlotWindow( qt.QGraphicsView ):
             # convert points on plotter to axis coordinates
             # FIXME: Need To Trap Conversion Errors!
             try:
-                r = axis.plotterToGraphCoords(
-                    self.painthelper.widgetBounds(axis), p)
+                r = self.plotterToGraphCoords(
+                    axis, self.painthelper.widgetBounds(axis), p)
             except KeyError:
                 continue
 
@@ -611,10 +841,21 @@ class PlotWindow( qt.QGraphicsView ):
         self.document.applyOperation(
             document.OperationMultiple(operations,descr=_('zoom axes')) )
 
+    def plotterToGraphCoords(self, axis, bounds, vals):
+        """Convert plotter coordinates vals to graph coordinates of
+        axis with bounds.
+
+        Converting updates the axis, so this waits for any painting of
+        the document in another thread to finish first.
+        """
+        with self.document.change():
+            return axis.plotterToGraphCoords(bounds, vals)
+
     def axesForPoint(self, mousepos):
         """Find all the axes which contain the given mouse position.
 
-        Returns a dict of axis: coordinate
+        Returns a dict of axis: coordinate. The coordinates are None
+        if the document is being painted in another thread.
         """
 
         axes = {}
@@ -625,19 +866,29 @@ class PlotWindow( qt.QGraphicsView ):
         px = pos.x() / self.painthelper.cgscale
         py = pos.y() / self.painthelper.cgscale
 
-        for widget, bounds in self.painthelper.widgetBoundsIterator(
-                widgettype=widgets.Axis):
-            # if widget is axis, and point lies within bounds
-            if ( px>=bounds[0] and px<=bounds[2] and
-                 py>=bounds[1] and py<=bounds[3] ):
-
-                # convert correct pointer position
-                if widget.settings.direction == 'horizontal':
-                    val = px
-                else:
-                    val = py
-                coords = widget.plotterToGraphCoords(bounds, N.array([val]))
-                axes[widget] = coords[0]
+        # converting updates the axes, so is not done while painting
+        paintlock = self.document.paintlock
+        convert = paintlock.acquire(blocking=False)
+        try:
+            for widget, bounds in self.painthelper.widgetBoundsIterator(
+                    widgettype=widgets.Axis):
+                # if widget is axis, and point lies within bounds
+                if ( px>=bounds[0] and px<=bounds[2] and
+                     py>=bounds[1] and py<=bounds[3] ):
+
+                    axes[widget] = None
+                    if convert:
+                        # convert correct pointer position
+                        if widget.settings.direction == 'horizontal':
+                            val = px
+                        else:
+                            val = py
+                        coords = widget.plotterToGraphCoords(
+                            bounds, N.array([val]))
+                        axes[widget] = coords[0]
+        finally:
+            if convert:
+                paintlock.release()
 
         return axes
 
@@ -659,38 +910,21 @@ class PlotWindow( qt.QGraphicsView ):
         px = pos.x() / self.painthelper.cgscale
         py = pos.y() / self.painthelper.cgscale
 
-        ops = []
-        for axis, val in axes.items():
-            ishorz = axis.settings.direction == 'horizontal'
+        ranges = {}
+        for axis in axes:
             bounds = self.painthelper.widgetBounds(axis)
-            if ishorz:
-                rng = bounds[2]-bounds[0]
+            if axis.settings.direction == 'horizontal':
                 b0, b1 = bounds[0], bounds[2]
                 clickpos = px
             else:
-                rng = bounds[3]-bounds[1]
                 b0, b1 = bounds[1], bounds[3]
                 clickpos = py
 
-            delta = rng/factor/2
-            coords = axis.plotterToGraphCoords(
-                bounds, N.array([
-                    clickpos-delta,
-                    clickpos+delta,
-                    clickpos-delta+1,
-                    clickpos+delta+1,
-                ]))
-
-            poslo, poshi = [coords[0], coords[1]]
-            poslo1, poshi1 = [coords[2], coords[3]]
-            if not ishorz:
-                poshi, poslo = poslo, poshi
-                poshi1, poslo1 = poslo1, poshi1
-
-            ops.append( document.OperationSettingSet(
-                axis.settings.get('min'), float(poslo)) )
-            ops.append( document.OperationSettingSet(
-                axis.settings.get('max'), float(poshi)) )
+            # convert to position on any pending navigation
+            lo, hi = self.navigationRange(axis, b0, b1)
+            clickpos = lo + (clickpos-b0)*(hi-lo)/(b1-b0)
+            delta = (hi-lo)/factor/2
+            ranges[axis] = (clickpos-delta, clickpos+delta)
 
         if factor == 1:
             descr = _('recenter graph')
@@ -699,13 +933,154 @@ class PlotWindow( qt.QGraphicsView ):
         else:
             descr = _('zoom out of axes')
 
-        self.document.applyOperation(
-            document.OperationMultiple(ops, descr=descr))
+        self.navigateAxes(ranges, descr)
 
     def doGraphRecenterOnPoint(self, mousepos):
         """Recentre graph on point."""
         self.doGraphZoomOnPoint(mousepos, factor=1)
 
+    def doGraphMove(self, mousepos, newpos):
+        """Move graph being dragged by the distance from mousepos to
+        newpos."""
+
+        axes = self.axesForPoint(self.navdragpos)
+        if not axes:
+            return
+
+        delta = (
+            (self.mapToScene(newpos) - self.mapToScene(mousepos)) /
+            self.painthelper.cgscale )
+
+        ranges = {}
+        for axis in axes:
+            bounds = self.painthelper.widgetBounds(axis)
+            if axis.settings.direction == 'horizontal':
+                b0, b1, d = bounds[0], bounds[2], delta.x()
+            else:
+                b0, b1, d = bounds[1], bounds[3], delta.y()
+
+            lo, hi = self.navigationRange(axis, b0, b1)
+            shift = d*(hi-lo)/(b1-b0)
+            ranges[axis] = (lo-shift, hi-shift)
+
+        self.navigateAxes(ranges, _('move graph'))
+
+    def navigationRange(self, axis, b0, b1):
+        """Get range of axis, which has bounds b0 to b1, in plotter
+        coordinates of the last page image, including any pending
+        navigation."""
+        if self.navhelper is not self.painthelper:
+            return (b0, b1)
+        return self.navranges.get(axis, (b0, b1))
+
+    def navigateAxes(self, ranges, descr):
+        """Change axes to show the ranges given in plotter coordinates
+        of the last page image, as a dict of axis: (lo, hi).
+
+        If fast navigation is enabled, the change is shown by moving
+        and scaling the last image, and is applied to the document
+        once navigation pauses.
+        """
+
+        if not self.fastnavigation:
+            self.applyAxisRanges(self.painthelper, ranges, descr)
+            return
+
+        if self.navhelper is not self.painthelper:
+            # start navigating from the latest image
+            self.navhelper = self.painthelper
+            self.navimage = self.pixmapitem.pixmap()
+            self.navorigin = (
+                self.pixmapitem.offset() *
+                self.navimage.devicePixelRatio() ).toPoint()
+            self.navranges = {}
+
+        self.navranges.update(ranges)
+        self.navdescr = descr
+        self.showNavigationPreview()
+        self.navtimer.start()
+
+    def applyAxisRanges(self, helper, ranges, descr):
+        """Set axes to ranges in plotter coordinates of helper."""
+
+        ops = []
+        for axis, (lo, hi) in ranges.items():
+            poslo, poshi = self.plotterToGraphCoords(
+                axis, helper.widgetBounds(axis), N.array([lo, hi]))
+            if axis.settings.direction != 'horizontal':
+                poshi, poslo = poslo, poshi
+
+            ops.append( document.OperationSettingSet(
+                axis.settings.get('min'), float(poslo)) )
+            ops.append( document.OperationSettingSet(
+                axis.settings.get('max'), float(poshi)) )
+
+        self.document.applyOperation(
+            document.OperationMultiple(ops, descr=descr))
+
+    def showNavigationPreview(self):
+        """Show the last page image with the graphs being navigated
+        moved and scaled to their pending ranges."""
+
+        helper = self.navhelper
+        scale = helper.cgscale * helper.devicepixelratio
+
+        # axes with the same bounds share the same region of image
+        regions = {}
+        for axis, (lo, hi) in self.navranges.items():
+            bounds = tuple(helper.widgetBounds(axis))
+            src = regions.setdefault(bounds, list(bounds))
+            if axis.settings.direction == 'horizontal':
+                src[0], src[2] = lo, hi
+            else:
+                src[1], src[3] = lo, hi
+
+        # work in native pixels
+        base = qt.QPixmap(self.navimage)
+        base.setDevicePixelRatio(1)
+        pixmap = qt.QPixmap(base)
+        painter = qt.QPainter(pixmap)
+        # image may only show part of the page
+        painter.translate(-self.navorigin)
+        for bounds, src in regions.items():
+            target = qt.QRectF(
+                qt.QPointF(bounds[0]*scale, bounds[1]*scale),
+                qt.QPointF(bounds[2]*scale, bounds[3]*scale))
+            source = qt.QRectF(
+                qt.QPointF(src[0]*scale, src[1]*scale),
+                qt.QPointF(src[2]*scale, src[3]*scale))
+            painter.fillRect(target, setting.settingdb.color('page'))
+
+            # only the old contents of the graph are shown
+            visible = source.intersected(target)
+            if visible.isEmpty() or source.isEmpty():
+                continue
+            sx = target.width() / source.width()
+            sy = target.height() / source.height()
+            dest = qt.QRectF(
+                target.left() + (visible.left()-source.left())*sx,
+                target.top() + (visible.top()-source.top())*sy,
+                visible.width()*sx, visible.height()*sy)
+            painter.drawPixmap(
+                dest, base, visible.translated(-self.navorigin))
+        painter.end()
+
+        # keep any scaling from zooming the view
+        pixmap.setDevicePixelRatio(
+            self.pixmapitem.pixmap().devicePixelRatio())
+        self.pixmapitem.setPixmap(pixmap)
+
+    def slotNavigationPaused(self):
+        """Apply pending navigation and redraw once it has paused."""
+        if self.navranges:
+            # the page image is not replaced while navigation is
+            # pending, so the ranges are relative to navhelper
+            ranges, self.navranges = self.navranges, {}
+            self.applyAxisRanges(self.navhelper, ranges, self.navdescr)
+            # navigating again starts from the preview shown
+            self.navhelper = self.navdescr = None
+        self.checkPlotUpdate()
+
     def doGraphReset(self, mousepos):
         """Reset axes for graph."""
 
@@ -730,8 +1105,17 @@ class PlotWindow( qt.QGraphicsView ):
             pickinfo.graphpos[1] * self.painthelper.cgscale)
         self.sigPointPicked.emit(pickinfo)
 
-    def doPick(self, mousepos):
-        """Find the point on any plot-like widget closest to the cursor"""
+    def doPick(self, mousepos, wait=True):
+        """Find the point on any plot-like widget closest to the cursor
+
+        Picking converts coordinates using the axes, so waits for any
+        painting of the document in another thread to finish, or does
+        nothing if wait is False.
+        """
+
+        paintlock = self.document.paintlock
+        if not paintlock.acquire(blocking=wait):
+            return
 
         self.pickerwidgets = []
 
@@ -740,22 +1124,26 @@ class PlotWindow( qt.QGraphicsView ):
         pos = self.mapToScene(mousepos)
         pos /= self.painthelper.cgscale
 
-        for w, bounds in self.painthelper.widgetBoundsIterator():
-            # ask the widget for its (visually) closest point to the cursor
-            try:
-                info = w.pickPoint(pos.x(), pos.y(), bounds)
-            except AttributeError:
-                # widget isn't pickable
-                continue
+        try:
+            for w, bounds in self.painthelper.widgetBoundsIterator():
+                # ask the widget for its (visually) closest point to
+                # the cursor
+                try:
+                    info = w.pickPoint(pos.x(), pos.y(), bounds)
+                except AttributeError:
+                    # widget isn't pickable
+                    continue
 
-            if info:
-                # this is a pickable widget, so remember it for future
-                # key navigation
-                self.pickerwidgets.append(w)
+                if info:
+                    # this is a pickable widget, so remember it for
+                    # future key navigation
+                    self.pickerwidgets.append(w)
 
-                if info.distance < pickinfo.distance:
-                    # and remember the overall closest
-                    pickinfo = info
+                    if info.distance < pickinfo.distance:
+                        # and remember the overall closest
+                        pickinfo = info
+        finally:
+            paintlock.release()
 
         if not pickinfo:
             self.pickeritem.hide()
@@ -808,6 +1196,11 @@ class PlotWindow( qt.QGraphicsView ):
                 qt.QApplication.setOverrideCursor(
                     qt.QCursor(qt.Qt.SizeAllCursor))
 
+            elif self.clickmode == 'graphrecenter':
+                # can drag graph around, or click to recenter
+                self.navdragpos = qt.QPoint(self.winpos)
+                self.navdragged = False
+
             elif self.clickmode == 'graphzoom':
                 self.zoomrect.setRect(
                     self.grabpos.x(), self.grabpos.y(),
@@ -851,14 +1244,30 @@ class PlotWindow( qt.QGraphicsView ):
                     max(self.grabpos.y(), pos2.y())),
                 ))
 
-        # update position of mouse
+        elif ( self.currentclickmode == 'graphrecenter' and
+               self.navdragpos is not None and
+               event.buttons() & qt.Qt.LeftButton ):
+            # drag graph around once mouse has moved far enough
+            pos = event.pos()
+            if ( self.navdragged or (pos-self.winpos).manhattanLength() >=
+                 qt.QApplication.startDragDistance() ):
+                self.navdragged = True
+                # without fast navigation, the graph is only moved
+                # when the mouse is released
+                if self.fastnavigation:
+                    self.doGraphMove(self.winpos, pos)
+                    self.winpos = qt.QPoint(pos)
+
+        # update position of mouse, unless the document is being
+        # painted
         axes = self.axesForPoint(event.pos())
-        vals = {a.name: v for a, v in axes.items()}
-        self.sigAxisValuesFromMouse.emit(vals)
+        if None not in axes.values():
+            vals = {a.name: v for a, v in axes.items()}
+            self.sigAxisValuesFromMouse.emit(vals)
 
         if self.currentclickmode == 'pick':
             # drag the picker around
-            self.doPick(event.pos())
+            self.doPick(event.pos(), wait=False)
 
     def mouseReleaseEvent(self, event):
         """If the mouse button is released, check whether the mouse
@@ -891,7 +1300,11 @@ class PlotWindow( qt.QGraphicsView ):
             elif self.currentclickmode == 'graphzoomout':
                 self.doGraphZoomOnPoint(event.pos())
             elif self.currentclickmode == 'graphrecenter':
-                self.doGraphRecenterOnPoint(event.pos())
+                if not self.navdragged:
+                    self.doGraphRecenterOnPoint(event.pos())
+                elif not self.fastnavigation:
+                    self.doGraphMove(self.winpos, event.pos())
+                self.navdragpos = None
             elif self.currentclickmode == 'graphreset':
                 self.doGraphReset(event.pos())
 
@@ -905,9 +1318,10 @@ class PlotWindow( qt.QGraphicsView ):
                 event.accept()
                 dir = 'right' if k == qt.Qt.Key_Right else 'left'
                 ix = self.pickerinfo.index
-                pickinfo = self.pickerinfo.widget.pickIndex(
-                    ix, dir, self.painthelper.widgetBounds(
-                        self.pickerinfo.widget))
+                with self.document.paintlock:
+                    pickinfo = self.pickerinfo.widget.pickIndex(
+                        ix, dir, self.painthelper.widgetBounds(
+                            self.pickerinfo.widget))
                 if pickinfo:
                     # more points visible in this direction
                     self.emitPicked(pickinfo)
@@ -928,10 +1342,11 @@ class PlotWindow( qt.QGraphicsView ):
 
                     # ask the widgets to pick their point which is closest horizontally
                     # to the last (screen) x value picked
-                    pi = w.pickPoint(
-                        self.pickerinfo.graphpos[0], p.y(),
-                        self.painthelper.widgetBounds(w),
-                        distance='horizontal')
+                    with self.document.paintlock:
+                        pi = w.pickPoint(
+                            self.pickerinfo.graphpos[0], p.y(),
+                            self.painthelper.widgetBounds(w),
+                            distance='horizontal')
                     if not pi:
                         continue
 
@@ -966,12 +1381,16 @@ class PlotWindow( qt.QGraphicsView ):
             d = event.angleDelta()
             delta = d.x() if d.x() != 0 else d.y()
             self.sumwheeldelta += delta
+            steps = 0
             while self.sumwheeldelta <= -120:
-                self.slotViewZoomOut()
+                steps -= 1
                 self.sumwheeldelta += 120
             while self.sumwheeldelta >= 120:
-                self.slotViewZoomIn()
+                steps += 1
                 self.sumwheeldelta -= 120
+            if steps != 0:
+                self.setZoomFactor(
+                    self.zoomfactor * N.sqrt(2.)**steps, interactive=True)
             event.accept()
         elif event.modifiers() & qt.Qt.ShiftModifier:
             # scroll horizontally if shift is held down
@@ -1059,6 +1478,9 @@ class PlotWindow( qt.QGraphicsView ):
         # draw data into background pixmap if modified
 
         # is an update required?
+        if self.navranges:
+            # keep showing the preview until navigation is applied
+            return
         if ( self.zoomfactor == self.oldzoom and
              self.document.changeset == self.docchangeset and
              self.pagenumber == self.oldpagenumber ):
@@ -1077,25 +1499,55 @@ class PlotWindow( qt.QGraphicsView ):
             size = self.document.pageSize(
                 self.pagenumber, scaling=scaling, integer=False)
 
-            # draw the data into the buffer
-            # errors cause an exception window to pop up
-            try:
-                phelper = document.PaintHelper(
-                    self.document, size,
-                    scaling=scaling,
+            threaded = self.threadedpaint and self.rendercontrol.threads
+            phelper = document.PaintHelper(
+                self.document, size,
+                scaling=scaling,
+                dpi=self.dpi,
+                devicepixelratio=devicepixelratio,
+                bitmap=True, antialias=self.antialias,
+                layercache=self.layercache,
+                cancellable=threaded)
+
+            drafthelper = None
+            if self.progressive and self.lastpainttime > self.draftmintime:
+                # quick low resolution draft without antialiasing
+                f = self.draftscale
+                drafthelper = document.PaintHelper(
+                    self.document, (size[0]*f, size[1]*f),
+                    scaling=scaling*f,
                     dpi=self.dpi,
-                    devicepixelratio=devicepixelratio)
-                self.document.paintTo(phelper, self.pagenumber)
-
-            except Exception:
-                # stop updates this time round and show exception dialog
-                d = exceptiondialog.ExceptionDialog(sys.exc_info(), self)
-                self.oldzoom = self.zoomfactor
-                self.docchangeset = self.document.changeset
-                d.exec_()
-
-            self.painthelper = phelper
-            self.rendercontrol.addJob(phelper)
+                    devicepixelratio=devicepixelratio*f,
+                    linetolerance=4., bitmap=True, antialias=False,
+                    cancellable=threaded, draft=True)
+
+            # only the visible part of large pages is rendered
+            region = self.renderRegion(phelper)
+            if threaded:
+                # painting is done in a thread, then rendered
+                self.rendercontrol.addPaintJob(
+                    phelper, self.pagenumber, region=region,
+                    drafthelper=drafthelper,
+                    draftregion=(
+                        None if drafthelper is None else
+                        self.renderRegion(drafthelper)))
+            else:
+                # draw the data into the buffer
+                # errors cause an exception window to pop up
+                try:
+                    if drafthelper is not None:
+                        self.showDraft(drafthelper)
+                    self.document.paintTo(phelper, self.pagenumber)
+
+                except Exception:
+                    # stop updates this time round and show exception dialog
+                    d = exceptiondialog.ExceptionDialog(sys.exc_info(), self)
+                    self.oldzoom = self.zoomfactor
+                    self.docchangeset = self.document.changeset
+                    d.exec_()
+
+                self.painthelper = phelper
+                self.rendercontrol.addJob(phelper, region)
         else:
             self.painthelper = None
             self.pagenumber = 0
@@ -1103,6 +1555,7 @@ class PlotWindow( qt.QGraphicsView ):
             pixmap = qt.QPixmap(*size)
             pixmap.fill( setting.settingdb.color('page') )
             self.setSceneRect(0, 0, *size)
+            self.pixmapitem.setOffset(0, 0)
             self.pixmapitem.setPixmap(pixmap)
 
         self.sigUpdatePage.emit(self.pagenumber)
@@ -1112,20 +1565,187 @@ class PlotWindow( qt.QGraphicsView ):
         self.oldzoom = self.zoomfactor
         self.docchangeset = self.document.changeset
 
-    def slotRenderFinished(self, jobid, img, helper):
-        """Update image on display if rendering (usually in other
-        thread) finished."""
+    def showDraft(self, helper):
+        """Paint and show a draft of the page immediately, before
+        painting it fully in this thread."""
+        self.document.paintTo(helper, self.pagenumber)
+        region = self.renderRegion(helper)
+        self.setPageImage(
+            self.rendercontrol.renderToImage(helper, rect=region),
+            region, helper)
+        self.viewport().repaint()
+
+    def renderRegion(self, helper):
+        """Return the region of the page drawn by helper to render, as
+        a QRect in its native pixels.
+
+        This is the whole page, unless the page is much larger than
+        the window, when it is the visible part with a margin.
+        """
+
+        width = int(helper.rawpagesize[0])
+        height = int(helper.rawpagesize[1])
+        page = qt.QRect(0, 0, width, height)
+
+        dpr = helper.devicepixelratio
+        view = self.viewport().rect()
+        viewarea = view.width() * view.height() * dpr**2
+        if viewarea <= 0 or width*height <= self.regionminarea*viewarea:
+            return page
+
+        # region around the middle of the view, scaled to the zoom of
+        # the helper
+        scale = helper.cgscale / self.scenezoom * dpr
+        center = self.mapToScene(view.center()) * scale
+        w = view.width() * dpr * (1 + 2*self.regionmargin)
+        h = view.height() * dpr * (1 + 2*self.regionmargin)
+        region = qt.QRectF(
+            center.x()-w/2, center.y()-h/2, w, h).toAlignedRect()
+        region.moveTo(
+            max(0, min(region.left(), width-region.width())),
+            max(0, min(region.top(), height-region.height())))
+        return region.intersected(page)
+
+    def setPageScene(self, width, height, zoom):
+        """Set scene to page of size width and height at zoom,
+        keeping the same part of the page in the middle of the view if
+        the zoom has changed."""
+
+        center = self.mapToScene(self.viewport().rect().center())
+        self.setSceneRect(0, 0, width, height)
+        if zoom != self.scenezoom:
+            scale = zoom / self.scenezoom
+            self.scenezoom = zoom
+            self.centerOn(center * scale)
+
+    def newPagePixmap(self, region, helper):
+        """Return a new pixmap for region of page drawn by helper,
+        showing the current image where it overlaps, and make the
+        scene fit the page."""
+
+        dpr = helper.devicepixelratio
+        pixmap = qt.QPixmap(region.width(), region.height())
+        pixmap.fill( setting.settingdb.color('page') )
+
+        oldpixmap = self.pixmapitem.pixmap()
+        if not oldpixmap.isNull():
+            # position of old image, scaled to the new zoom
+            scale = helper.cgscale / self.scenezoom
+            oldrect = self.pixmapitem.sceneBoundingRect()
+            painter = qt.QPainter(pixmap)
+            painter.translate(-region.left(), -region.top())
+            painter.scale(dpr, dpr)
+            painter.drawPixmap(
+                qt.QRectF(oldrect.topLeft()*scale, oldrect.size()*scale),
+                oldpixmap, qt.QRectF(oldpixmap.rect()))
+            painter.end()
+
+        pixmap.setDevicePixelRatio(dpr)
+        self.setPageScene(
+            int(helper.rawpagesize[0])/dpr, int(helper.rawpagesize[1])/dpr,
+            helper.cgscale)
+        self.pixmapitem.setOffset(region.left()/dpr, region.top()/dpr)
+        return pixmap
+
+    def setPageImage(self, img, region, helper):
+        """Show image of region of page rendered with helper."""
         dpr = helper.devicepixelratio
         bufferpixmap = qt.QPixmap.fromImage(img)
         bufferpixmap.setDevicePixelRatio(dpr)
-        self.setSceneRect(
-            0, 0, bufferpixmap.width()/dpr, bufferpixmap.height()/dpr)
+        self.setPageScene(
+            int(helper.rawpagesize[0])/dpr, int(helper.rawpagesize[1])/dpr,
+            helper.cgscale)
+        self.pixmapitem.setOffset(region.left()/dpr, region.top()/dpr)
         self.pixmapitem.setPixmap(bufferpixmap)
 
+    def slotRenderFinished(self, jobid, img, region, helper):
+        """Update image on display if rendering (usually in other
+        thread) finished."""
+        if self.navranges:
+            # the page is redrawn after navigation is applied
+            return
+        oldhelper = self.painthelper
+        self.painthelper = helper
+        self.setPageImage(img, region, helper)
+        if not helper.draft:
+            self.lastpainttime = helper.painttime or 0.
+
+        if helper is not oldhelper:
+            # page was painted in a thread
+            self.updateControlGraphs(self.lastwidgetsselected)
+
+        # view may have moved while rendering
+        self.slotCheckRegion()
+
+    def slotPaintError(self, excinfo):
+        """Show error from painting document in a thread."""
+        d = exceptiondialog.ExceptionDialog(excinfo, self)
+        d.exec_()
+
+    def slotTileFinished(self, jobid, img, posn, region, helper):
+        """Show tile of region of page on display, when rendered in
+        another thread."""
+
+        if self.navranges:
+            return
+        dpr = helper.devicepixelratio
+        pixmap = self.pixmapitem.pixmap()
+        offset = qt.QPointF(region.left()/dpr, region.top()/dpr)
+        if ( pixmap.size() != region.size() or
+             pixmap.devicePixelRatio() != dpr or
+             self.pixmapitem.offset() != offset ):
+            # start a new image if the region has changed, showing the
+            # old image (such as a draft) until it is replaced
+            pixmap = self.newPagePixmap(region, helper)
+
+        # paint in native pixels
+        pixmap.setDevicePixelRatio(1)
+        painter = qt.QPainter(pixmap)
+        painter.drawImage(posn-region.topLeft(), img)
+        painter.end()
+        pixmap.setDevicePixelRatio(dpr)
+        self.pixmapitem.setPixmap(pixmap)
+
+    def slotCheckRegion(self):
+        """Render another region of the page if the visible part is
+        not in the current image."""
+
+        helper = self.painthelper
+        rc = self.rendercontrol
+        if ( helper is None or self.navtimer.isActive() or
+             helper.cgscale != self.scenezoom or
+             rc.latestdrawnjob != rc.latestaddedjob ):
+            # wait until the latest page is shown
+            return
+
+        visible = self.mapToScene(
+            self.viewport().rect()).boundingRect().intersected(
+                self.sceneRect())
+        if self.pixmapitem.sceneBoundingRect().contains(
+                visible.adjusted(1, 1, -1, -1)):
+            return
+
+        region = self.renderRegion(helper)
+        dpr = self.pixmapitem.pixmap().devicePixelRatio()
+        current = qt.QRect(
+            (self.pixmapitem.offset()*dpr).toPoint(),
+            self.pixmapitem.pixmap().size())
+        if region != current:
+            rc.addJob(helper, region)
+
+    def resizeEvent(self, event):
+        """Render more of the page if the window gets larger."""
+        qt.QGraphicsView.resizeEvent(self, event)
+        self.slotCheckRegion()
+
     def updatePlotSettings(self):
         """Update plot window settings from settings."""
         self.setTimeout(setting.settingdb['plot_updatepolicy'])
         self.antialias = setting.settingdb['plot_antialias']
+        self.rastercache = setting.settingdb['plot_rastercache']
+        self.threadedpaint = setting.settingdb['plot_threadedpaint']
+        self.progressive = setting.settingdb['plot_progressive']
+        self.fastnavigation = setting.settingdb['plot_fastnavigation']
         self.rendercontrol.updateNumberThreads()
         self.actionForceUpdate()
 
@@ -1175,8 +1795,13 @@ class PlotWindow( qt.QGraphicsView ):
     def actionForceUpdate(self):
         """Force an update for the graph."""
         self.docchangeset = -100
+        self.resetLayerCache()
         self.checkPlotUpdate()
 
+    def resetLayerCache(self):
+        """Forget the recorded layers of widgets from earlier updates."""
+        self.layercache = document.LayerCache()
+
     def slotFullScreen(self):
         """Show window full screen or not."""
         if not self.isfullscreen:
@@ -1217,11 +1842,27 @@ class PlotWindow( qt.QGraphicsView ):
         setting.settingdb['plot_antialias'] = self.antialias
         self.actionForceUpdate()
 
-    def setZoomFactor(self, zoomfactor):
-        """Set the zoom factor of the window."""
+    def setZoomFactor(self, zoomfactor, interactive=False):
+        """Set the zoom factor of the window.
+
+        If interactive and fast navigation is enabled, the last image
+        is scaled and the page is redrawn once zooming pauses.
+        """
         zoomfactor = max(0.05, min(20, zoomfactor))
-        self.zoomfactor = float(zoomfactor)
-        self.checkPlotUpdate()
+        if interactive and self.fastnavigation:
+            scale = zoomfactor / self.scenezoom
+            pixmap = self.pixmapitem.pixmap()
+            pixmap.setDevicePixelRatio(pixmap.devicePixelRatio() / scale)
+            self.pixmapitem.setPixmap(pixmap)
+            self.pixmapitem.setOffset(self.pixmapitem.offset() * scale)
+            self.navtimer.start()
+            rect = self.sceneRect()
+            self.setPageScene(
+                rect.width()*scale, rect.height()*scale, zoomfactor)
+            self.zoomfactor = float(zoomfactor)
+        else:
+            self.zoomfactor = float(zoomfactor)
+            self.checkPlotUpdate()
 
     def slotViewZoomIn(self):
         """Zoom into the plot."""
@@ -1237,7 +1878,7 @@ class PlotWindow( qt.QGraphicsView ):
         # need to take account of scroll bars when deciding size
         viewportsize = self.maximumViewportSize()
         aspectwin = viewportsize.width() / viewportsize.height()
-        r = self.pixmapitem.boundingRect()
+        r = self.sceneRect()
         aspectplot = r.width() / r.height()
 
         width = viewportsize.width()
@@ -1252,7 +1893,7 @@ class PlotWindow( qt.QGraphicsView ):
         """Make the zoom factor so that the plot fills the whole width."""
 
         viewportsize = self.maximumViewportSize()
-        pixrect = self.pixmapitem.boundingRect()
+        pixrect = self.sceneRect()
 
         try:
             aspectwin = viewportsize.width() / viewportsize.height()
@@ -1272,7 +1913,7 @@ class PlotWindow( qt.QGraphicsView ):
         """Make the zoom factor correct to show the whole page."""
 
         viewportsize = self.maximumViewportSize()
-        r = self.pixmapitem.boundingRect()
+        r = self.sceneRect()
         if r.width() != 0 and r.height() != 0:
             multw = viewportsize.width() / r.width()
             multh = viewportsize.height() / r.height()
@@ -1371,8 +2012,8 @@ class PlotWindow( qt.QGraphicsView ):
 
                 # convert point on plotter to axis coordinate
                 # FIXME: Need To Trap Conversion Errors!
-                r = axis.plotterToGraphCoords(
-                    self.painthelper.widgetBounds(axis), p)
+                r = self.plotterToGraphCoords(
+                    axis, self.painthelper.widgetBounds(axis), p)
 
                 axesretn.append( (axis.path, r[0]) )
 
@@ -1216,6 +1216,7 @@ class TreeEditDock(qt.QDockWidget):
             backcolor=setdb['export_background'],
             svgtextastext=setdb['export_SVG_text_as_text'],
             svgdpi=setdb['export_DPI_SVG'],
+            linetolerance=setdb['export_line_tolerance'],
         )
 
         tmpdir = tempfile.TemporaryDirectory()